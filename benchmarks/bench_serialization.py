@@ -0,0 +1,85 @@
+"""Compare JSON backends on realistic summary.json documents
+
+Usage:
+    pip install -e .
+    python benchmarks/bench_serialization.py [--repeat N]
+
+For every installed backend the script times encoding (compact and pretty)
+and decoding of run summaries of increasing size, next to the legacy
+``json.dumps(indent=4)`` format that ORruns used to write.
+"""
+import argparse
+import json
+import random
+import timeit
+
+from orruns.core import serialization
+
+
+def make_summary(n_series: int, n_steps: int) -> dict:
+    """Build a summary with ``n_series`` stepped metrics of ``n_steps`` points"""
+    rng = random.Random(0)
+    metrics = {"best_cost": rng.random() * 1000, "runtime": rng.random() * 60}
+    for i in range(n_series):
+        metrics[f"curve_{i}"] = {
+            "steps": list(range(n_steps)),
+            "values": [rng.random() for _ in range(n_steps)],
+        }
+    return {
+        "name": "tsp_study",
+        "run_id": "20240101_000000_abcd1234",
+        "timestamp": "20240101_000000",
+        "parameters": {
+            "population_size": 100,
+            "mutation_rate": 0.05,
+            "operators": ["2opt", "swap", "insert"],
+            "instance": {"name": "berlin52", "n_cities": 52},
+        },
+        "metrics": metrics,
+        "status": "completed",
+    }
+
+
+SIZES = {
+    "small (scalars only)": (0, 0),
+    "medium (5 x 1k steps)": (5, 1_000),
+    "large (10 x 50k steps)": (10, 50_000),
+}
+
+
+def bench(fn, repeat: int) -> float:
+    """Return the best time per call in milliseconds"""
+    number = max(1, repeat)
+    return min(timeit.repeat(fn, number=number, repeat=3)) / number * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=20, help="calls per measurement")
+    args = parser.parse_args()
+
+    previous = serialization.get_json_backend()
+    print(f"{'document':<24} {'backend':<14} {'size KB':>8} "
+          f"{'dumps ms':>9} {'pretty ms':>10} {'loads ms':>9}")
+    for label, (n_series, n_steps) in SIZES.items():
+        summary = make_summary(n_series, n_steps)
+        repeat = args.repeat if n_steps < 10_000 else max(1, args.repeat // 10)
+
+        legacy = json.dumps(summary, indent=4, ensure_ascii=False)
+        print(f"{label:<24} {'json indent=4':<14} {len(legacy) / 1024:>8.1f} "
+              f"{bench(lambda: json.dumps(summary, indent=4, ensure_ascii=False), repeat):>9.2f} "
+              f"{'-':>10} {bench(lambda: json.loads(legacy), repeat):>9.2f}")
+
+        for backend in serialization.available_backends():
+            serialization.set_json_backend(backend)
+            encoded = serialization.dumps(summary)
+            dumps_ms = bench(lambda: serialization.dumps(summary), repeat)
+            pretty_ms = bench(lambda: serialization.dumps(summary, pretty=True), repeat)
+            loads_ms = bench(lambda: serialization.loads(encoded), repeat)
+            print(f"{'':<24} {backend:<14} {len(encoded) / 1024:>8.1f} "
+                  f"{dumps_ms:>9.2f} {pretty_ms:>10.2f} {loads_ms:>9.2f}")
+    serialization.set_json_backend(previous)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,181 @@
+"""Measure the startup cost paid by every process that uses ORruns
+
+Usage:
+    pip install -e .
+    python benchmarks/bench_startup.py [--repeat N] [--workers 1,2,4] [--output FILE]
+
+Every measurement runs in a fresh interpreter, as a spawned worker would:
+
+- ``import``: wall time of ``python -c "import orruns"`` (and of the modules
+  workers import), next to a bare ``python -c pass``
+- ``import_breakdown``: slowest modules according to ``-X importtime``
+- ``first_tracker``: time from interpreter start to the first
+  ``ExperimentTracker``
+- ``first_parallel_run``: time from interpreter start until the first run
+  of a parallel batch with N workers has completed, and for the whole batch
+
+Results are printed as JSON so they can be compared across releases.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+MODULES = ("orruns", "orruns.tracker", "orruns.decorators")
+
+FIRST_TRACKER = """
+import json, sys, time
+start = time.perf_counter()
+from orruns.tracker import ExperimentTracker
+imported = time.perf_counter()
+ExperimentTracker("bench_startup", base_dir=sys.argv[1])
+done = time.perf_counter()
+print(json.dumps({"import_s": imported - start, "total_s": done - start}))
+"""
+
+FIRST_PARALLEL_RUN = """
+import json, sys, time
+start_wall, start = time.time(), time.perf_counter()
+from orruns import experiment_manager
+workers = int(sys.argv[2])
+
+@experiment_manager(times=workers, parallel=True, max_workers=workers, backend="process",
+                    storage=sys.argv[1], system_info_level="none", print_style="simple")
+def bench_startup(tracker):
+    return {"finished": time.time()}
+
+if __name__ == "__main__":
+    results = bench_startup()
+    done = time.perf_counter()
+    first = min(result["finished"] for result in results) - start_wall
+    print(json.dumps({"first_run_s": first, "batch_s": done - start}))
+"""
+
+
+def run_python(args, cwd=None):
+    """Run a fresh interpreter and return ``(wall seconds, completed process)``"""
+    start = time.perf_counter()
+    proc = subprocess.run([sys.executable, *args], cwd=cwd, capture_output=True,
+                          text=True, check=True)
+    return time.perf_counter() - start, proc
+
+
+def last_json_line(output: str) -> dict:
+    """Parse the JSON document printed last by a benchmark script"""
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def orruns_version():
+    """Installed ORruns version, or None when running from a checkout"""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:
+        return None
+    try:
+        return version("orruns")
+    except PackageNotFoundError:
+        return None
+
+
+def summarize(values) -> dict:
+    return {"min": min(values), "median": statistics.median(values), "max": max(values)}
+
+
+def bench_imports(repeat: int) -> dict:
+    """Wall time of fresh interpreters importing each module"""
+    baseline = [run_python(["-c", "pass"])[0] for _ in range(repeat)]
+    results = {"python -c pass": summarize(baseline)}
+    for module in MODULES:
+        times = [run_python(["-c", f"import {module}"])[0] for _ in range(repeat)]
+        results[module] = summarize(times)
+        results[module]["overhead_s"] = statistics.median(times) - statistics.median(baseline)
+    return results
+
+
+def bench_import_breakdown(module: str, top: int) -> dict:
+    """Slowest modules imported by ``module`` according to ``-X importtime``"""
+    _, proc = run_python(["-X", "importtime", "-c", f"import {module}"])
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative_us, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # header line
+        entries.append({"module": name.strip(), "self_s": int(self_us) / 1e6,
+                        "cumulative_s": int(cumulative_us) / 1e6,
+                        "depth": len(name) - len(name.lstrip())})
+    # Keep the modules imported by ``module`` itself, not interpreter startup:
+    # its nested imports are listed right before it with a deeper indentation
+    end = max(i for i, e in enumerate(entries) if e["module"] == module)
+    start = end
+    while start > 0 and entries[start - 1]["depth"] > entries[end]["depth"]:
+        start -= 1
+    entries = entries[start:end + 1]
+    for entry in entries:
+        del entry["depth"]
+    total = entries[-1]["cumulative_s"]
+    by_cumulative = sorted(entries, key=lambda e: e["cumulative_s"], reverse=True)
+    by_self = sorted(entries, key=lambda e: e["self_s"], reverse=True)
+    return {"module": module, "total_s": total, "n_modules": len(entries),
+            "slowest_cumulative": by_cumulative[:top], "slowest_self": by_self[:top]}
+
+
+def bench_first_tracker(repeat: int, workdir: str) -> dict:
+    """Time from interpreter start to the first tracker"""
+    runs = [last_json_line(run_python(["-c", FIRST_TRACKER, workdir])[1].stdout)
+            for _ in range(repeat)]
+    return {key: summarize([run[key] for run in runs]) for key in runs[0]}
+
+
+def bench_first_parallel_run(workers, workdir: str) -> dict:
+    """Time until the first run of a parallel batch completes, per worker count"""
+    script = os.path.join(workdir, "first_parallel_run.py")
+    with open(script, "w") as f:
+        f.write(FIRST_PARALLEL_RUN)
+    results = {}
+    for n in workers:
+        _, proc = run_python([script, os.path.join(workdir, "runs"), str(n)], cwd=workdir)
+        results[str(n)] = last_json_line(proc.stdout)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--repeat", type=int, default=5, help="fresh interpreters per measurement")
+    parser.add_argument("--workers", default="1,2,4",
+                        help="comma-separated worker counts for the parallel run")
+    parser.add_argument("--top", type=int, default=15, help="modules listed in the breakdown")
+    parser.add_argument("--output", help="write the JSON report to this file")
+    args = parser.parse_args()
+    workers = [int(n) for n in args.workers.split(",") if n]
+
+    with tempfile.TemporaryDirectory() as workdir:
+        report = {
+            "environment": {
+                "python": platform.python_version(),
+                "implementation": platform.python_implementation(),
+                "platform": platform.platform(),
+                "cpu_count": os.cpu_count(),
+                "orruns": orruns_version(),
+                "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+            },
+            "import": bench_imports(args.repeat),
+            "import_breakdown": [bench_import_breakdown(module, args.top) for module in MODULES],
+            "first_tracker": bench_first_tracker(args.repeat, workdir),
+            "first_parallel_run": bench_first_parallel_run(workers, workdir),
+        }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    print(text)
+
+
+if __name__ == "__main__":
+    main()
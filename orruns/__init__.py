@@ -10,14 +10,7 @@ Email: ffxdd@163.com
 License: GPL-3.0
 """
 
-from .tracker import ExperimentTracker
-from .decorators import experiment_manager
-from .visualization import ExperimentDashboard
-from .config import ExperimentConfig
-from .api.experiment import ExperimentAPI
-from .core.config import Config
-from .utils.utils import *  # 如果 utils.py 中有需要导出的工具函数
-
+import importlib
 
 __version__ = "0.1.2"
 __all__ = [
@@ -26,5 +19,48 @@ __all__ = [
     'ExperimentTracker',
     'ExperimentDashboard',
     'ExperimentConfig',
-    'experiment_manager'
-]
\ No newline at end of file
+    'experiment_manager',
+    'WorkerPool',
+    'StorageTarget'
+]
+
+# Public names and the modules defining them, imported on first access
+# (PEP 562) so that ``import orruns`` and worker processes stay light
+# 公开名称及其定义模块，首次访问时才导入（PEP 562），使 ``import orruns`` 和工作进程保持轻量
+_LAZY_ATTRIBUTES = {
+    'ExperimentAPI': '.api.experiment',
+    'Config': '.core.config',
+    'ExperimentTracker': '.tracker',
+    'ExperimentDashboard': '.visualization',
+    'ExperimentConfig': '.config',
+    'experiment_manager': '.decorators',
+    'WorkerPool': '.core.pool',
+    'StorageTarget': '.core.storage',
+    # Formerly re-exported with ``from .utils.utils import *``
+    # 以前通过 ``from .utils.utils import *`` 重新导出
+    'get_system_info': '.utils.utils',
+    'print_system_info': '.utils.utils',
+    'clear_system_info_cache': '.utils.utils',
+    'SYSTEM_INFO_CACHE_DIR': '.utils.utils',
+    'SYSTEM_INFO_CACHE_VERSION': '.utils.utils',
+    'FINGERPRINT_PACKAGES': '.utils.utils',
+}
+
+# Subpackages that the eager imports used to make available as attributes
+# 以前的立即导入使其可作为属性访问的子模块
+_LAZY_SUBMODULES = ('api', 'config', 'core', 'decorators', 'tracker', 'utils', 'visualization')
+
+
+def __getattr__(name):
+    if name in _LAZY_SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    module = _LAZY_ATTRIBUTES.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_LAZY_ATTRIBUTES) | set(_LAZY_SUBMODULES))
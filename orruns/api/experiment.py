@@ -8,7 +8,7 @@ from matplotlib.figure import Figure
 
 from ..core.config import Config
 from ..tracker import ExperimentTracker
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Iterator
 from pathlib import Path
 from datetime import datetime, timedelta
 import fnmatch
@@ -16,6 +16,8 @@ import json
 import pandas as pd
 from matplotlib.figure import Figure
 
+from ..core import serialization
+from ..core.cache import get_summary_cache
 from ..core.config import Config
 from ..tracker import ExperimentTracker
 
@@ -76,6 +78,15 @@ class ExperimentAPI:
             **filters
         )
 
+    def iter_experiments(self, **filters) -> Iterator[Dict]:
+        """Lazily iterate over experiments matching the filters"""
+        parameter_filters = filters.get('parameter_filters', {})
+        self._validate_filters(parameter_filters)
+        return ExperimentTracker.iter_experiments(
+            base_dir=self.config.get_data_dir(),
+            **filters
+        )
+
     def delete_experiment(self, experiment_name: str, run_id: Optional[str] = None) -> None:
         """Delete experiment or specific run"""
         ExperimentTracker.delete_experiment(
@@ -123,15 +134,11 @@ class ExperimentAPI:
                 filters={"name__eq": name},
                 sort_by="timestamp",
                 sort_ascending=False,
-                limit=1
+                limit=1,
+                fields=[f"metrics.{k}" for k in metrics] if metrics else ["metrics"]
             )
             if exps:
-                exp_data = exps[0]
-                if metrics:
-                    results[name] = {k: exp_data['metrics'][k] 
-                                   for k in metrics if k in exp_data['metrics']}
-                else:
-                    results[name] = exp_data['metrics']
+                results[name] = exps[0].get('metrics', {})
         return results
 
     def get_experiment_history(self, experiment_name: str) -> List[Dict]:
@@ -199,6 +206,14 @@ class ExperimentAPI:
                 deleted.append(exp['name'])
         return deleted
 
+    def rebuild_index(self) -> int:
+        """Rebuild the SQLite run index used to speed up queries"""
+        return ExperimentTracker.rebuild_index(base_dir=self.config.get_data_dir())
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Hit/miss counters of the process-wide summary cache"""
+        return get_summary_cache().stats()
+
     #########################
     # Internal Helpers      #
     #########################
@@ -218,6 +233,8 @@ class ExperimentAPI:
             content.to_csv(path)
         elif isinstance(content, Figure):
             content.savefig(path)
+        elif isinstance(content, (dict, list)):
+            serialization.dump(content, path)
         elif isinstance(content, bytes):
             path.write_bytes(content)
         else:
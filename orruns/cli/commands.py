@@ -1,4 +1,4 @@
-from typing import Dict, List, Optional, Any, Union
+from typing import Dict, List, Optional, Any, Union, Iterator
 from pathlib import Path
 from datetime import datetime, timedelta
 import fnmatch
@@ -6,6 +6,8 @@ import json
 import pandas as pd
 from matplotlib.figure import Figure
 
+from ..core import serialization
+from ..core.cache import get_summary_cache
 from ..core.config import Config
 from ..tracker import ExperimentTracker
 
@@ -132,6 +134,9 @@ class ExperimentAPI:
                 - sort_by: Field to sort by ("field" or "parameters.field" or "metrics.field")
                 - sort_ascending: Sort direction
                 - limit: Maximum number of results
+                - fields: Only return these fields ("field" or "parameters.field" or "metrics.field")
+                - workers: Number of threads reading run directories in parallel
+                - parse_processes: Parse summaries in a process pool
                 
         Returns:
             List of matching experiment dictionaries
@@ -182,13 +187,64 @@ class ExperimentAPI:
                 metric_filters=metric_filters,
                 sort_by=sort_by,
                 sort_ascending=filters.get('sort_ascending', True),
-                limit=filters.get('limit')
+                limit=filters.get('limit'),
+                fields=filters.get('fields'),
+                workers=filters.get('workers', 1),
+                parse_processes=filters.get('parse_processes', False)
             )
         except ValueError as e:
             raise ValueError(f"Invalid filter format: {str(e)}")
         except Exception as e:
             raise RuntimeError(f"Failed to query experiments: {str(e)}")
 
+    def iter_experiments(self, **filters) -> Iterator[Dict]:
+        """Lazily iterate over experiments matching the filters
+        
+        Accepts the same filters as ``query_experiments`` but yields matching
+        runs one at a time. Reading stops once ``limit`` runs have been
+        produced, and with ``sort_by`` only the best ``limit`` runs are kept
+        in memory.
+        
+        Args:
+            **filters: Filter parameters (see ``query_experiments``)
+                
+        Returns:
+            Iterator over matching experiment dictionaries
+            
+        Raises:
+            ValueError: If filter format is invalid
+            
+        Examples:
+            >>> for exp in api.iter_experiments(
+            ...     metric_filters={"accuracy__gte": 0.9},
+            ...     sort_by="metrics.accuracy",
+            ...     sort_ascending=False,
+            ...     limit=10
+            ... ):
+            ...     print(exp["run_id"])
+        """
+        # 在开始迭代之前验证过滤器
+        # Validate filters before iteration starts
+        try:
+            self._validate_filters(filters.get('filters', {}))
+            self._validate_filters(filters.get('parameter_filters', {}))
+            self._validate_filters(filters.get('metric_filters', {}))
+        except ValueError as e:
+            raise ValueError(f"Invalid filter format: {str(e)}")
+
+        return ExperimentTracker.iter_experiments(
+            base_dir=self.config.get_data_dir(),
+            filters=filters.get('filters', {}),
+            parameter_filters=filters.get('parameter_filters', {}),
+            metric_filters=filters.get('metric_filters', {}),
+            sort_by=filters.get('sort_by'),
+            sort_ascending=filters.get('sort_ascending', True),
+            limit=filters.get('limit'),
+            fields=filters.get('fields'),
+            workers=filters.get('workers', 1),
+            parse_processes=filters.get('parse_processes', False)
+        )
+
     def delete_experiment(self, experiment_name: str, run_id: Optional[str] = None) -> None:
         """Delete experiment or specific run
         
@@ -299,16 +355,22 @@ class ExperimentAPI:
             RuntimeError: If comparison fails
         """
         try:
+            # 只加载需要比较的指标
+            # Only load the metrics being compared
+            fields = [f"metrics.{k}" for k in metrics] if metrics else ["metrics"]
             results = {}
             for name in experiment_names:
-                exp_data = self.get_experiment(name)
-                if metrics:
-                    results[name] = {
-                        k: exp_data['metrics'][k] 
-                        for k in metrics if k in exp_data['metrics']
-                    }
-                else:
-                    results[name] = exp_data['metrics']
+                latest = ExperimentTracker.query_experiments(
+                    base_dir=self.config.get_data_dir(),
+                    filters={"name__eq": name},
+                    sort_by="timestamp",
+                    sort_ascending=False,
+                    limit=1,
+                    fields=fields
+                )
+                if not latest:
+                    raise FileNotFoundError(f"Experiment '{name}' not found")
+                results[name] = latest[0].get('metrics', {})
             return results
         except FileNotFoundError:
             raise  # Re-raise FileNotFoundError from get_experiment
@@ -439,6 +501,34 @@ class ExperimentAPI:
         except Exception as e:
             raise RuntimeError(f"Failed to clean old experiments: {str(e)}")
 
+    def rebuild_index(self) -> int:
+        """Rebuild the SQLite run index from the experiment directory
+        
+        Once built, the index is kept up to date by every tracker writing to
+        the data directory and is used by all queries.
+        
+        Returns:
+            Number of indexed runs
+            
+        Raises:
+            RuntimeError: If rebuilding the index fails
+        """
+        try:
+            return ExperimentTracker.rebuild_index(base_dir=self.config.get_data_dir())
+        except Exception as e:
+            raise RuntimeError(f"Failed to rebuild index: {str(e)}")
+
+    def cache_stats(self) -> Dict[str, int]:
+        """Get statistics of the process-wide summary cache
+        
+        Summaries read by queries are cached in memory and only parsed again
+        when the file on disk changes.
+        
+        Returns:
+            Dictionary with hits, misses, evictions, entries and bytes
+        """
+        return get_summary_cache().stats()
+
     # 内部辅助方法 (Internal Helper Methods)
     def _validate_filters(self, filters: Dict[str, Any]) -> None:
         """Validate filter format and operators
@@ -477,6 +567,8 @@ class ExperimentAPI:
                 content.to_csv(path)
             elif isinstance(content, Figure):
                 content.savefig(path)
+            elif isinstance(content, (dict, list)):
+                serialization.dump(content, path)
             elif isinstance(content, bytes):
                 path.write_bytes(content)
             else:
@@ -0,0 +1,277 @@
+import contextlib
+import multiprocessing as mp
+import os
+import pathlib
+import sys
+import threading
+import time
+import warnings
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Union
+
+import psutil
+
+PLACEMENT_MODES = ("core", "numa")
+
+# Environment variables read by common BLAS / OpenMP runtimes
+# 常见 BLAS / OpenMP 运行库读取的环境变量
+BLAS_ENV_VARS = (
+    "OMP_NUM_THREADS",
+    "OPENBLAS_NUM_THREADS",
+    "MKL_NUM_THREADS",
+    "BLIS_NUM_THREADS",
+    "VECLIB_MAXIMUM_THREADS",
+    "NUMEXPR_NUM_THREADS",
+)
+
+_NODE_DIR = pathlib.Path("/sys/devices/system/node")
+
+CpuAffinity = Union[str, Sequence[Sequence[int]], None]
+
+# Placement of the current worker process and the WorkerPlacement that
+# placed it (set by WorkerPlacement.apply)
+# 当前工作进程的放置信息以及放置它的 WorkerPlacement（由 WorkerPlacement.apply 设置）
+_current_placement: Optional[Dict[str, Any]] = None
+_worker_placement: Optional["WorkerPlacement"] = None
+
+# Seconds a start task waits for the other workers of its executor
+# 启动任务等待同一执行器中其他工作进程的秒数
+START_TIMEOUT = 60.0
+
+# Serializes changes to os.environ while workers are started
+# 启动工作进程期间串行化对 os.environ 的修改
+_environ_lock = threading.Lock()
+
+
+def parse_cpu_list(text: str) -> List[int]:
+    """Parse a kernel CPU list such as ``"0-3,8-11"``
+    解析内核CPU列表，例如 ``"0-3,8-11"``"""
+    cpus = []
+    for part in text.strip().split(","):
+        if not part:
+            continue
+        if "-" in part:
+            start, end = part.split("-")
+            cpus.extend(range(int(start), int(end) + 1))
+        else:
+            cpus.append(int(part))
+    return cpus
+
+
+def available_cpus() -> List[int]:
+    """CPUs this process may run on
+    本进程可以使用的CPU"""
+    if hasattr(os, "sched_getaffinity"):
+        return sorted(os.sched_getaffinity(0))
+    return list(range(os.cpu_count() or 1))
+
+
+def numa_nodes() -> List[List[int]]:
+    """Available CPUs grouped by NUMA node (a single group if unknown)
+    按NUMA节点分组的可用CPU（未知时为单个分组）"""
+    available = set(available_cpus())
+    nodes = []
+    for path in sorted(_NODE_DIR.glob("node[0-9]*/cpulist"),
+                       key=lambda p: int(p.parent.name[4:])):
+        try:
+            cpus = [cpu for cpu in parse_cpu_list(path.read_text()) if cpu in available]
+        except (OSError, ValueError):
+            continue
+        if cpus:
+            nodes.append(cpus)
+    return nodes or [sorted(available)]
+
+
+def plan_placement(cpu_affinity: CpuAffinity,
+                   nodes: Optional[List[List[int]]] = None) -> List[List[int]]:
+    """CPU sets handed out to workers in start order
+    按启动顺序分配给工作进程的CPU集合
+
+    Args:
+        cpu_affinity: ``"core"`` (one core per worker, alternating between
+            NUMA nodes), ``"numa"`` (all cores of one node per worker) or an
+            explicit list of CPU sets
+        nodes: CPUs per NUMA node (default: detected)
+    """
+    if isinstance(cpu_affinity, str):
+        if cpu_affinity not in PLACEMENT_MODES:
+            raise ValueError(
+                f"cpu_affinity must be one of {PLACEMENT_MODES} or a list of CPU sets, "
+                f"got {cpu_affinity!r}"
+            )
+        nodes = nodes if nodes is not None else numa_nodes()
+        if cpu_affinity == "numa":
+            return [list(node) for node in nodes]
+        # Interleave nodes so consecutive workers use different sockets
+        # 交错分配节点，使相邻工作进程使用不同的CPU插槽
+        longest = max(len(node) for node in nodes)
+        return [[node[i]] for i in range(longest) for node in nodes if i < len(node)]
+    slots = [[int(cpu) for cpu in cpus] for cpus in cpu_affinity]
+    if not slots or not all(slots):
+        raise ValueError("cpu_affinity must contain non-empty CPU sets")
+    return slots
+
+
+def limit_blas_threads(n_threads: int) -> bool:
+    """Limit the threads of BLAS / OpenMP libraries in this process
+    限制本进程中 BLAS / OpenMP 库的线程数
+
+    The environment variables only affect libraries loaded afterwards;
+    already loaded ones are limited with threadpoolctl when it is installed.
+
+    Returns:
+        Whether the limit is in effect: the variables were already set when
+        the process started, NumPy is not loaded yet or threadpoolctl applied
+        the limit
+    """
+    value = str(n_threads)
+    inherited = all(os.environ.get(name) == value for name in BLAS_ENV_VARS)
+    for name in BLAS_ENV_VARS:
+        os.environ[name] = value
+    if inherited:
+        return True
+    try:
+        from threadpoolctl import threadpool_limits
+    except ImportError:
+        return "numpy" not in sys.modules
+    threadpool_limits(n_threads)
+    return True
+
+
+@contextlib.contextmanager
+def blas_environment(n_threads: int) -> Iterator[None]:
+    """Set the BLAS thread variables in this process for the duration of the block
+    在代码块执行期间于本进程中设置 BLAS 线程环境变量
+
+    Processes started inside the block inherit the variables, so the
+    limit applies to libraries they load before any initializer runs
+    (such as NumPy imported by the main module of a spawned worker).
+    """
+    with _environ_lock:
+        saved = {name: os.environ.get(name) for name in BLAS_ENV_VARS}
+        for name in BLAS_ENV_VARS:
+            os.environ[name] = str(n_threads)
+        try:
+            yield
+        finally:
+            for name, value in saved.items():
+                if value is None:
+                    os.environ.pop(name, None)
+                else:
+                    os.environ[name] = value
+
+
+def _pid_alive(pid: int) -> bool:
+    """Whether a process exists and has not exited
+    进程是否存在且尚未退出"""
+    try:
+        return psutil.Process(pid).status() != psutil.STATUS_ZOMBIE
+    except psutil.Error:
+        return False
+
+
+def _wait_for_workers(count: int) -> None:
+    """Start task: keep this worker busy until ``count`` workers were placed
+    启动任务：使本工作进程保持忙碌，直到放置了 ``count`` 个工作进程"""
+    deadline = time.monotonic() + START_TIMEOUT
+    while (_worker_placement is not None and _worker_placement.started < count
+           and time.monotonic() < deadline):
+        time.sleep(0.01)
+
+
+def current_placement() -> Optional[Dict[str, Any]]:
+    """Placement of the current worker process, or None if it was not placed
+    当前工作进程的放置信息，未放置时为None"""
+    return _current_placement
+
+
+class WorkerPlacement:
+    """Pin worker processes to CPU sets as they start
+    在工作进程启动时将其绑定到CPU集合
+
+    Pass the placement to the worker initializer and call ``apply`` there:
+    every worker takes the first slot of the plan not held by a live
+    worker (sharing slots in turn when there are more workers than slots),
+    pins itself with ``os.sched_setaffinity`` and optionally limits its
+    BLAS threads. Slots of exited workers are handed out again, so a
+    placement can be reused by executors that replace each other.
+
+    When ``blas_threads`` is set, call ``start_workers`` right after
+    creating the executor so the limit is in the environment of every
+    worker from its start.
+
+    Args:
+        cpu_affinity: See ``plan_placement``; None leaves affinity unchanged
+        blas_threads: Maximum BLAS / OpenMP threads per worker
+    """
+    def __init__(self, cpu_affinity: CpuAffinity = None, blas_threads: Optional[int] = None):
+        if blas_threads is not None and blas_threads < 1:
+            raise ValueError("blas_threads must be at least 1")
+        self.slots = plan_placement(cpu_affinity) if cpu_affinity is not None else None
+        self.blas_threads = blas_threads
+        self.nodes = numa_nodes() if self.slots is not None else None
+        ctx = mp.get_context("spawn")
+        # Workers placed so far, and the pid of the worker holding each slot
+        # 目前已放置的工作进程数，以及持有每个槽位的工作进程 pid
+        self._counter = ctx.Value("i", 0)
+        self._owners = ctx.Array("i", len(self.slots) if self.slots is not None else 0)
+
+    @property
+    def started(self) -> int:
+        """Number of workers placed so far
+        目前已放置的工作进程数"""
+        return self._counter.value
+
+    def _claim_slot(self) -> int:
+        """Take a slot for the calling worker (call under the counter lock)"""
+        for slot, pid in enumerate(self._owners):
+            if pid == 0 or not _pid_alive(pid):
+                self._owners[slot] = os.getpid()
+                return slot
+        # More live workers than slots: share them in start order
+        # 存活的工作进程多于槽位：按启动顺序共享
+        return self._counter.value % len(self._owners)
+
+    def start_workers(self, executor, max_workers: int) -> None:
+        """Start all workers of ``executor`` with the BLAS limit in their environment
+        启动 ``executor`` 的所有工作进程，并在其环境中设置 BLAS 限制
+
+        Each start task waits until ``max_workers`` workers were placed, so
+        no worker is idle and every submit starts a new process while the
+        variables are set.
+        """
+        if self.blas_threads is None:
+            return
+        count = self.started + max_workers
+        with blas_environment(self.blas_threads):
+            for _ in range(max_workers):
+                executor.submit(_wait_for_workers, count)
+
+    def apply(self) -> Dict[str, Any]:
+        """Place the calling worker process
+        放置调用此方法的工作进程"""
+        global _current_placement, _worker_placement
+        with self._counter.get_lock():
+            slot = self._claim_slot() if self.slots is not None else self._counter.value
+            self._counter.value += 1
+        placement = {"worker_slot": slot}
+        if self.slots is not None:
+            cpus = self.slots[slot]
+            if hasattr(os, "sched_setaffinity"):
+                os.sched_setaffinity(0, cpus)
+            placement["cpus"] = cpus
+            node = next((i for i, node in enumerate(self.nodes) if cpus[0] in node), None)
+            if node is not None:
+                placement["numa_node"] = node
+        if self.blas_threads is not None:
+            if limit_blas_threads(self.blas_threads):
+                placement["blas_threads"] = self.blas_threads
+            else:
+                warnings.warn(
+                    f"Cannot limit BLAS threads to {self.blas_threads} in worker "
+                    f"{os.getpid()}: NumPy was loaded before the limit was set and "
+                    "threadpoolctl is not installed",
+                    RuntimeWarning
+                )
+        _current_placement = placement
+        _worker_placement = self
+        return placement
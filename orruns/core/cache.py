@@ -0,0 +1,140 @@
+import os
+import pathlib
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple, Union
+
+from . import serialization
+
+
+def copy_document(value: Any) -> Any:
+    """Deep copy a parsed JSON document
+    深拷贝已解析的JSON文档
+
+    Only dicts and lists are copied, which is all JSON produces, so this is
+    much cheaper than ``copy.deepcopy``.
+    """
+    if isinstance(value, dict):
+        return {key: copy_document(item) for key, item in value.items()}
+    if isinstance(value, list):
+        return [copy_document(item) for item in value]
+    return value
+
+
+class SummaryCache:
+    """Process-wide LRU cache of parsed summary.json documents
+    进程级的已解析summary.json文档LRU缓存
+
+    Entries are keyed by path and validated against the file's
+    ``(st_mtime_ns, st_size, st_ino)`` on every lookup, so a summary is only
+    parsed again after it has actually been rewritten. Memory is bounded by
+    the number of entries and by the total size of the cached files.
+
+    Every lookup returns a deep copy of the cached document, so callers may
+    modify what they get without affecting later readers.
+
+    Args:
+        max_entries: Maximum number of cached summaries
+        max_bytes: Maximum total size (in file bytes) of cached summaries
+    """
+    def __init__(self, max_entries: int = 10000, max_bytes: int = 256 * 1024 * 1024):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def load(self, path: Union[str, pathlib.Path]) -> Dict:
+        """Load a summary, parsing it only if it changed since the last load
+        加载摘要，仅在文件变化后重新解析"""
+        signature, document = self.lookup(path)
+        if document is not None:
+            return document
+        with open(path, 'rb') as f:
+            document = serialization.loads(f.read())
+        self.store(path, signature, document)
+        return copy_document(document)
+
+    def lookup(self, path: Union[str, pathlib.Path]) -> Tuple[Tuple[int, int, int], Optional[Dict]]:
+        """Return the file signature and the cached document if it is current
+        返回文件签名，以及仍然有效的缓存文档（否则为None）"""
+        key = os.fspath(path)
+        st = os.stat(key)
+        signature = (st.st_mtime_ns, st.st_size, st.st_ino)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or entry[0] != signature:
+                self.misses += 1
+                return signature, None
+            self._entries.move_to_end(key)
+            self.hits += 1
+        # Copy outside the lock so concurrent readers are not serialized
+        # 在锁外拷贝，避免并发读取被串行化
+        return signature, copy_document(entry[1])
+
+    def store(self, path: Union[str, pathlib.Path], signature: Tuple[int, int, int],
+              document: Dict) -> None:
+        """Cache a document parsed from the file version ``signature``
+        缓存从签名为 ``signature`` 的文件版本解析出的文档"""
+        key = os.fspath(path)
+        size = signature[1]
+        with self._lock:
+            self._discard(key)
+            if size <= self.max_bytes:
+                self._entries[key] = (signature, document)
+                self._bytes += size
+                while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                    self._discard(next(iter(self._entries)))
+                    self.evictions += 1
+
+    def _discard(self, key: str) -> None:
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self._bytes -= entry[0][1]
+
+    def invalidate(self, path: Union[str, pathlib.Path]) -> None:
+        """Drop a single entry
+        删除单个缓存条目"""
+        with self._lock:
+            self._discard(os.fspath(path))
+
+    def clear(self) -> None:
+        """Drop all entries and reset the counters
+        清空所有条目并重置计数器"""
+        with self._lock:
+            self._entries.clear()
+            self._bytes = 0
+            self.hits = self.misses = self.evictions = 0
+
+    def stats(self) -> Dict[str, int]:
+        """Return hit/miss counters and current usage
+        返回命中/未命中计数和当前占用"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+            }
+
+
+_summary_cache = SummaryCache()
+
+
+def get_summary_cache() -> SummaryCache:
+    """Return the process-wide summary cache
+    返回进程级摘要缓存"""
+    return _summary_cache
+
+
+def load_summary(path: Union[str, pathlib.Path]) -> Dict:
+    """Load a summary.json through the process-wide cache
+    通过进程级缓存加载summary.json
+
+    Returns a deep copy that the caller owns and may modify.
+    """
+    return _summary_cache.load(path)
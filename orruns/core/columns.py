@@ -0,0 +1,186 @@
+import pathlib
+import struct
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import quote
+
+import numpy as np
+
+from .series import StepSeries
+
+COLUMNS_DIR = "columns"
+COLUMN_KEY = "__column__"
+
+# Fixed header size so the shape can be rewritten in place when appending
+# 固定头部大小，以便追加数据时原地重写数组形状
+_HEADER_SIZE = 128
+_MAGIC = b"\x93NUMPY\x01\x00"
+_STEP_DTYPE = np.dtype(np.int64)
+_DTYPES = {"q": np.dtype(np.int64), "d": np.dtype(np.float64)}
+
+MetricPath = Tuple[str, ...]
+
+
+def _npy_header(dtype: np.dtype, length: int) -> bytes:
+    """Build a version 1.0 ``.npy`` header of exactly ``_HEADER_SIZE`` bytes"""
+    header = "{'descr': %r, 'fortran_order': False, 'shape': (%d,), }" % (dtype.str, length)
+    header = header.ljust(_HEADER_SIZE - len(_MAGIC) - 2 - 1) + "\n"
+    return _MAGIC + struct.pack("<H", len(header)) + header.encode("latin1")
+
+
+def column_name(path: MetricPath) -> str:
+    """File stem of the column storing the metric at ``path``"""
+    return ".".join(quote(part, safe="").replace(".", "%2E") for part in path)
+
+
+def leaf_paths(metrics: Dict, prefix: MetricPath = ()) -> Iterator[MetricPath]:
+    """Yield the paths of all non-dict values of a (nested) metric update"""
+    for key, value in metrics.items():
+        if isinstance(value, dict):
+            yield from leaf_paths(value, prefix + (key,))
+        else:
+            yield prefix + (key,)
+
+
+def get_path(metrics: Dict, path: MetricPath) -> Any:
+    """Return the value at ``path`` or None"""
+    for key in path:
+        if not isinstance(metrics, dict):
+            return None
+        metrics = metrics.get(key)
+    return metrics
+
+
+class ColumnStore:
+    """Binary column files for the stepped metrics of a single run
+    单次运行中带步骤指标的二进制列文件
+
+    Every stepped metric is stored as two ``.npy`` files (steps and values)
+    in ``metrics/columns``. New points are appended in place and only the
+    fixed-size header is rewritten, so each write costs O(new points), and
+    readers memory-map the columns instead of parsing JSON lists.
+
+    Args:
+        directory: Directory holding the column files
+    """
+    def __init__(self, directory: Union[str, pathlib.Path]):
+        self.directory = pathlib.Path(directory)
+        # path -> (series, written length, written typecode)
+        self._state: Dict[MetricPath, Tuple[StepSeries, int, str]] = {}
+
+    def is_new(self, path: MetricPath, series: Any) -> bool:
+        """Whether ``series`` has not been written to a column yet
+        判断 ``series`` 是否尚未写入列文件"""
+        state = self._state.get(path)
+        return state is None or state[0] is not series
+
+    def snapshot(self, metrics: Dict, paths: List[MetricPath]) -> List[Tuple]:
+        """Collect the points not yet written (call under the tracker lock)
+        收集尚未写入的数据点（在追踪器锁内调用）"""
+        pending = []
+        for path in paths:
+            series = get_path(metrics, path)
+            if not isinstance(series, StepSeries):
+                continue
+            typecode = series.values.typecode
+            _, written, written_typecode = (
+                (None, 0, typecode) if self.is_new(path, series) else self._state[path]
+            )
+            if written_typecode != typecode:
+                # Integer column upgraded to float: rewrite it
+                # 整数列升级为浮点数：重写整列
+                written = 0
+            total = len(series)
+            if total == written:
+                continue
+            pending.append((
+                column_name(path), written, total, _DTYPES[typecode],
+                series.steps[written:].tobytes(), series.values[written:].tobytes()
+            ))
+            self._state[path] = (series, total, typecode)
+        return pending
+
+    def write(self, pending: List[Tuple]) -> None:
+        """Write a snapshot taken with ``snapshot``
+        写入 ``snapshot`` 获取的快照"""
+        if not pending:
+            return
+        self.directory.mkdir(parents=True, exist_ok=True)
+        for name, start, total, dtype, steps, values in pending:
+            self._write_file(self.directory / f"{name}.steps.npy", _STEP_DTYPE, start, total, steps)
+            self._write_file(self.directory / f"{name}.values.npy", dtype, start, total, values)
+
+    @staticmethod
+    def _write_file(path: pathlib.Path, dtype: np.dtype, start: int, total: int,
+                    data: bytes) -> None:
+        if start == 0 or not path.exists():
+            with open(path, "wb") as f:
+                f.write(_npy_header(dtype, total))
+                f.write(data)
+            return
+        with open(path, "r+b") as f:
+            # Data first, then the header: readers never see a length
+            # beyond the data on disk
+            # 先写数据再写头部：读取方看到的长度永远不会超过磁盘上的数据
+            f.seek(_HEADER_SIZE + start * dtype.itemsize)
+            f.write(data)
+            f.seek(0)
+            f.write(_npy_header(dtype, total))
+
+    @staticmethod
+    def pointer(path: MetricPath, series: StepSeries) -> Dict[str, Any]:
+        """Summary entry referencing the column of ``series``
+        引用 ``series`` 列文件的摘要条目"""
+        return {
+            COLUMN_KEY: f"{COLUMNS_DIR}/{column_name(path)}",
+            "length": len(series),
+            "last": series.values[-1] if len(series) else None,
+        }
+
+
+def to_pointers(metrics: Dict, prefix: MetricPath = ()) -> Dict:
+    """Return a copy of a metric tree with every StepSeries replaced by a column pointer
+    返回指标树的副本，其中所有 StepSeries 均替换为列指针"""
+    result = {}
+    for key, value in metrics.items():
+        if isinstance(value, StepSeries):
+            result[key] = ColumnStore.pointer(prefix + (key,), value)
+        elif isinstance(value, dict):
+            result[key] = to_pointers(value, prefix + (key,))
+        else:
+            result[key] = value
+    return result
+
+
+def is_pointer(value: Any) -> bool:
+    """Whether ``value`` is a column pointer
+    判断 ``value`` 是否为列指针"""
+    return isinstance(value, dict) and COLUMN_KEY in value
+
+
+def load_columns(metrics: Dict, metrics_dir: Union[str, pathlib.Path],
+                 mmap_mode: Optional[str] = "r") -> Dict:
+    """Replace column pointers by ``{"steps", "values", "length", "last"}`` entries
+    将列指针替换为 ``{"steps", "values", "length", "last"}`` 条目
+
+    Columns are memory-mapped read-only by default, so nothing is copied
+    until the values are actually used. The ``length`` and ``last`` value
+    are taken from the column files rather than from the pointer, which
+    may predate points appended to an open run.
+    """
+    metrics_dir = pathlib.Path(metrics_dir)
+    result = {}
+    for key, value in metrics.items():
+        if is_pointer(value):
+            stem = metrics_dir / value[COLUMN_KEY]
+            values = np.load(f"{stem}.values.npy", mmap_mode=mmap_mode)
+            result[key] = {
+                "steps": np.load(f"{stem}.steps.npy", mmap_mode=mmap_mode),
+                "values": values,
+                "length": len(values),
+                "last": values[-1].item() if len(values) else None,
+            }
+        elif isinstance(value, dict):
+            result[key] = load_columns(value, metrics_dir, mmap_mode)
+        else:
+            result[key] = value
+    return result
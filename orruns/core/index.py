@@ -0,0 +1,395 @@
+import pathlib
+import sqlite3
+from typing import Any, Dict, Iterator, List, Optional, Tuple, Union
+
+from . import serialization
+from .columns import is_pointer
+from .query import parse_filter_key
+from .storage import resolve_summary
+
+INDEX_FILE = ".orruns_index.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_key TEXT PRIMARY KEY,
+    exp_dir TEXT NOT NULL,
+    run_dir TEXT NOT NULL,
+    has_summary INTEGER NOT NULL DEFAULT 0
+);
+CREATE TABLE IF NOT EXISTS fields (
+    run_key TEXT NOT NULL,
+    key TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    numeric INTEGER NOT NULL,
+    num REAL,
+    text TEXT,
+    value TEXT,
+    PRIMARY KEY (run_key, key)
+);
+CREATE INDEX IF NOT EXISTS runs_exp_dir ON runs (exp_dir);
+CREATE INDEX IF NOT EXISTS fields_num ON fields (key, num);
+CREATE INDEX IF NOT EXISTS fields_text ON fields (key, text);
+"""
+
+_COMPARATORS = {"eq": "=", "gt": ">", "lt": "<", "gte": ">=", "lte": "<="}
+
+
+def _to_float(value: Any) -> Tuple[bool, Optional[float]]:
+    """Mirror ``float(value)`` as used by the query filters"""
+    try:
+        return True, float(value)
+    except (TypeError, ValueError):
+        return False, None
+
+
+def _flatten(data: Dict, prefix: str = "") -> Iterator[Tuple[str, str, Any]]:
+    """Yield ``(dotted_key, kind, value)`` for every node of a summary
+
+    Dict nodes are yielded with kind ``"dict"`` and stepped metric series
+    or column pointers with kind ``"series"`` (their arrays are not indexed). Keys containing
+    dots cannot be addressed by the dotted filter syntax and are skipped.
+    """
+    for key, value in data.items():
+        if not isinstance(key, str) or "." in key:
+            continue
+        path = f"{prefix}{key}"
+        if isinstance(value, dict):
+            if ("steps" in value and "values" in value) or is_pointer(value):
+                yield path, "series", None
+            else:
+                yield path, "dict", None
+                yield from _flatten(value, f"{path}.")
+        elif isinstance(value, (bool, int, float)):
+            yield path, "num", value
+        elif isinstance(value, str):
+            yield path, "str", value
+        else:
+            yield path, "other", value
+
+
+class RunIndex:
+    """SQLite index of run summaries stored in the data directory
+    存储在数据目录中的运行摘要SQLite索引
+
+    Every summary field is flattened to a dotted key (``parameters.lr``,
+    ``metrics.validation.loss``, ``name``) so query filters can be executed
+    as indexed SQL instead of reading every ``summary.json``. The index is
+    a cache of the on-disk tree and can always be regenerated with
+    ``rebuild``.
+
+    Trackers register their run when it starts and write its fields when it
+    ends (or when its status is set from outside), so runs that are still
+    open are listed by ``open_runs`` and must be read from disk. Results
+    are ordered by experiment and run directory name, like a directory scan.
+
+    Args:
+        base_dir: Base directory for experiments
+    """
+    def __init__(self, base_dir: Union[str, pathlib.Path]):
+        self.base_dir = pathlib.Path(base_dir)
+        self.path = self.base_dir / INDEX_FILE
+        self._conn = None
+
+    @classmethod
+    def exists(cls, base_dir: Union[str, pathlib.Path]) -> bool:
+        """Whether an index has been created for ``base_dir``
+        判断 ``base_dir`` 是否已创建索引"""
+        return (pathlib.Path(base_dir) / INDEX_FILE).exists()
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.base_dir.mkdir(parents=True, exist_ok=True)
+            self._conn = sqlite3.connect(
+                str(self.path), timeout=30, check_same_thread=False
+            )
+            # The index can always be rebuilt, so trade durability for speed
+            # 索引总是可以重建，因此以持久性换取速度
+            self._conn.execute("PRAGMA synchronous=OFF")
+            self._conn.executescript(_SCHEMA)
+        return self._conn
+
+    def close(self) -> None:
+        """Close the database connection
+        关闭数据库连接"""
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+    # Updates / 更新
+    def register_run(self, experiment_name: str, run_id: str) -> None:
+        """Record a newly created run
+        记录新创建的运行"""
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR IGNORE INTO runs (run_key, exp_dir, run_dir) VALUES (?, ?, ?)",
+                (f"{experiment_name}/{run_id}", experiment_name, run_id)
+            )
+
+    def update_run(self, experiment_name: str, run_id: str, summary: Dict) -> None:
+        """Replace the indexed fields of a run with the given summary
+        用给定摘要替换运行的索引字段"""
+        with self.conn:
+            self._write_run(experiment_name, run_id, summary)
+
+    def _write_run(self, experiment_name: str, run_id: str, summary: Dict) -> None:
+        run_key = f"{experiment_name}/{run_id}"
+        self.conn.execute(
+            "INSERT OR REPLACE INTO runs (run_key, exp_dir, run_dir, has_summary) "
+            "VALUES (?, ?, ?, 1)",
+            (run_key, experiment_name, run_id)
+        )
+        self.conn.execute("DELETE FROM fields WHERE run_key = ?", (run_key,))
+        rows = []
+        for key, kind, value in _flatten(summary):
+            if kind in ("dict", "series"):
+                rows.append((run_key, key, kind, 0, None, None, None))
+                continue
+            numeric, num = _to_float(value)
+            rows.append((
+                run_key, key, kind, int(numeric),
+                None if num != num else num,  # NaN is stored as NULL
+                str(value), serialization.dumps(value).decode("utf-8")
+            ))
+        self.conn.executemany(
+            "INSERT INTO fields (run_key, key, kind, numeric, num, text, value) "
+            "VALUES (?, ?, ?, ?, ?, ?, ?)", rows
+        )
+
+    def remove_runs(self, experiment_name: str, run_id: Optional[str] = None) -> None:
+        """Remove a run or a whole experiment from the index
+        从索引中删除运行或整个实验"""
+        if run_id is not None:
+            where, args = "run_key = ?", (f"{experiment_name}/{run_id}",)
+        else:
+            where, args = "exp_dir = ?", (experiment_name,)
+        with self.conn:
+            self.conn.execute(
+                f"DELETE FROM fields WHERE run_key IN (SELECT run_key FROM runs WHERE {where})",
+                args
+            )
+            self.conn.execute(f"DELETE FROM runs WHERE {where}", args)
+
+    def rebuild(self) -> int:
+        """Regenerate the index from the on-disk tree
+        根据磁盘上的目录树重新生成索引
+
+        The write lock is taken before the tree is scanned, so concurrent
+        rebuilds and run updates are applied one after the other.
+
+        Returns:
+            Number of indexed runs
+        """
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            return self._rebuild()
+
+    def ensure_built(self) -> None:
+        """Build the index unless a complete build already exists
+        除非已存在完整构建，否则构建索引
+
+        Safe to call from several processes at once: only the first one to
+        take the write lock scans the tree.
+        """
+        if self.conn.execute("PRAGMA user_version").fetchone()[0]:
+            return
+        with self.conn:
+            self.conn.execute("BEGIN IMMEDIATE")
+            if not self.conn.execute("PRAGMA user_version").fetchone()[0]:
+                self._rebuild()
+
+    def _rebuild(self) -> int:
+        """Rebuild inside the caller's write transaction"""
+        # Runs registered but not ended stay open
+        # 已登记但尚未结束的运行保持为打开状态
+        open_runs = self.conn.execute(
+            "SELECT run_key, exp_dir, run_dir FROM runs WHERE has_summary = 0"
+        ).fetchall()
+        count = 0
+        self.conn.execute("DELETE FROM fields")
+        self.conn.execute("DELETE FROM runs")
+        if self.base_dir.exists():
+            for exp_dir in sorted(self.base_dir.iterdir()):
+                if not exp_dir.is_dir():
+                    continue
+                for run_dir in sorted(exp_dir.iterdir()):
+                    summary_file = run_dir / "summary.json"
+                    if not run_dir.is_dir() or not summary_file.exists():
+                        continue
+                    try:
+                        summary = resolve_summary(serialization.load(summary_file), run_dir)
+                    except Exception as e:
+                        print(f"Warning: Failed to index experiment file {summary_file}: {e}")
+                        continue
+                    self._write_run(exp_dir.name, run_dir.name, summary)
+                    count += 1
+        self.conn.executemany(
+            "INSERT OR IGNORE INTO runs (run_key, exp_dir, run_dir) VALUES (?, ?, ?)",
+            open_runs
+        )
+        self.conn.executemany(
+            "UPDATE runs SET has_summary = 0 WHERE run_key = ?",
+            [(run_key,) for run_key, _, _ in open_runs]
+        )
+        self.conn.execute("PRAGMA user_version = 1")
+        return count
+
+    # Queries / 查询
+    def query(self, filters: List[Tuple[str, Dict[str, Any]]],
+              sort_key: Optional[str] = None) -> Optional[List[Tuple[str, str, Any]]]:
+        """Find runs matching the given filters
+        查找匹配给定过滤器的运行
+
+        Args:
+            filters: ``(key_prefix, filters)`` pairs, e.g. ``("parameters.", {"lr__gt": 0.1})``
+            sort_key: Dotted key whose value is returned for sorting
+
+        Returns:
+            ``(exp_dir, run_dir, sort_value)`` tuples, or None if the query
+            cannot be answered exactly from the index
+        """
+        conditions, args = [], []
+        keys = []
+        for prefix, group in filters:
+            for filter_key, filter_value in (group or {}).items():
+                try:
+                    field, op = parse_filter_key(filter_key)
+                except ValueError:
+                    return None
+                key = f"{prefix}{field}"
+                condition = self._condition(op, filter_value)
+                if condition is None:
+                    return None
+                sql, cond_args = condition
+                conditions.append(
+                    "EXISTS (SELECT 1 FROM fields f WHERE f.run_key = r.run_key "
+                    f"AND f.key = ? AND ({sql}))"
+                )
+                args.extend([key, *cond_args])
+                keys.append(key)
+        if sort_key is not None:
+            keys.append(sort_key)
+        if not self._indexable(keys):
+            return None
+
+        select = "SELECT r.exp_dir, r.run_dir"
+        join = ""
+        join_args = []
+        if sort_key is not None:
+            select += ", s.value"
+            join = "LEFT JOIN fields s ON s.run_key = r.run_key AND s.key = ?"
+            join_args.append(sort_key)
+        sql = f"{select} FROM runs r {join} WHERE r.has_summary = 1"
+        if conditions:
+            sql += " AND " + " AND ".join(conditions)
+        # Same order as a directory scan (experiment, then run directory)
+        # 与目录扫描顺序相同（先按实验，再按运行目录）
+        sql += " ORDER BY r.exp_dir, r.run_dir"
+
+        rows = self.conn.execute(sql, join_args + args).fetchall()
+        if sort_key is None:
+            return [(exp_dir, run_dir, None) for exp_dir, run_dir in rows]
+        return [
+            (exp_dir, run_dir, None if value is None else serialization.loads(value))
+            for exp_dir, run_dir, value in rows
+        ]
+
+    def fetch(self, run_keys: List[str], keys: List[str]) -> Dict[str, Dict[str, Tuple[str, Any]]]:
+        """Read indexed field values without loading the summaries
+        不加载摘要直接读取索引中的字段值
+
+        Args:
+            run_keys: ``"experiment/run_id"`` keys of the runs to read
+            keys: Dotted keys to read
+
+        Returns:
+            ``{run_key: {key: (kind, value)}}`` for the keys present in the
+            index; ``value`` is None for ``"dict"`` and ``"series"`` nodes
+        """
+        result = {}
+        key_marks = ", ".join("?" for _ in keys)
+        # Stay well below SQLite's limit on bound parameters
+        # 保持在SQLite绑定参数数量限制以下
+        chunk_size = 500
+        for start in range(0, len(run_keys), chunk_size):
+            chunk = run_keys[start:start + chunk_size]
+            run_marks = ", ".join("?" for _ in chunk)
+            rows = self.conn.execute(
+                "SELECT run_key, key, kind, value FROM fields "
+                f"WHERE run_key IN ({run_marks}) AND key IN ({key_marks})",
+                [*chunk, *keys]
+            )
+            for run_key, key, kind, value in rows:
+                result.setdefault(run_key, {})[key] = (
+                    kind, None if value is None else serialization.loads(value)
+                )
+        return result
+
+    def open_runs(self) -> List[Tuple[str, str]]:
+        """Runs that were registered but whose tracker has not ended them yet
+        已登记但其追踪器尚未结束的运行
+
+        Returns:
+            ``(exp_dir, run_dir)`` tuples; the indexed fields of these runs,
+            if any, may be outdated
+        """
+        return self.conn.execute(
+            "SELECT exp_dir, run_dir FROM runs WHERE has_summary = 0"
+        ).fetchall()
+
+    def metric_log_offsets(self) -> Dict[str, int]:
+        """Metric log offset of every indexed run that uses a metric log
+        每个使用指标日志的已索引运行的日志偏移量
+
+        Returns:
+            ``{run_key: offset}``; metrics appended to the log after
+            ``offset`` are not reflected in the index
+        """
+        rows = self.conn.execute(
+            "SELECT run_key, value FROM fields WHERE key = 'metric_log_offset'"
+        )
+        return {run_key: serialization.loads(value) for run_key, value in rows}
+
+    def _indexable(self, keys: List[str]) -> bool:
+        """Whether all keys address scalar values in every indexed run"""
+        for key in keys:
+            parts = key.split(".")
+            prefixes = [".".join(parts[:i]) for i in range(1, len(parts))]
+            placeholders = ", ".join("?" for _ in prefixes) or "NULL"
+            row = self.conn.execute(
+                "SELECT 1 FROM fields WHERE (key = ? AND kind IN ('dict', 'series')) "
+                f"OR (key IN ({placeholders}) AND kind = 'series') LIMIT 1",
+                [key, *prefixes]
+            ).fetchone()
+            if row is not None:
+                return False
+        return True
+
+    @staticmethod
+    def _condition(op: str, filter_value: Any) -> Optional[Tuple[str, List[Any]]]:
+        """Translate a filter into SQL with the same semantics as ``match_value``"""
+        if op not in _COMPARATORS:
+            return "0", []
+        if op == "eq":
+            if isinstance(filter_value, (bool, int, float)):
+                return "f.kind = 'num' AND f.num = ?", [float(filter_value)]
+            if isinstance(filter_value, str):
+                return "f.kind = 'str' AND f.text = ?", [filter_value]
+            if filter_value is None:
+                return "f.kind = 'other' AND f.value = 'null'", []
+            return None
+
+        comparator = _COMPARATORS[op]
+        numeric, num = _to_float(filter_value)
+        text = str(filter_value)
+        if not numeric:
+            return f"f.text IS NOT NULL AND f.text {comparator} ?", [text]
+        if num != num:
+            # Comparisons with NaN are always false
+            # 与NaN的比较总是为假
+            return f"f.numeric = 0 AND f.text {comparator} ?", [text]
+        return (
+            f"(f.numeric = 1 AND f.num {comparator} ?) "
+            f"OR (f.numeric = 0 AND f.text IS NOT NULL AND f.text {comparator} ?)",
+            [num, text]
+        )
@@ -0,0 +1,13 @@
+import sys
+from typing import Any
+
+
+def loaded_instance(obj: Any, module: str, name: str) -> bool:
+    """``isinstance`` check against a class without importing its module
+    不导入模块的情况下检查对象是否为其中某个类的实例
+
+    An instance can only exist once its module has been imported, so checks
+    against pandas or matplotlib types do not need to import them.
+    """
+    loaded = sys.modules.get(module)
+    return loaded is not None and isinstance(obj, getattr(loaded, name))
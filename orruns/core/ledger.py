@@ -0,0 +1,188 @@
+import hashlib
+import pathlib
+import pickle
+import time
+import uuid
+from typing import Any, Dict, Optional, Tuple, Union
+
+import cloudpickle
+
+from . import serialization
+
+LEDGER_FILE = "ledger.jsonl"
+RESULTS_DIR = "run_results"
+
+
+def new_batch_id() -> str:
+    """Generate a batch ID from the current time and a random hash
+    使用当前时间和随机哈希生成批次ID"""
+    timestamp = time.strftime("%Y%m%d_%H%M%S")
+    random_hash = hashlib.md5(str(uuid.uuid4()).encode()).hexdigest()[:4]
+    return f"{timestamp}_{random_hash}"
+
+
+def batch_key(experiment_name: str, times: int, args: Tuple, kwargs: Dict,
+              seed: Optional[int] = None) -> str:
+    """Identify a batch by its experiment, number of runs, arguments and seed
+    通过实验名、运行次数、参数和种子标识批次
+
+    The function code is deliberately not part of the key, so a batch can be
+    resumed after fixing the function.
+    """
+    identity = (experiment_name, times, args, sorted(kwargs.items()))
+    if seed is not None:
+        identity += (seed,)
+    payload = cloudpickle.dumps(identity)
+    return hashlib.sha1(payload).hexdigest()
+
+
+class RunLedger:
+    """On-disk record of the runs of one ``experiment_manager`` batch
+    单个 ``experiment_manager`` 批次运行情况的磁盘记录
+
+    The ledger lives in the batch directory (``merged_results/<batch_id>``)
+    as an append-only JSON lines file: a header identifying the batch,
+    then one entry per finished run with its index, status and run ID.
+    The result of every completed run is pickled to ``run_results/`` before
+    its entry is written, so an interrupted batch can be resumed and merged
+    without running completed indices again.
+
+    Args:
+        directory: Batch directory
+    """
+    def __init__(self, directory: Union[str, pathlib.Path]):
+        self.directory = pathlib.Path(directory)
+        self.path = self.directory / LEDGER_FILE
+        self.batch_id = self.directory.name
+
+    @classmethod
+    def create(cls, batches_dir: Union[str, pathlib.Path], key: str, times: int,
+               batch_id: Optional[str] = None) -> "RunLedger":
+        """Start the ledger of a new batch
+        为新批次创建记录"""
+        ledger = cls(pathlib.Path(batches_dir) / (batch_id or new_batch_id()))
+        ledger.directory.mkdir(parents=True, exist_ok=True)
+        header = {"batch_key": key, "batch_id": ledger.batch_id, "times": times,
+                  "created": time.strftime("%Y-%m-%d %H:%M:%S")}
+        with open(ledger.path, "wb") as f:
+            f.write(serialization.dumps(header) + b"\n")
+        return ledger
+
+    @classmethod
+    def find(cls, batches_dir: Union[str, pathlib.Path], key: str) -> Optional["RunLedger"]:
+        """Return the most recent ledger of the batch identified by ``key``
+        返回由 ``key`` 标识的批次的最新记录"""
+        batches_dir = pathlib.Path(batches_dir)
+        if not batches_dir.is_dir():
+            return None
+        for path in sorted(batches_dir.glob(f"*/{LEDGER_FILE}"), reverse=True):
+            try:
+                with open(path, "rb") as f:
+                    header = serialization.loads(f.readline())
+            except (OSError, ValueError):
+                continue
+            if header.get("batch_key") == key:
+                return cls(path.parent)
+        return None
+
+    @classmethod
+    def expected_durations(cls, batches_dir: Union[str, pathlib.Path],
+                           key: str) -> Dict[int, float]:
+        """Mean duration of every run index in earlier ledgers
+        早先记录中每个运行索引的平均耗时
+
+        Ledgers of the same batch are used if they recorded any durations,
+        otherwise those of every batch of the experiment.
+        """
+        same, other = {}, {}
+        for path in pathlib.Path(batches_dir).glob(f"*/{LEDGER_FILE}"):
+            ledger = cls(path.parent)
+            try:
+                with open(path, "rb") as f:
+                    header = serialization.loads(f.readline())
+                entries = ledger.entries()
+            except (OSError, ValueError):
+                continue
+            target = same if header.get("batch_key") == key else other
+            for index, entry in entries.items():
+                if "duration" in entry:
+                    target.setdefault(index, []).append(entry["duration"])
+        durations = same or other
+        return {index: sum(values) / len(values) for index, values in durations.items()}
+
+    def entries(self) -> Dict[int, Dict[str, Any]]:
+        """Latest entry of every run index recorded so far
+        目前为止记录的每个运行索引的最新条目"""
+        entries = {}
+        with open(self.path, "rb") as f:
+            f.readline()
+            for line in f:
+                try:
+                    entry = serialization.loads(line)
+                except ValueError:
+                    # Line cut short by an interruption
+                    # 因中断而不完整的行
+                    continue
+                entries[entry["index"]] = entry
+        return entries
+
+    def completed(self) -> Dict[int, Dict[str, Any]]:
+        """Entries of the runs that completed
+        已完成运行的条目"""
+        return {index: entry for index, entry in self.entries().items()
+                if entry["status"] == "completed"
+                and self._result_path(index).exists()}
+
+    def record_success(self, index: int, run_id: str, result: Any,
+                       duration: Optional[float] = None, store_result: bool = True,
+                       attempt: int = 0) -> None:
+        """Store the result of a completed run and record it
+        保存已完成运行的结果并记录
+
+        With ``store_result=False`` only the entry (and duration) is recorded
+        and the run is not resumable. The ``attempt`` that produced the result
+        is recorded when it is a speculative re-execution. A result that cannot be pickled is
+        reported and the run is not recorded, so it runs again on resume.
+        """
+        if store_result:
+            path = self._result_path(index)
+            path.parent.mkdir(exist_ok=True)
+            try:
+                with open(path, "wb") as f:
+                    pickle.dump(result, f, protocol=pickle.HIGHEST_PROTOCOL)
+            except (pickle.PicklingError, TypeError, AttributeError) as e:
+                path.unlink()
+                print(f"Warning: Result of run {index} cannot be stored for resuming: {e}")
+                return
+        entry = {"index": index, "status": "completed", "run_id": run_id}
+        if duration is not None:
+            entry["duration"] = duration
+        if attempt:
+            entry["attempt"] = attempt
+        self._append(entry)
+
+    def record_timeout(self, index: int, run_id: Optional[str] = None) -> None:
+        """Record a run stopped at its time limit
+        记录因超时被停止的运行"""
+        self._append({"index": index, "status": "timeout", "run_id": run_id})
+
+    def record_failure(self, index: int, error: str) -> None:
+        """Record a failed run
+        记录失败的运行"""
+        self._append({"index": index, "status": "failed", "error": error})
+
+    def load_result(self, index: int) -> Any:
+        """Load the stored result of a completed run
+        加载已完成运行保存的结果"""
+        with open(self._result_path(index), "rb") as f:
+            return pickle.load(f)
+
+    def _result_path(self, index: int) -> pathlib.Path:
+        return self.directory / RESULTS_DIR / f"{index}.pkl"
+
+    def _append(self, entry: Dict[str, Any]) -> None:
+        with open(self.path, "ab") as f:
+            f.write(serialization.dumps(entry) + b"\n")
+
+    def __repr__(self) -> str:
+        return f"RunLedger({self.batch_id!r})"
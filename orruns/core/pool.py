@@ -0,0 +1,234 @@
+import atexit
+import contextlib
+import importlib
+import multiprocessing as mp
+import threading
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Sequence, Union
+
+from .affinity import WorkerPlacement
+
+# Modules imported by every worker when it starts
+# 每个工作进程启动时导入的模块
+DEFAULT_WARM_IMPORTS = ("orruns.decorators",)
+
+
+def _warm_up(modules: Sequence[str], placement: Optional[WorkerPlacement] = None) -> None:
+    """Worker initializer: pin the worker and import modules before the first task arrives"""
+    if placement is not None:
+        placement.apply()
+    for name in modules:
+        importlib.import_module(name)
+
+
+def _noop() -> None:
+    """Task used to start workers"""
+
+
+class WorkerPool:
+    """Long-lived process pool shared by experiment runs
+    在多次实验运行之间共享的长生命周期进程池
+
+    Worker processes are started on first use (or by ``warm_up``) and kept
+    alive between calls, so repeated ``experiment_manager`` invocations do
+    not pay interpreter startup and imports again. The processes are shut
+    down after ``idle_timeout`` seconds without use and restarted on
+    demand.
+
+    Args:
+        max_workers: Number of worker processes (default: CPU count)
+        idle_timeout: Seconds without use before workers are shut down.
+            None keeps them until ``shutdown``
+        warm_imports: Modules every worker imports when it starts
+        start_method: multiprocessing start method ('spawn', 'forkserver' or 'fork')
+        cpu_affinity: Pin every worker to a core (``"core"``), a NUMA node
+            (``"numa"``) or one of the given CPU sets (see ``plan_placement``)
+        blas_threads: Maximum BLAS / OpenMP threads per worker
+
+    Examples:
+        >>> pool = WorkerPool(max_workers=8)
+        >>> @experiment_manager(times=10, parallel=True, pool=pool)
+        ... def run(tracker): ...
+        >>> for _ in range(100):
+        ...     run()
+        >>> pool.shutdown()
+    """
+    def __init__(self, max_workers: Optional[int] = None,
+                 idle_timeout: Optional[float] = 300.0,
+                 warm_imports: Sequence[str] = DEFAULT_WARM_IMPORTS,
+                 start_method: str = "spawn",
+                 cpu_affinity: Union[str, List[List[int]], None] = None,
+                 blas_threads: Optional[int] = None):
+        if max_workers is not None and max_workers < 1:
+            raise ValueError("max_workers must be at least 1")
+        if idle_timeout is not None and idle_timeout <= 0:
+            raise ValueError("idle_timeout must be positive")
+        self.max_workers = max_workers or mp.cpu_count()
+        self.idle_timeout = idle_timeout
+        self.warm_imports = tuple(warm_imports)
+        self.start_method = start_method
+        self.cpu_affinity = cpu_affinity
+        self.blas_threads = blas_threads
+        # Validated now rather than when the workers start; shared by the
+        # executors replacing each other so freed CPU slots are reused
+        # 在此立即校验而不是在工作进程启动时；由相互替换的执行器共享，以便复用释放的CPU槽位
+        self._placement = None
+        if cpu_affinity is not None or blas_threads is not None:
+            self._placement = WorkerPlacement(cpu_affinity, blas_threads)
+        self._executor: Optional[ProcessPoolExecutor] = None
+        # Sessions using each executor, so a retired one is shut down by the last
+        # 每个执行器的使用会话数，以便由最后一个会话关闭已退役的执行器
+        self._borrowers: Dict[ProcessPoolExecutor, int] = {}
+        self._lock = threading.Lock()
+        self._active = 0
+        self._uses = 0
+        self._timer: Optional[threading.Timer] = None
+
+    @property
+    def running(self) -> bool:
+        """Whether worker processes are currently alive
+        工作进程当前是否存活"""
+        return self._executor is not None
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the executor, (re)creating it if needed (call under the lock)"""
+        if self._executor is not None and getattr(self._executor, "_broken", False):
+            # A crashed worker breaks the whole executor: replace it
+            # 工作进程崩溃会破坏整个执行器：替换它
+            self._executor.shutdown(wait=False)
+            self._executor = None
+        if self._executor is None:
+            placement = self._placement
+            use_init = bool(self.warm_imports) or placement is not None
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=mp.get_context(self.start_method),
+                initializer=_warm_up if use_init else None,
+                initargs=(self.warm_imports, placement) if use_init else ()
+            )
+            if placement is not None:
+                placement.start_workers(self._executor, self.max_workers)
+        return self._executor
+
+    @contextlib.contextmanager
+    def session(self) -> Iterator[ProcessPoolExecutor]:
+        """Borrow the executor; the idle timer is paused while in use
+        借用执行器；使用期间暂停空闲计时
+
+        Unlike ``with ProcessPoolExecutor()``, leaving the block does not
+        shut the workers down.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            self._active += 1
+            self._uses += 1
+            executor = self._get_executor()
+            self._borrowers[executor] = self._borrowers.get(executor, 0) + 1
+        try:
+            yield executor
+        finally:
+            with self._lock:
+                self._active -= 1
+                self._borrowers[executor] -= 1
+                retired = False
+                if not self._borrowers[executor]:
+                    del self._borrowers[executor]
+                    retired = executor is not self._executor
+                if self._active == 0 and self.idle_timeout is not None:
+                    self._timer = threading.Timer(
+                        self.idle_timeout, self._on_idle, args=(self._uses,)
+                    )
+                    self._timer.daemon = True
+                    self._timer.start()
+            if retired:
+                executor.shutdown(wait=False)
+
+    def retire(self, executor: ProcessPoolExecutor) -> bool:
+        """Stop handing out ``executor`` so the caller may kill its workers
+        停止提供 ``executor``，以便调用者终止其工作进程
+
+        Killing a worker breaks the whole executor. Only the session that
+        borrowed it alone may do so: later sessions get a fresh executor, and
+        the retired one is shut down when that session ends.
+
+        Returns:
+            False, leaving the executor in place, when other sessions use it
+        """
+        with self._lock:
+            if self._borrowers.get(executor, 0) > 1:
+                return False
+            if self._executor is executor:
+                self._executor = None
+            return True
+
+    def warm_up(self) -> None:
+        """Start all worker processes now instead of on first use
+        立即启动所有工作进程，而不是在首次使用时启动"""
+        with self.session() as executor:
+            wait([executor.submit(_noop) for _ in range(self.max_workers)])
+
+    def _on_idle(self, uses: int) -> None:
+        with self._lock:
+            # Ignore timers of sessions that have been superseded
+            # 忽略已被后续使用取代的计时器
+            if self._active or uses != self._uses:
+                return
+            self._timer = None
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Shut the worker processes down
+        关闭工作进程
+
+        The pool can still be used afterwards; workers are restarted on
+        demand.
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+    def __enter__(self) -> "WorkerPool":
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.shutdown()
+
+    def __repr__(self) -> str:
+        state = "running" if self.running else "stopped"
+        return f"WorkerPool(max_workers={self.max_workers}, {state})"
+
+
+_default_pool: Optional[WorkerPool] = None
+_default_lock = threading.Lock()
+
+
+def get_default_pool(max_workers: Optional[int] = None) -> WorkerPool:
+    """Return the process-wide shared worker pool
+    返回进程级共享工作进程池
+
+    The pool is created on first use with ``max_workers`` workers and shut
+    down when the interpreter exits.
+    """
+    global _default_pool
+    with _default_lock:
+        if _default_pool is None:
+            _default_pool = WorkerPool(max_workers=max_workers)
+            atexit.register(_default_pool.shutdown)
+        return _default_pool
+
+
+def shutdown_default_pool() -> None:
+    """Shut down the shared worker pool if it was started
+    关闭已启动的共享工作进程池"""
+    with _default_lock:
+        pool = _default_pool
+    if pool is not None:
+        pool.shutdown()
@@ -0,0 +1,165 @@
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+_MISSING = object()
+
+
+def parse_filter_key(key: str) -> Tuple[str, str]:
+    """解析过滤器键
+    Parse filter key"""
+    if "__" in key:
+        field, op = key.split("__")
+        return field, op
+    return key, "eq"
+
+
+def match_value(value: Any, filter_value: Any, op: str) -> bool:
+    """匹配值
+    Match value"""
+    try:
+        if op == "eq":
+            return value == filter_value
+        elif op == "gt":
+            return float(value) > float(filter_value)
+        elif op == "lt":
+            return float(value) < float(filter_value)
+        elif op == "gte":
+            return float(value) >= float(filter_value)
+        elif op == "lte":
+            return float(value) <= float(filter_value)
+        return False
+    except (TypeError, ValueError):
+        # 如果无法进行数值比较，回退到字符串比较
+        # Fallback to string comparison if numeric comparison fails
+        str_value = str(value)
+        str_filter = str(filter_value)
+        if op == "eq":
+            return str_value == str_filter
+        elif op == "gt":
+            return str_value > str_filter
+        elif op == "lt":
+            return str_value < str_filter
+        elif op == "gte":
+            return str_value >= str_filter
+        elif op == "lte":
+            return str_value <= str_filter
+        return False
+
+
+def match_filters(exp: Dict, filters: Dict[str, Any], data_key: Optional[str] = None) -> bool:
+    """匹配过滤器
+    Match filters"""
+    if not filters:
+        return True
+
+    for key, filter_value in filters.items():
+        field, op = parse_filter_key(key)
+
+        # 处理嵌套字段
+        # Handle nested fields
+        if data_key is None:
+            exp_data = exp
+        else:
+            exp_data = exp.get(data_key, {})
+
+        # 支持点号分隔的嵌套字段
+        # Support dot-separated nested fields
+        if "." in field:
+            parts = field.split(".")
+            current_data = exp_data
+            for part in parts[:-1]:
+                current_data = current_data.get(part, {})
+            field = parts[-1]
+            exp_data = current_data
+
+        if field not in exp_data:
+            return False
+        if not match_value(exp_data[field], filter_value, op):
+            return False
+    return True
+
+
+def get_sort_value(exp: Dict, sort_field: str) -> Any:
+    """获取排序值
+    Get value for sorting"""
+    try:
+        if sort_field.startswith('parameters.'):
+            field = sort_field.split('.', 1)[1]
+            current = exp.get('parameters', {})
+        elif sort_field.startswith('metrics.'):
+            field = sort_field.split('.', 1)[1]
+            current = exp.get('metrics', {})
+        else:
+            return exp.get(sort_field)
+
+        # 处理嵌套字段
+        # Handle nested fields
+        if "." in field:
+            parts = field.split(".")
+            for part in parts[:-1]:
+                current = current.get(part, {})
+            return current.get(parts[-1])
+        return current.get(field)
+    except Exception:
+        return None
+
+
+def normalize_fields(fields: Iterable[str]) -> List[str]:
+    """规范化投影字段
+    Normalize projection fields
+
+    Duplicates and fields already covered by a requested parent (e.g.
+    ``metrics.loss`` when ``metrics`` is requested) are dropped.
+    """
+    fields = list(dict.fromkeys(fields))
+    for field in fields:
+        if not isinstance(field, str) or not field or "" in field.split("."):
+            raise ValueError(f"Invalid field: {field!r}")
+    return [
+        field for field in fields
+        if not any(field.startswith(f"{other}.") for other in fields)
+    ]
+
+
+def get_field(exp: Dict, field: str) -> Any:
+    """获取点号分隔字段的值，不存在时返回 _MISSING
+    Get the value of a dotted field, or _MISSING if it does not exist"""
+    current = exp
+    for part in field.split("."):
+        if not isinstance(current, dict) or part not in current:
+            return _MISSING
+        current = current[part]
+    return current
+
+
+def nest_fields(values: Iterable[Tuple[str, Any]]) -> Dict:
+    """将 ``(dotted_field, value)`` 对组装为嵌套字典
+    Build a nested dict from ``(dotted_field, value)`` pairs
+
+    Fields must not be prefixes of each other (see ``normalize_fields``).
+    """
+    result = {}
+    for field, value in values:
+        parts = field.split(".")
+        current = result
+        for part in parts[:-1]:
+            current = current.setdefault(part, {})
+        current[parts[-1]] = value
+    return result
+
+
+def project_fields(exp: Dict, fields: List[str]) -> Dict:
+    """只保留请求的字段
+    Keep only the requested fields
+
+    Args:
+        exp: Experiment information
+        fields: Normalized dotted fields (``name``, ``parameters.lr``, ``metrics.loss``)
+
+    Returns:
+        Nested dict containing the fields present in ``exp``
+    """
+    return nest_fields(
+        (field, value) for field, value in
+        ((field, get_field(exp, field)) for field in fields)
+        if value is not _MISSING
+    )
@@ -0,0 +1,112 @@
+import threading
+import time
+from typing import Any, Callable, Dict, Optional
+
+# Metric group receiving the samples (``resources.cpu_percent``, ...)
+# 记录采样结果的指标分组（``resources.cpu_percent`` 等）
+RESOURCE_PREFIX = "resources"
+
+_MB = 1024 ** 2
+
+
+class ResourceSampler:
+    """Background thread sampling the resource usage of this process
+    在后台线程中采样本进程的资源使用情况
+
+    Every ``interval`` seconds, and once more when stopped, a sample is
+    passed to ``log_fn`` together with an increasing step:
+
+    - ``elapsed_s``: seconds since the sampler started
+    - ``cpu_percent``: CPU usage since the previous sample (100 = one core)
+    - ``rss_mb`` / ``peak_rss_mb``: resident memory, now and the highest sampled
+    - ``num_threads``: threads of the process
+    - ``read_mb`` / ``write_mb``: bytes read and written since the start
+      (where the platform reports them)
+    - ``ctx_switches_voluntary`` / ``ctx_switches_involuntary``: context
+      switches since the start
+
+    The thread sleeps between samples, so the overhead is a handful of
+    psutil calls per interval.
+
+    Args:
+        log_fn: Called with ``(sample, step)``
+        interval: Seconds between samples
+    """
+    def __init__(self, log_fn: Callable[[Dict[str, float], int], None],
+                 interval: float = 1.0):
+        if interval <= 0:
+            raise ValueError("Sampling interval must be positive")
+        import psutil
+
+        self.interval = interval
+        self.error: Optional[BaseException] = None
+        self._psutil = psutil
+        self._log_fn = log_fn
+        self._process = psutil.Process()
+        # The first call only starts the CPU measurement
+        # 第一次调用只是开始CPU测量
+        self._process.cpu_percent(None)
+        self._start = time.perf_counter()
+        self._baseline = self._counters()
+        self._peak_rss = 0
+        self._step = 0
+        self._stopped = threading.Event()
+        self._thread = threading.Thread(
+            target=self._run, name="orruns-resources", daemon=True
+        )
+        self._thread.start()
+
+    def _counters(self) -> Dict[str, float]:
+        """Cumulative counters of the process
+        进程的累计计数器"""
+        counters = {}
+        io_counters = getattr(self._process, "io_counters", None)
+        if io_counters is not None:
+            try:
+                io = io_counters()
+                counters["read_mb"] = io.read_bytes / _MB
+                counters["write_mb"] = io.write_bytes / _MB
+            except self._psutil.Error:
+                pass
+        switches = self._process.num_ctx_switches()
+        counters["ctx_switches_voluntary"] = switches.voluntary
+        counters["ctx_switches_involuntary"] = switches.involuntary
+        return counters
+
+    def sample(self) -> Dict[str, Any]:
+        """Measure the current resource usage
+        测量当前资源使用情况"""
+        with self._process.oneshot():
+            rss = self._process.memory_info().rss
+            self._peak_rss = max(self._peak_rss, rss)
+            sample = {
+                "elapsed_s": round(time.perf_counter() - self._start, 3),
+                "cpu_percent": self._process.cpu_percent(None),
+                "rss_mb": round(rss / _MB, 3),
+                "peak_rss_mb": round(self._peak_rss / _MB, 3),
+                "num_threads": self._process.num_threads(),
+            }
+            for key, value in self._counters().items():
+                sample[key] = round(value - self._baseline.get(key, 0), 3)
+        return sample
+
+    def _log(self) -> None:
+        try:
+            self._log_fn(self.sample(), self._step)
+        except Exception as e:
+            self.error = e
+            self._stopped.set()
+        self._step += 1
+
+    def _run(self) -> None:
+        while not self._stopped.wait(self.interval):
+            self._log()
+
+    def stop(self) -> None:
+        """Stop sampling and record a final sample
+        停止采样并记录最后一个样本"""
+        if self._stopped.is_set():
+            return
+        self._stopped.set()
+        self._thread.join()
+        self._log()
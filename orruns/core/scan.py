@@ -0,0 +1,159 @@
+import collections
+import functools
+import multiprocessing
+import os
+import pathlib
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Iterable, Iterator, List, Optional, Tuple
+
+from . import serialization
+from .cache import copy_document, get_summary_cache
+
+# Number of summaries sent to a parser process at once
+# 每次发送给解析进程的摘要数量
+PARSE_CHUNK_SIZE = 64
+
+ScanResult = Tuple[pathlib.Path, Optional[dict], Optional[Exception]]
+
+
+def _list_dirs(path: pathlib.Path) -> List[pathlib.Path]:
+    """List the sub-directories of ``path`` sorted by name
+
+    ``os.scandir`` reports the entry type from the directory listing itself,
+    so no extra ``stat`` round-trip is needed per entry on most filesystems.
+    """
+    with os.scandir(path) as entries:
+        names = [entry.name for entry in entries if entry.is_dir()]
+    return [path / name for name in sorted(names)]
+
+
+def list_run_dirs(base_path: pathlib.Path, workers: int = 1) -> List[pathlib.Path]:
+    """List all run directories below the base directory
+    列出基础目录下的所有运行目录
+
+    Experiments and runs are returned sorted by name, so the order does not
+    depend on the filesystem or on the number of workers.
+
+    Args:
+        base_path: Base directory for experiments
+        workers: Number of threads listing experiment directories
+    """
+    exp_dirs = _list_dirs(base_path)
+    if workers <= 1 or len(exp_dirs) <= 1:
+        listings = map(_list_dirs, exp_dirs)
+        return [run_dir for runs in listings for run_dir in runs]
+    with ThreadPoolExecutor(workers, thread_name_prefix="orruns-scan") as executor:
+        listings = executor.map(_list_dirs, exp_dirs)
+        return [run_dir for runs in listings for run_dir in runs]
+
+
+def _ordered_map(executor: Executor, fn: Callable, items: Iterable, window: int) -> Iterator:
+    """Like ``executor.map`` but with at most ``window`` tasks in flight
+
+    Results are yielded in input order. Closing the iterator cancels the
+    tasks that have not started yet.
+    """
+    pending = collections.deque()
+    items = iter(items)
+    try:
+        for item in items:
+            pending.append(executor.submit(fn, item))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+        while pending:
+            yield pending.popleft().result()
+    finally:
+        for future in pending:
+            future.cancel()
+
+
+def _read_summary(run_dir: pathlib.Path, parse: bool = True) -> Tuple[Any, ...]:
+    """Read the summary of a run through the summary cache
+
+    Returns ``(run_dir, document, error, signature)``. With ``parse=False``
+    a cache miss returns the raw bytes as ``document`` so they can be parsed
+    elsewhere.
+    """
+    summary_file = run_dir / "summary.json"
+    cache = get_summary_cache()
+    try:
+        signature, document = cache.lookup(summary_file)
+        if document is None:
+            with open(summary_file, 'rb') as f:
+                data = f.read()
+            if not parse:
+                return run_dir, data, None, signature
+            document = serialization.loads(data)
+            cache.store(summary_file, signature, document)
+            document = copy_document(document)
+        return run_dir, document, None, signature
+    except FileNotFoundError:
+        return run_dir, None, None, None
+    except Exception as e:
+        return run_dir, None, e, None
+
+
+def iter_summaries(run_dirs: Iterable[pathlib.Path], workers: int = 1,
+                   parse_processes: bool = False) -> Iterator[ScanResult]:
+    """Load the summaries of the given runs, optionally in parallel
+    加载给定运行的摘要（可选并行）
+
+    Yields ``(run_dir, summary, error)`` in the order of ``run_dirs``;
+    ``summary`` is None for runs without a summary or that failed to load
+    (``error`` is set in the latter case).
+
+    Args:
+        run_dirs: Run directories to read
+        workers: Number of reader threads (and parser processes). 1 reads
+            sequentially in the calling thread
+        parse_processes: Parse JSON in a process pool instead of the
+            reader threads, so parsing is not limited by the GIL
+    """
+    if workers <= 1 and not parse_processes:
+        for run_dir in run_dirs:
+            yield _read_summary(run_dir)[:3]
+        return
+
+    workers = max(workers, 1)
+    window = workers * PARSE_CHUNK_SIZE if parse_processes else workers * 4
+    with ThreadPoolExecutor(workers, thread_name_prefix="orruns-scan") as threads:
+        reads = _ordered_map(
+            threads, functools.partial(_read_summary, parse=not parse_processes),
+            run_dirs, window
+        )
+        if not parse_processes:
+            for result in reads:
+                yield result[:3]
+            return
+
+        # spawn avoids forking a process that is running reader threads
+        # 使用spawn，避免在运行读取线程的进程中fork
+        with ProcessPoolExecutor(
+            workers, mp_context=multiprocessing.get_context("spawn")
+        ) as processes:
+            while True:
+                batch = [result for _, result in zip(range(window), reads)]
+                if not batch:
+                    return
+                raw = [result for result in batch if isinstance(result[1], bytes)]
+                try:
+                    parsed = list(processes.map(
+                        serialization.get_loads(), [result[1] for result in raw],
+                        chunksize=PARSE_CHUNK_SIZE
+                    ))
+                except ValueError:
+                    # A corrupt file fails the whole chunk; parse the batch
+                    # here to report errors per run
+                    # 损坏的文件会使整个分块失败，此处逐个解析以按运行报告错误
+                    parsed = None
+                documents = {}
+                for i, (run_dir, data, _, signature) in enumerate(raw):
+                    try:
+                        document = serialization.loads(data) if parsed is None else parsed[i]
+                    except ValueError as e:
+                        documents[run_dir] = (None, e)
+                        continue
+                    get_summary_cache().store(run_dir / "summary.json", signature, document)
+                    documents[run_dir] = (copy_document(document), None)
+                for run_dir, document, error, _ in batch:
+                    yield (run_dir, *documents.get(run_dir, (document, error)))
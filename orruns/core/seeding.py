@@ -0,0 +1,51 @@
+import random
+import sys
+from typing import Tuple
+
+import numpy as np
+
+
+def derive_seed(seed: int, run_index: int, attempt: int = 0) -> int:
+    """Seed of one run derived from the master seed of the batch
+    从批次主种子派生单次运行的种子
+
+    Equivalent to ``SeedSequence(seed).spawn(times)[run_index]``, without
+    spawning the sequences of the other runs: every run gets an independent
+    stream that only depends on ``seed`` and its index, so serial and
+    parallel execution draw the same numbers and any run can be replayed.
+    A later ``attempt`` of the run (speculative re-execution) uses child
+    ``attempt`` of the run's sequence instead, so it is not a copy of the
+    first attempt.
+
+    Returns:
+        32-bit seed accepted by ``random.seed``, ``np.random.seed`` and
+        ``np.random.default_rng``
+    """
+    spawn_key = (run_index, attempt) if attempt else (run_index,)
+    sequence = np.random.SeedSequence(seed, spawn_key=spawn_key)
+    return int(sequence.generate_state(1, np.uint32)[0])
+
+
+def run_generators(run_seed: int) -> Tuple[np.random.Generator, random.Random]:
+    """NumPy and Python random number generators owned by one run
+    单次运行独有的 NumPy 和 Python 随机数生成器
+
+    Unlike the global generators, they are not shared with other runs of
+    the process, so their numbers are the same on every backend.
+    """
+    return np.random.default_rng(run_seed), random.Random(run_seed)
+
+
+def seed_globals(run_seed: int) -> None:
+    """Seed the global random number generators of this process
+    为本进程的全局随机数生成器设置种子
+
+    Seeds Python's ``random`` and NumPy's legacy global generator, and
+    PyTorch's if it has already been imported. Only meaningful when one run
+    at a time uses the process: concurrent runs would interleave their draws.
+    """
+    random.seed(run_seed)
+    np.random.seed(run_seed)
+    torch = sys.modules.get("torch")
+    if torch is not None:
+        torch.manual_seed(run_seed)
@@ -0,0 +1,186 @@
+import json
+import math
+import os
+import pathlib
+from typing import Any, Callable, Dict, List, Union
+
+import numpy as np
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
+
+try:
+    import ujson
+except ImportError:  # pragma: no cover - optional dependency
+    ujson = None
+
+BACKENDS = ("orjson", "ujson", "json")
+
+
+def _default(obj: Any) -> Any:
+    """Convert NumPy values that the encoder does not handle natively
+    转换编码器无法原生处理的NumPy值"""
+    if isinstance(obj, np.ndarray):
+        return obj.tolist()
+    if isinstance(obj, np.bool_):
+        return bool(obj)
+    if isinstance(obj, np.integer):
+        return int(obj)
+    if isinstance(obj, np.floating):
+        return float(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+def _has_nonfinite(obj: Any) -> bool:
+    """Whether ``obj`` contains NaN or infinite floats
+
+    Fast encoders cannot write these (orjson silently writes ``null``), so
+    such documents go through the standard library encoder. Homogeneous
+    number lists are checked with a single C-level ``sum``; an overflow to
+    infinity only costs a fallback to the slower encoder.
+    """
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(_has_nonfinite(value) for value in obj.values())
+    if isinstance(obj, (list, tuple)):
+        try:
+            return not math.isfinite(sum(obj, 0.0))
+        except (TypeError, OverflowError):
+            return any(_has_nonfinite(value) for value in obj)
+    if isinstance(obj, np.ndarray):
+        if obj.dtype.kind in "fc":
+            return not bool(np.isfinite(obj).all())
+        return obj.dtype == object and any(_has_nonfinite(value) for value in obj.flat)
+    if isinstance(obj, np.floating):
+        return not math.isfinite(obj)
+    return False
+
+
+def _json_dumps(obj: Any, pretty: bool) -> bytes:
+    if pretty:
+        text = json.dumps(obj, indent=2, ensure_ascii=False, default=_default)
+    else:
+        text = json.dumps(obj, separators=(",", ":"), ensure_ascii=False, default=_default)
+    return text.encode("utf-8")
+
+
+def _orjson_dumps(obj: Any, pretty: bool) -> bytes:
+    options = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+    if pretty:
+        options |= orjson.OPT_INDENT_2
+    return orjson.dumps(obj, default=_default, option=options)
+
+
+def _ujson_dumps(obj: Any, pretty: bool) -> bytes:
+    text = ujson.dumps(
+        obj, indent=2 if pretty else 0, ensure_ascii=False, escape_forward_slashes=False
+    )
+    return text.encode("utf-8")
+
+
+_DUMPS: Dict[str, Callable[[Any, bool], bytes]] = {
+    "orjson": _orjson_dumps,
+    "ujson": _ujson_dumps,
+    "json": _json_dumps,
+}
+_LOADS: Dict[str, Callable[[Union[bytes, str]], Any]] = {
+    "orjson": orjson.loads if orjson is not None else None,
+    "ujson": ujson.loads if ujson is not None else None,
+    "json": json.loads,
+}
+
+
+def available_backends() -> List[str]:
+    """Return the installed JSON backends, fastest first
+    返回已安装的JSON后端（最快的在前）"""
+    return [name for name in BACKENDS if _LOADS[name] is not None]
+
+
+_backend = os.environ.get("ORRUNS_JSON_BACKEND") or available_backends()[0]
+if _backend not in available_backends():
+    _backend = "json"
+
+
+def get_json_backend() -> str:
+    """Return the name of the active JSON backend
+    返回当前使用的JSON后端名称"""
+    return _backend
+
+
+def set_json_backend(name: str) -> None:
+    """Select the JSON backend used by all ORruns I/O
+    选择ORruns所有读写使用的JSON后端
+
+    Args:
+        name: One of ``"orjson"``, ``"ujson"`` or ``"json"``
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown JSON backend: {name}. Must be one of {BACKENDS}")
+    if _LOADS[name] is None:
+        raise ValueError(f"JSON backend '{name}' is not installed")
+    _backend = name
+
+
+def dumps(obj: Any, pretty: bool = False) -> bytes:
+    """Encode ``obj`` as UTF-8 JSON
+    将 ``obj`` 编码为UTF-8 JSON
+
+    Output is compact unless ``pretty`` is set. NumPy scalars and arrays are
+    encoded natively. Documents containing NaN or infinity are always
+    written by the standard library encoder, which preserves them.
+
+    Args:
+        obj: Object to encode
+        pretty: Indent the output for human readers
+    """
+    if _backend != "json" and not _has_nonfinite(obj):
+        try:
+            return _DUMPS[_backend](obj, pretty)
+        except (TypeError, OverflowError):
+            # e.g. integers beyond 64 bits or objects ujson cannot encode
+            # 例如超过64位的整数或ujson无法编码的对象
+            pass
+    return _json_dumps(obj, pretty)
+
+
+def loads(data: Union[bytes, str]) -> Any:
+    """Decode JSON produced by any backend
+    解码任意后端生成的JSON
+
+    Files containing ``NaN``/``Infinity`` (written by the standard library)
+    are rejected by the fast decoders and decoded with ``json`` instead.
+    """
+    if _backend != "json":
+        try:
+            return _LOADS[_backend](data)
+        except ValueError:
+            pass
+    return json.loads(data)
+
+
+def get_loads() -> Callable[[Union[bytes, str]], Any]:
+    """Return the raw decode function of the active backend
+    返回当前后端的原始解码函数
+
+    Unlike ``loads`` the returned function has no fallback, but it can be
+    pickled by reference into worker processes without importing ORruns.
+    """
+    return _LOADS[_backend]
+
+
+def dump(obj: Any, path: Union[str, pathlib.Path], pretty: bool = False) -> None:
+    """Write ``obj`` as JSON to ``path``
+    将 ``obj`` 以JSON格式写入 ``path``"""
+    with open(path, "wb") as f:
+        f.write(dumps(obj, pretty=pretty))
+
+
+def load(path: Union[str, pathlib.Path]) -> Any:
+    """Read a JSON file
+    读取JSON文件"""
+    with open(path, "rb") as f:
+        return loads(f.read())
@@ -0,0 +1,92 @@
+from array import array
+from typing import Dict, Iterable, List, Union
+
+Number = Union[int, float]
+
+# Range of the signed 64-bit integers held by the typed buffers
+# 类型化缓冲区存储的有符号64位整数范围
+INT64_MIN = -2 ** 63
+INT64_MAX = 2 ** 63 - 1
+
+
+def check_step(step: int) -> int:
+    """Return ``step`` if it fits the 64-bit step buffer, raise ValueError otherwise
+    若 ``step`` 可存入64位步骤缓冲区则返回它，否则抛出 ValueError"""
+    if not INT64_MIN <= step <= INT64_MAX:
+        raise ValueError(
+            f"Step {step} is outside the 64-bit integer range "
+            f"[{INT64_MIN}, {INT64_MAX}]"
+        )
+    return step
+
+
+def _fits_int64(value: Number) -> bool:
+    return isinstance(value, int) and INT64_MIN <= value <= INT64_MAX
+
+
+class StepSeries:
+    """In-memory storage for a stepped metric
+    带步骤指标的内存存储
+
+    Steps and values live in typed ``array`` buffers whose appends are
+    amortized O(1), so recording the n-th point of a convergence curve does
+    not copy the n-1 points before it. Integer series stay integer until a
+    float value (or an integer beyond 64 bits) arrives. Steps must fit in a
+    signed 64-bit integer. Plain lists are only produced by ``to_dict`` when
+    the series is serialized.
+
+    Args:
+        steps: Initial steps
+        values: Initial values
+    """
+    __slots__ = ("steps", "values")
+
+    def __init__(self, steps: Iterable[int] = (), values: Iterable[Number] = ()):
+        values = list(values)
+        self.steps = array("q", (check_step(step) for step in steps))
+        self.values = array(self._typecode(values), values)
+
+    @staticmethod
+    def _typecode(values: List[Number]) -> str:
+        return "q" if all(_fits_int64(v) for v in values) else "d"
+
+    def append(self, step: int, value: Number) -> None:
+        """Append a single point
+        追加一个数据点"""
+        check_step(step)
+        if self.values.typecode == "q" and not _fits_int64(value):
+            self.values = array("d", self.values)
+        self.steps.append(step)
+        self.values.append(value)
+
+    def __len__(self) -> int:
+        return len(self.steps)
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, StepSeries):
+            return self.steps == other.steps and self.values == other.values
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"StepSeries(n={len(self)})"
+
+    def to_dict(self) -> Dict[str, List[Number]]:
+        """Convert to the serialized ``{"steps": [...], "values": [...]}`` shape
+        转换为序列化形式 ``{"steps": [...], "values": [...]}``"""
+        return {"steps": self.steps.tolist(), "values": self.values.tolist()}
+
+
+def materialize_metrics(metrics: Dict) -> Dict:
+    """Return a copy of a metric tree with every StepSeries converted to lists
+    返回指标树的副本，其中所有 StepSeries 均转换为列表"""
+    result = {}
+    for key, value in metrics.items():
+        if isinstance(value, StepSeries):
+            result[key] = value.to_dict()
+        elif isinstance(value, dict):
+            result[key] = materialize_metrics(value)
+        else:
+            result[key] = value
+    return result
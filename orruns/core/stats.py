@@ -0,0 +1,139 @@
+import math
+from typing import Any, List, Optional
+
+import numpy as np
+
+
+class RunningStats:
+    """Online mean, variance, minimum and maximum (Welford's algorithm)
+    在线计算均值、方差、最小值和最大值（Welford 算法）
+
+    Works on scalars and, element-wise, on arrays of a fixed shape. Only the
+    running aggregates are stored, so memory does not grow with the number
+    of values.
+    """
+    __slots__ = ("count", "mean", "_m2", "min", "max")
+
+    def __init__(self):
+        self.count = 0
+        self.mean: Optional[np.ndarray] = None
+        self._m2: Optional[np.ndarray] = None
+        self.min: Optional[np.ndarray] = None
+        self.max: Optional[np.ndarray] = None
+
+    @property
+    def shape(self) -> Optional[tuple]:
+        return None if self.mean is None else self.mean.shape
+
+    def add(self, value: Any) -> None:
+        """Add a value
+        添加一个值
+
+        Raises:
+            ValueError: If the shape differs from previous values
+        """
+        x = np.asarray(value, dtype=np.float64)
+        if self.count == 0:
+            self.count = 1
+            self.mean = x.copy()
+            self._m2 = np.zeros_like(self.mean)
+            self.min = x.copy()
+            self.max = x.copy()
+            return
+        if x.shape != self.mean.shape:
+            raise ValueError(f"Shape {x.shape} does not match {self.mean.shape}")
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self._m2 += delta * (x - self.mean)
+        np.minimum(self.min, x, out=self.min)
+        np.maximum(self.max, x, out=self.max)
+
+    def variance(self, ddof: int = 1) -> np.ndarray:
+        """Variance of the values added so far (NaN when undefined)
+        已添加值的方差（无定义时为NaN）"""
+        if self.count - ddof <= 0:
+            return np.full_like(self.mean, np.nan)
+        return self._m2 / (self.count - ddof)
+
+    def std(self, ddof: int = 1) -> np.ndarray:
+        """Standard deviation of the values added so far
+        已添加值的标准差"""
+        return np.sqrt(self.variance(ddof))
+
+
+class P2Quantile:
+    """Streaming quantile estimate with the P² algorithm
+    使用 P² 算法的流式分位数估计
+
+    Keeps five markers instead of the values (Jain & Chlamtac, 1985). The
+    estimate is exact for up to five values.
+
+    Args:
+        p: Quantile to estimate, between 0 and 1
+    """
+    __slots__ = ("p", "_initial", "_heights", "_positions", "_desired", "_increments")
+
+    def __init__(self, p: float):
+        if not 0 <= p <= 1:
+            raise ValueError("p must be between 0 and 1")
+        self.p = p
+        self._initial: List[float] = []
+        self._heights: Optional[List[float]] = None
+
+    def add(self, value: float) -> None:
+        """Add a value
+        添加一个值"""
+        x = float(value)
+        if math.isnan(x):
+            return
+        if self._heights is None:
+            self._initial.append(x)
+            if len(self._initial) == 5:
+                p = self.p
+                self._heights = sorted(self._initial)
+                self._positions = [0, 1, 2, 3, 4]
+                self._desired = [0, 2 * p, 4 * p, 2 + 2 * p, 4]
+                self._increments = [0, p / 2, p, (1 + p) / 2, 1]
+            return
+
+        q, n = self._heights, self._positions
+        if x < q[0]:
+            q[0] = x
+            k = 0
+        elif x >= q[4]:
+            q[4] = x
+            k = 3
+        else:
+            k = next(i for i in range(4) if q[i] <= x < q[i + 1])
+        for i in range(k + 1, 5):
+            n[i] += 1
+        for i in range(5):
+            self._desired[i] += self._increments[i]
+
+        # Move the middle markers towards their desired positions
+        # 将中间标记移向期望位置
+        for i in (1, 2, 3):
+            d = self._desired[i] - n[i]
+            if (d >= 1 and n[i + 1] - n[i] > 1) or (d <= -1 and n[i - 1] - n[i] < -1):
+                d = 1 if d > 0 else -1
+                height = q[i] + d / (n[i + 1] - n[i - 1]) * (
+                    (n[i] - n[i - 1] + d) * (q[i + 1] - q[i]) / (n[i + 1] - n[i])
+                    + (n[i + 1] - n[i] - d) * (q[i] - q[i - 1]) / (n[i] - n[i - 1])
+                )
+                if not q[i - 1] < height < q[i + 1]:
+                    # Parabolic prediction out of order: use linear
+                    # 抛物线预测越界：改用线性插值
+                    height = q[i] + d * (q[i + d] - q[i]) / (n[i + d] - n[i])
+                q[i] = height
+                n[i] += d
+
+    @property
+    def value(self) -> float:
+        """Current estimate (NaN without values)
+        当前估计值（无数据时为NaN）"""
+        if self._heights is not None:
+            return self._heights[2]
+        if not self._initial:
+            return math.nan
+        return float(np.quantile(self._initial, self.p))
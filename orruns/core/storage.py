@@ -0,0 +1,323 @@
+import copy
+import inspect
+import os
+import pathlib
+import threading
+import uuid
+from typing import Any, Callable, Dict, Optional, Union
+
+from . import serialization
+from .cache import load_summary
+from .columns import load_columns
+from .config import Config
+from .series import StepSeries, materialize_metrics
+
+METRIC_LOG_FILE = "metrics.jsonl"
+DEFAULT_BASE_DIR = "./orruns_experiments"
+
+
+def atomic_write_bytes(path: Union[str, pathlib.Path], data: bytes) -> None:
+    """Write a file atomically via a temporary file and rename
+    通过临时文件和重命名原子地写入文件
+
+    Readers either see the previous or the new content, never a partially
+    written file, even if the process dies mid-write.
+    """
+    path = pathlib.Path(path)
+    tmp_path = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if tmp_path.exists():
+            tmp_path.unlink()
+        raise
+
+
+class StorageTarget:
+    """Where and how the runs of ``experiment_manager`` are stored
+    ``experiment_manager`` 的运行存储位置和方式
+
+    The target is resolved once in the parent process, with an absolute
+    base directory, and sent to every worker and to the results merger, so
+    all runs of a batch end up in the same place whatever the working
+    directory of the workers is.
+
+    Args:
+        base_dir: Base directory for experiments
+        **tracker_options: Keyword arguments for every ``ExperimentTracker``
+            (``metric_storage``, ``async_writes``, ``index``, ...)
+
+    Examples:
+        >>> @experiment_manager(times=1000, parallel=True,
+        ...                     storage=StorageTarget("/scratch/runs", metric_storage="log"))
+        ... def run(tracker): ...
+    """
+    def __init__(self, base_dir: Union[str, pathlib.Path] = DEFAULT_BASE_DIR,
+                 **tracker_options: Any):
+        from ..tracker import ExperimentTracker
+
+        accepted = set(inspect.signature(ExperimentTracker).parameters) - {"experiment_name", "base_dir"}
+        unknown = set(tracker_options) - accepted
+        if unknown:
+            raise ValueError(f"Unknown tracker options: {', '.join(sorted(unknown))}")
+        self.base_dir = pathlib.Path(base_dir).expanduser().resolve()
+        self.tracker_options = tracker_options
+
+    @classmethod
+    def from_config(cls, **tracker_options: Any) -> "StorageTarget":
+        """Target in the data directory set with ``orruns config --data-dir``
+        使用 ``orruns config --data-dir`` 设置的数据目录作为存储目标"""
+        data_dir = Config.get_instance().get_data_dir()
+        if not data_dir:
+            raise ValueError("Data directory not set. Please run 'orruns config --data-dir PATH' first")
+        return cls(data_dir, **tracker_options)
+
+    @classmethod
+    def resolve(cls, storage: Union["StorageTarget", str, pathlib.Path, None]) -> "StorageTarget":
+        """Turn a directory (default: ``./orruns_experiments``) into a target
+        将目录（默认 ``./orruns_experiments``）转换为存储目标"""
+        if isinstance(storage, cls):
+            return storage
+        return cls(DEFAULT_BASE_DIR if storage is None else storage)
+
+    def tracker(self, experiment_name: str):
+        """Create the tracker of a new run
+        创建新运行的追踪器"""
+        from ..tracker import ExperimentTracker
+
+        return ExperimentTracker(experiment_name, base_dir=str(self.base_dir),
+                                 **self.tracker_options)
+
+    def batches_dir(self, experiment_name: str) -> pathlib.Path:
+        """Directory holding the merged results and ledgers of an experiment
+        存放实验合并结果和批次记录的目录"""
+        return self.base_dir / experiment_name / "merged_results"
+
+    def __repr__(self) -> str:
+        return f"StorageTarget({str(self.base_dir)!r})"
+
+
+class MetricLog:
+    """Append-only JSON-lines log of metric updates for a single run
+    单次运行的追加式指标日志（JSON-lines）
+
+    Every call to ``append`` encodes one compact record, so logging cost no
+    longer grows with the length of the metric history. Records are buffered
+    until ``flush`` (or ``drain`` + ``write``); ``offset`` always counts the
+    bytes appended so far, written or not.
+
+    Args:
+        path: Path of the log file
+    """
+    def __init__(self, path: Union[str, pathlib.Path]):
+        self.path = pathlib.Path(path)
+        self.offset = self.path.stat().st_size if self.path.exists() else 0
+        self._pending = []
+        self._handle = None
+
+    def append(self, metrics: Dict[str, Any], step: Optional[int] = None) -> None:
+        """Append a metric record to the log buffer
+        向日志缓冲区追加一条指标记录"""
+        record = {"step": step, "metrics": metrics}
+        data = serialization.dumps(record) + b"\n"
+        self._pending.append(data)
+        self.offset += len(data)
+
+    def drain(self) -> bytes:
+        """Take all buffered records
+        取出所有缓冲的记录"""
+        data = b"".join(self._pending)
+        self._pending = []
+        return data
+
+    def write(self, data: bytes) -> None:
+        """Write drained records to the log file
+        将取出的记录写入日志文件"""
+        if not data:
+            return
+        if self._handle is None:
+            self._handle = open(self.path, "ab")
+        self._handle.write(data)
+        self._handle.flush()
+
+    def flush(self) -> None:
+        """Write all buffered records to the log file
+        将所有缓冲的记录写入日志文件"""
+        self.write(self.drain())
+
+    def close(self) -> None:
+        """Close the underlying file handle
+        关闭底层文件句柄"""
+        if self._handle is not None:
+            self._handle.close()
+            self._handle = None
+
+
+class BackgroundWriter:
+    """Background thread that coalesces persistence requests
+    合并持久化请求的后台线程
+
+    Callers ``notify`` the writer after each update; the flush callback runs
+    on the writer thread once ``interval`` seconds have passed or
+    ``max_pending`` updates have accumulated, whichever comes first.
+
+    Args:
+        flush_fn: Callback that writes all pending state
+        interval: Maximum seconds between flushes
+        max_pending: Number of updates that triggers an early flush
+    """
+    def __init__(self, flush_fn: Callable[[], None], interval: float = 1.0,
+                 max_pending: int = 100):
+        if interval <= 0:
+            raise ValueError("Flush interval must be positive")
+        if max_pending < 1:
+            raise ValueError("max_pending must be at least 1")
+        self.interval = interval
+        self.max_pending = max_pending
+        self.error: Optional[BaseException] = None
+        self._flush_fn = flush_fn
+        self._pending = 0
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stopped = False
+        self._thread = threading.Thread(
+            target=self._run, name="orruns-writer", daemon=True
+        )
+        self._thread.start()
+
+    def notify(self) -> None:
+        """Record that there is new state to flush
+        记录有新的待写入状态"""
+        with self._lock:
+            self._pending += 1
+            if self._pending >= self.max_pending:
+                self._wake.set()
+
+    def _run(self) -> None:
+        while not self._stopped:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            with self._lock:
+                pending, self._pending = self._pending, 0
+            if pending:
+                try:
+                    self._flush_fn()
+                except Exception as e:
+                    self.error = e
+
+    def stop(self) -> None:
+        """Stop the writer thread after its current flush
+        在当前写入完成后停止写入线程"""
+        self._stopped = True
+        self._wake.set()
+        self._thread.join()
+
+
+def merge_metrics(target: Dict, metrics: Dict, step: Optional[int] = None) -> Dict:
+    """Merge a (nested) metric update into ``target`` in place
+    将（嵌套的）指标更新原地合并到 ``target``
+
+    Stepped values are appended to a ``StepSeries`` (or to an already
+    serialized ``{"steps": [...], "values": [...]}`` series), plain values
+    replace whatever was stored before.
+    """
+    for key, value in metrics.items():
+        current = target.get(key)
+        if isinstance(value, dict):
+            if not isinstance(current, dict) or "steps" in current:
+                current = target[key] = {}
+            merge_metrics(current, value, step)
+        elif step is None:
+            target[key] = value
+        elif isinstance(current, StepSeries):
+            current.append(step, value)
+        elif isinstance(current, dict) and "steps" in current:
+            current["steps"].append(step)
+            current["values"].append(value)
+        else:
+            target[key] = StepSeries([step], [value])
+    return target
+
+
+def replay_metric_log(path: Union[str, pathlib.Path], metrics: Optional[Dict] = None,
+                      offset: int = 0) -> Dict:
+    """Replay a metric log on top of ``metrics`` starting at byte ``offset``
+    从字节偏移 ``offset`` 开始重放指标日志
+
+    A trailing partial record (e.g. left behind by a crash) is ignored.
+    """
+    metrics = {} if metrics is None else metrics
+    path = pathlib.Path(path)
+    if not path.exists():
+        return metrics
+    with open(path, "rb") as f:
+        f.seek(offset)
+        for line in f:
+            if not line.endswith(b"\n"):
+                break
+            record = serialization.loads(line)
+            merge_metrics(metrics, record["metrics"], record.get("step"))
+    return materialize_metrics(metrics)
+
+
+def resolve_summary(summary: Dict, run_dir: Union[str, pathlib.Path]) -> Dict:
+    """Bring a loaded summary up to date with the run's metric log
+    使用运行的指标日志更新已加载的摘要
+
+    Summaries written in ``"log"`` storage mode record how much of the log
+    they already contain; any records appended afterwards are replayed so
+    readers always see the complete ``{"steps": [...], "values": [...]}``
+    series. In ``"columnar"`` mode the column pointers are replaced by
+    memory-mapped ``{"steps": array, "values": array}`` columns.
+    """
+    if summary.get("metric_storage") == "columnar":
+        summary = dict(summary)
+        summary["metrics"] = load_columns(
+            summary.get("metrics", {}), pathlib.Path(run_dir) / "metrics"
+        )
+        return summary
+
+    offset = summary.get("metric_log_offset")
+    if offset is None:
+        return summary
+    log_path = pathlib.Path(run_dir) / "metrics" / METRIC_LOG_FILE
+    if log_path.exists() and log_path.stat().st_size > offset:
+        summary = dict(summary)
+        summary["metrics"] = replay_metric_log(
+            log_path, copy.deepcopy(summary.get("metrics", {})), offset
+        )
+    return summary
+
+
+def load_run_metrics(run_dir: Union[str, pathlib.Path]) -> Dict:
+    """Load the complete metrics of a run regardless of its storage mode
+    加载运行的完整指标（与存储模式无关）"""
+    run_dir = pathlib.Path(run_dir)
+    summary_file = run_dir / "summary.json"
+    if summary_file.exists():
+        return resolve_summary(load_summary(summary_file), run_dir).get("metrics", {})
+
+    metrics_file = run_dir / "metrics" / "metrics.json"
+    if metrics_file.exists():
+        return serialization.load(metrics_file)
+    return replay_metric_log(run_dir / "metrics" / METRIC_LOG_FILE)
+
+
+def flatten_metrics(metrics: Dict, prefix: str = "") -> Dict[str, Any]:
+    """Flatten nested metrics to dotted names, keeping stepped series whole
+    将嵌套指标展平为点分名称，带步骤的序列保持完整
+
+    Examples:
+        >>> flatten_metrics({"resources": {"rss_mb": {"steps": [0], "values": [12.5]}}})
+        {'resources.rss_mb': {'steps': [0], 'values': [12.5]}}
+    """
+    flat = {}
+    for key, value in metrics.items():
+        name = f"{prefix}{key}"
+        if isinstance(value, dict) and "steps" not in value:
+            flat.update(flatten_metrics(value, f"{name}."))
+        else:
+            flat[name] = value
+    return flat
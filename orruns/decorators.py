@@ -1,5 +1,19 @@
+import asyncio
+import collections
+import csv
 import functools
-from concurrent.futures import ProcessPoolExecutor, as_completed
+import inspect
+import math
+import os
+import queue
+import signal
+import statistics
+import tempfile
+import threading
+from concurrent.futures import (
+    FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, as_completed, wait
+)
+from concurrent.futures.process import BrokenProcessPool
 from typing import Optional, Callable, Any
 import time
 import cloudpickle
@@ -7,32 +21,87 @@ import multiprocessing as mp
 from .tracker import ExperimentTracker
 from typing import Optional, Callable, Any, List, Dict, Union
 import pickle
-import networkx as nx
-import pandas as pd
+import sys
 import numpy as np
 import pathlib
 import platform
 import hashlib
-import uuid
-import json
 from tqdm import tqdm
-from .utils.utils import get_system_info, print_system_info
-import matplotlib
-matplotlib.use('Agg')
-import matplotlib.pyplot as plt
+from .core import serialization
+from .core.affinity import WorkerPlacement, current_placement, plan_placement
+from .core.lazy import loaded_instance
+from .core.ledger import RunLedger, batch_key, new_batch_id
+from .core.pool import WorkerPool, get_default_pool
+from .core.seeding import derive_seed, run_generators, seed_globals
+from .core.storage import StorageTarget
+from .core.stats import P2Quantile, RunningStats
+from .errors import RunTimeoutError
+
+
+def _pyplot():
+    """Import pyplot on first use, with the Agg backend unless pyplot is already in use
+    首次使用时导入 pyplot；若 pyplot 尚未使用则采用 Agg 后端
+
+    Worker processes never plot, so they do not pay for importing matplotlib.
+    """
+    if "matplotlib.pyplot" not in sys.modules:
+        import matplotlib
+        matplotlib.use('Agg')
+    import matplotlib.pyplot as plt
+    return plt
+
 
 class ResultsMerger:
-    def __init__(self, experiment_name: str, base_dir: str, run_ids: List[str]):
+    """Merge the results of repeated runs while they complete
+    在重复运行完成的同时合并其结果
+
+    Results are consumed one at a time with ``add``: raw values are appended
+    to files on disk and only running statistics (Welford mean/variance,
+    min/max and P² quantiles) are kept in memory, so memory does not grow
+    with the number of runs. ``checkpoint`` writes the statistics merged so
+    far and ``finalize`` writes the remaining outputs and plots. Images are
+    the only data type buffered until ``finalize``.
+
+    Args:
+        experiment_name: Name of the experiment
+        base_dir: Base directory for experiments
+        run_ids: IDs of runs already merged
+        merge_config: Keys to merge per data type
+        checkpoint_every: Write a checkpoint every N results (0 disables)
+        batch_id: ID of the batch directory (default: a new ID)
+    """
+    # Quantiles reported for scalars, as in DataFrame.describe
+    # 标量报告的分位数，与 DataFrame.describe 一致
+    SCALAR_QUANTILES = (0.25, 0.5, 0.75)
+    # Values held in memory at a time when ``finalize`` reshapes the time series runs
+    # ``finalize`` 重排时间序列各次运行时一次在内存中保存的数值个数
+    TIME_SERIES_CHUNK = 1_000_000
+
+    def __init__(self, experiment_name: str, base_dir: str,
+                 run_ids: Optional[List[str]] = None,
+                 merge_config: Optional[Dict] = None,
+                 checkpoint_every: int = 0,
+                 batch_id: Optional[str] = None):
         """Initialize with actual run IDs
         使用实际运行ID初始化"""
 
         
         # Generate batch ID with timestamp and random hash
         # 使用时间戳和随机哈希生成批次ID
-        timestamp = time.strftime("%Y%m%d_%H%M%S")
-        random_hash = hashlib.md5(str(uuid.uuid4()).encode()).hexdigest()[:4]
-        self.batch_id = f"{timestamp}_{random_hash}"
-        self.run_ids = run_ids  # Store actual run IDs
+        self.batch_id = batch_id or new_batch_id()
+        self.run_ids = list(run_ids or [])  # Store actual run IDs
+        self.merge_config = merge_config or {}
+        self.checkpoint_every = checkpoint_every
+        self.n_results = 0
+        
+        # Running state per (data type, key)
+        # 每个（数据类型，键）的运行状态
+        self._stats: Dict[tuple, Optional[RunningStats]] = {}
+        self._quantiles: Dict[str, List[P2Quantile]] = {}
+        self._series_quantiles: Dict[str, List[List[P2Quantile]]] = {}
+        self._rows: Dict[tuple, list] = {}
+        self._figures: Dict[str, Any] = {}
+        self._started_files = set()
         
         # Create save directory
         # 创建保存目录
@@ -48,6 +117,7 @@ class ResultsMerger:
             "batch_id": self.batch_id,
             "timestamp": time.strftime("%Y-%m-%d %H:%M:%S"),
             "n_parallel_runs": len(self.run_ids),
+            "n_merged_results": self.n_results,
             "source_experiments": self.run_ids,  # Use actual run IDs
             "merge_time": time.strftime("%Y-%m-%d %H:%M:%S"),
             "system_info": {
@@ -59,245 +129,572 @@ class ResultsMerger:
         
         # Save metadata to JSON file
         # 将元数据保存到JSON文件
-        with open(self.save_dir / "batch_metadata.json", 'w') as f:
-            json.dump(metadata, f, indent=4)
+        serialization.dump(metadata, self.save_dir / "batch_metadata.json")
 
     def merge_results(self, results: List[dict], merge_config: Dict) -> None:
         """Merge different types of results according to configuration
         根据配置合并不同类型的结果"""
-        for data_type, keys in merge_config.items():
-            if data_type == "arrays":
-                self._merge_arrays(results, keys)
-            elif data_type == "scalars":
-                self._merge_scalars(results, keys)
-            elif data_type == "images":
-                self._merge_images(results, keys)
-            elif data_type == "time_series":
-                self._merge_time_series(results, keys)
-            elif data_type == "graphs":
-                self._merge_graphs(results, keys)
-            elif data_type == "distributions":
-                self._merge_distributions(results, keys)
-            elif data_type == "text":
-                self._merge_text(results, keys)
-            elif data_type == "models":
-                self._merge_models(results, keys)
-
-    def _merge_arrays(self, results: List[dict], keys: List[str]) -> None:
-        """Merge array data
-        合并数组数据"""
-        import h5py
-        
-        # 创建数组数据目录
-        array_dir = self.save_dir / "arrays"
-        array_dir.mkdir(exist_ok=True)
-        
+        self.merge_config = merge_config
+        # Start from empty figures, also when the merger is reused
+        # 从空白图形开始，即使合并器被重复使用
+        self._figures.clear()
+        for result in results:
+            self.add(result)
+        self.finalize()
+
+    def add(self, result: dict, run_id: Optional[str] = None) -> None:
+        """Merge the result of one run
+        合并单次运行的结果"""
+        index = self.n_results
+        for data_type, keys in self.merge_config.items():
+            handler = getattr(self, f"_add_{data_type}", None)
+            if handler is None:
+                continue
+            handler(index, result, keys)
+        self.n_results += 1
+        if run_id is not None:
+            self.run_ids.append(run_id)
+        if self.checkpoint_every and self.n_results % self.checkpoint_every == 0:
+            self.checkpoint()
+
+    def checkpoint(self) -> None:
+        """Write the statistics merged so far
+        写入目前为止合并的统计信息"""
+        self._save_metadata()
+        for data_type, keys in self.merge_config.items():
+            writer = getattr(self, f"_write_{data_type}", None)
+            if writer is not None:
+                writer(keys)
+
+    def finalize(self) -> None:
+        """Write all merged outputs, including plots
+        写入全部合并结果，包括图表"""
+        self.checkpoint()
+        for data_type, keys in self.merge_config.items():
+            finisher = getattr(self, f"_finalize_{data_type}", None)
+            if finisher is not None:
+                finisher(keys)
+            plotter = getattr(self, f"_plot_{data_type}", None)
+            if plotter is not None:
+                plotter(keys)
+
+    def scalar_statistics(self) -> Dict[str, Dict[str, float]]:
+        """Running statistics of the merged scalars
+        已合并标量的运行统计信息
+
+        Returns:
+            ``{key: {"count", "mean", "std", "min", "25%", "50%", "75%", "max"}}``
+        """
+        statistics = {}
+        for key in self.merge_config.get("scalars", []):
+            stats = self._stats.get(("scalars", key))
+            if stats is None:
+                continue
+            row = {"count": float(stats.count), "mean": float(stats.mean),
+                   "std": float(stats.std()), "min": float(stats.min)}
+            for quantile in self._quantiles[key]:
+                row[f"{quantile.p:.0%}"] = quantile.value
+            row["max"] = float(stats.max)
+            statistics[key] = row
+        return statistics
+
+    # Helpers / 辅助方法
+    def _append_row(self, path: pathlib.Path, header: List[Any], row: List[Any]) -> None:
+        """Append a CSV row, writing the header for a new file
+        追加CSV行，新文件先写表头"""
+        new = path not in self._started_files
+        if new:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            self._started_files.add(path)
+        with open(path, "w" if new else "a", newline="") as f:
+            writer = csv.writer(f)
+            if new:
+                writer.writerow(header)
+            writer.writerow(row)
+
+    def _update_stats(self, slot: tuple, value: Any) -> None:
+        """Update the running statistics of a slot; give up on shape changes
+        更新槽位的运行统计；形状变化时放弃统计"""
+        if slot in self._stats and self._stats[slot] is None:
+            return
+        stats = self._stats.setdefault(slot, RunningStats())
+        try:
+            stats.add(value)
+        except ValueError as e:
+            print(f"Could not compute statistics for {slot[1]}: {e}")
+            self._stats[slot] = None
+
+    # Scalars / 标量
+    def _add_scalars(self, index: int, result: dict, keys: List[str]) -> None:
+        self._append_row(self.save_dir / "scalars" / "raw_values.csv", ["run"] + list(keys),
+                         [index] + [result.get(key, "") for key in keys])
         for key in keys:
-            if key in results[0]:
-                # 收集所有运行的数据
-                all_data = [result[key] for result in results]
-                
-                # 转换为DataFrame保存
-                if isinstance(all_data[0], (list, np.ndarray)):
-                    df = pd.DataFrame(all_data)
-                    df.to_csv(array_dir / f"{key}.csv")
-                else:
-                    # 其他类型尝试JSON保存
-                    with open(array_dir / f"{key}.json", 'w') as f:
-                        json.dump(all_data, f, indent=4)
-                    #计算并保存统计信息
-                    try:
-                        arrays = [r[key] for r in results]
-                        if all(arr.shape == arrays[0].shape for arr in arrays):
-                            stats = f.create_group("statistics")
-                            stacked = np.stack(arrays)
-                            stats.create_dataset('mean', data=np.mean(stacked, axis=0))
-                            stats.create_dataset('std', data=np.std(stacked, axis=0))
-                            stats.create_dataset('min', data=np.min(stacked, axis=0))
-                            stats.create_dataset('max', data=np.max(stacked, axis=0))
-                    except Exception as e:
-                        print(f"Could not compute statistics for {key}: {e}")
-
-    def _merge_scalars(self, results: List[dict], keys: List[str]) -> None:
-        """Merge scalar data
-        合并标量数据"""
-        # 创建标量数据目录
+            try:
+                value = float(result[key])
+            except (KeyError, TypeError, ValueError):
+                continue
+            self._update_stats(("scalars", key), value)
+            quantiles = self._quantiles.setdefault(
+                key, [P2Quantile(p) for p in self.SCALAR_QUANTILES]
+            )
+            for quantile in quantiles:
+                quantile.add(value)
+
+    def _write_scalars(self, keys: List[str]) -> None:
+        statistics = self.scalar_statistics()
+        if statistics:
+            import pandas as pd
+            pd.DataFrame(statistics).to_csv(self.save_dir / "scalars" / "statistics.csv")
+
+    def _plot_scalars(self, keys: List[str]) -> None:
+        # Read the values back from disk for the histograms
+        # 从磁盘读回数值绘制直方图
         scalar_dir = self.save_dir / "scalars"
-        scalar_dir.mkdir(exist_ok=True)
-        
-        # 收集所有标量数据
-        data = []
-        for i, result in enumerate(results):
-            row = {'run': i}
-            for key in keys:
-                if key in result:
-                    row[key] = result[key]
-            data.append(row)
-        
-        # 创建数据框并保存
-        df = pd.DataFrame(data)
-        
-        # 保存原始数据
-        df.to_csv(scalar_dir / "raw_values.csv", index=False)
-        
-        # 计算并保存统计信息
-        stats = df.describe()
-        stats.to_csv(scalar_dir / "statistics.csv")
-        
-        # 为每个标量创建分布图
+        path = scalar_dir / "raw_values.csv"
+        if path not in self._started_files:
+            return
+        import pandas as pd
+        plt = _pyplot()
+        df = pd.read_csv(path)
         for key in keys:
-            if key in df.columns:
+            if key in df.columns and df[key].notna().any():
                 plt.figure(figsize=(10, 6))
-                plt.hist(df[key], bins=20, density=True)
+                plt.hist(df[key].dropna(), bins=20, density=True)
                 plt.title(f'{key} Distribution')
                 plt.xlabel('Value')
                 plt.ylabel('Density')
                 plt.savefig(scalar_dir / f"{key}_distribution.png")
                 plt.close()
-    def _merge_time_series(self, results: List[dict], keys: List[str]) -> None:
-        """Merge time series data
-        合并时间序列数据"""
+
+    # Arrays / 数组
+    def _add_arrays(self, index: int, result: dict, keys: List[str]) -> None:
         for key in keys:
-            if key in results[0]:
-                # Create multi-column time series dataframe
-                # 创建多列时间序列数据框
-                df = pd.DataFrame()
-                for i, result in enumerate(results):
-                    df[f'run_{i}'] = result[key]
-                
-                # Calculate statistics
-                # 计算统计信息
-                df['mean'] = df.mean(axis=1)
-                df['std'] = df.std(axis=1)
-                
-                # Save results
-                # 保存结果
-                df.to_csv(self.save_dir / f"{key}_timeseries.csv")
-                
-                # Plot time series
-                # 绘制时间序列图
-                plt.figure(figsize=(10, 6))
-                plt.plot(df['mean'], label='Mean')
-                plt.fill_between(
-                    df.index,
-                    df['mean'] - df['std'],
-                    df['mean'] + df['std'],
-                    alpha=0.2,
-                    label='±1 std'
+            if key not in result:
+                continue
+            value = result[key]
+            array_dir = self.save_dir / "arrays"
+            if isinstance(value, (list, np.ndarray)):
+                values = np.ravel(value)
+                self._append_row(array_dir / f"{key}.csv", [""] + list(range(len(values))),
+                                 [index, *values.tolist()])
+                self._update_stats(("arrays", key), value)
+            else:
+                # Other types are saved as JSON
+                # 其他类型保存为JSON
+                self._rows.setdefault(("arrays", key), []).append(value)
+
+    def _write_arrays(self, keys: List[str]) -> None:
+        array_dir = self.save_dir / "arrays"
+        for key in keys:
+            if ("arrays", key) in self._rows:
+                serialization.dump(self._rows[("arrays", key)], array_dir / f"{key}.json")
+            stats = self._stats.get(("arrays", key))
+            if stats is not None:
+                np.savez(
+                    array_dir / f"{key}_statistics.npz",
+                    count=stats.count, mean=stats.mean, std=stats.std(ddof=0),
+                    min=stats.min, max=stats.max
                 )
-                plt.title(f'{key} Time Series')
-                plt.savefig(self.save_dir / f"{key}_timeseries.png")
-                plt.close()
 
-    def _merge_images(self, results: List[dict], keys: List[str]) -> None:
-        """Merge image data
-        合并图像数据"""
+    # Time series / 时间序列
+    def _add_time_series(self, index: int, result: dict, keys: List[str]) -> None:
         for key in keys:
-            if key in results[0]:
-                # Create image grid
-                # 创建图像网格
-                n_images = len(results)
-                cols = min(5, n_images)
-                rows = (n_images + cols - 1) // cols
-                
-                fig, axes = plt.subplots(rows, cols, figsize=(cols*4, rows*4))
-                axes = axes.flatten()
-                
-                for i, result in enumerate(results):
-                    if isinstance(result[key], np.ndarray):
-                        axes[i].imshow(result[key])
-                        axes[i].set_title(f'Run {i}')
-                        axes[i].axis('off')
-                
-                plt.tight_layout()
-                plt.savefig(self.save_dir / f"{key}_grid.png")
-                plt.close()
+            if key not in result:
+                continue
+            value = result[key]
+            values = np.ravel(np.asarray(value, dtype=np.float64))
+            self._append_row(self.save_dir / f"{key}_runs.csv",
+                             ["run"] + list(range(len(values))), [index, *values.tolist()])
+            self._update_stats(("time_series", key), values)
+            if self._stats[("time_series", key)] is None:
+                continue
+            quantiles = self._series_quantiles.setdefault(
+                key, [[P2Quantile(p) for p in self.SCALAR_QUANTILES] for _ in values]
+            )
+            for step_quantiles, step_value in zip(quantiles, values.tolist()):
+                for quantile in step_quantiles:
+                    quantile.add(step_value)
+
+    def _time_series_statistics(self, key: str):
+        """Running statistics of a time series, one row per step
+        时间序列的运行统计信息，每步一行"""
+        import pandas as pd
+        stats = self._stats.get(("time_series", key))
+        if stats is None:
+            return None
+        columns = {"mean": stats.mean, "std": stats.std(), "min": stats.min}
+        for i, p in enumerate(self.SCALAR_QUANTILES):
+            columns[f"{p:.0%}"] = [step[i].value for step in self._series_quantiles[key]]
+        columns["max"] = stats.max
+        return pd.DataFrame(columns)
 
-    def _merge_graphs(self, results: List[dict], keys: List[str]) -> None:
-        """Merge graph structure data
-        合并图结构数据"""
+    def _write_time_series(self, keys: List[str]) -> None:
+        """Write the statistics merged so far; the runs stay in ``<key>_runs.csv``
+        写入目前为止合并的统计信息；各次运行保留在 ``<key>_runs.csv`` 中"""
         for key in keys:
-            if key in results[0]:
-                # Save statistics for each graph
-                # 保存每个图的统计信息
-                stats = []
-                for i, result in enumerate(results):
-                    if isinstance(result[key], nx.Graph):
-                        G = result[key]
-                        stats.append({
-                            'run': i,
-                            'n_nodes': G.number_of_nodes(),
-                            'n_edges': G.number_of_edges(),
-                            'density': nx.density(G),
-                            'avg_clustering': nx.average_clustering(G)
-                        })
-                
-                pd.DataFrame(stats).to_csv(
-                    self.save_dir / f"{key}_graph_stats.csv"
-                )
+            statistics = self._time_series_statistics(key)
+            if statistics is not None:
+                statistics.to_csv(self.save_dir / f"{key}_timeseries_statistics.csv")
 
-    def _merge_distributions(self, results: List[dict], keys: List[str]) -> None:
-        """Merge distribution data
-        合并分布数据"""
+    def _finalize_time_series(self, keys: List[str]) -> None:
+        """Write one ``run_<i>`` column per run followed by the statistics
+        写入每次运行一列 ``run_<i>``，随后是统计信息
+
+        The row-per-run file is read once in chunks and transposed through a
+        memory-mapped temporary file, so memory stays bounded by
+        ``TIME_SERIES_CHUNK`` values.
+        """
+        import pandas as pd
         for key in keys:
-            if key in results[0]:
-                plt.figure(figsize=(10, 6))
-                for i, result in enumerate(results):
-                    plt.hist(
-                        result[key], 
-                        alpha=0.3, 
-                        label=f'Run {i}',
-                        density=True
-                    )
-                plt.title(f'{key} Distribution')
-                plt.legend()
-                plt.savefig(self.save_dir / f"{key}_distribution.png")
-                plt.close()
+            statistics = self._time_series_statistics(key)
+            if statistics is None:
+                continue
+            n_runs = self._stats[("time_series", key)].count
+            length = len(statistics)
+            with tempfile.TemporaryFile() as buffer:
+                runs = np.memmap(buffer, dtype=np.float64, mode="w+", shape=(n_runs, length))
+                labels = []
+                chunks = pd.read_csv(self.save_dir / f"{key}_runs.csv", index_col=0,
+                                     chunksize=max(1, self.TIME_SERIES_CHUNK // length))
+                for chunk in chunks:
+                    start = len(labels)
+                    runs[start:start + len(chunk)] = chunk.to_numpy(dtype=np.float64)
+                    labels.extend(f"run_{run}" for run in chunk.index)
+                # Write the steps in blocks of the transposed runs
+                # 按块写入转置后各次运行的步
+                block_steps = max(1, self.TIME_SERIES_CHUNK // n_runs)
+                with open(self.save_dir / f"{key}_timeseries.csv", "w", newline="") as f:
+                    for begin in range(0, length, block_steps):
+                        end = min(begin + block_steps, length)
+                        block = pd.DataFrame(runs[:, begin:end].T, columns=labels,
+                                             index=range(begin, end))
+                        block.join(statistics.iloc[begin:end]).to_csv(f, header=begin == 0)
+                del runs
+
+    def _plot_time_series(self, keys: List[str]) -> None:
+        """Plot the mean time series with a ±1 std band
+        绘制带±1标准差区间的平均时间序列"""
+        plt = _pyplot()
+        for key in keys:
+            stats = self._stats.get(("time_series", key))
+            if stats is None:
+                continue
+            mean, std = stats.mean, stats.std()
+            steps = np.arange(len(mean))
+            plt.figure(figsize=(10, 6))
+            plt.plot(steps, mean, label='Mean')
+            plt.fill_between(
+                steps,
+                mean - std,
+                mean + std,
+                alpha=0.2,
+                label='±1 std'
+            )
+            plt.title(f'{key} Time Series')
+            plt.savefig(self.save_dir / f"{key}_timeseries.png")
+            plt.close()
+
+    # Images / 图像
+    def _add_images(self, index: int, result: dict, keys: List[str]) -> None:
+        for key in keys:
+            if key not in result:
+                continue
+            value = result[key]
+            self._rows.setdefault(("images", key), []).append((index, value))
+
+    def _plot_images(self, keys: List[str]) -> None:
+        """Merge image data into a grid
+        将图像数据合并为网格"""
+        plt = _pyplot()
+        for key in keys:
+            images = self._rows.get(("images", key))
+            if not images:
+                continue
+            # Create image grid
+            # 创建图像网格
+            n_images = len(images)
+            cols = min(5, n_images)
+            rows = (n_images + cols - 1) // cols
+            
+            fig, axes = plt.subplots(rows, cols, figsize=(cols*4, rows*4), squeeze=False)
+            axes = axes.flatten()
+            
+            for ax, (i, image) in zip(axes, images):
+                if isinstance(image, np.ndarray):
+                    ax.imshow(image)
+                    ax.set_title(f'Run {i}')
+                    ax.axis('off')
+            
+            plt.tight_layout()
+            plt.savefig(self.save_dir / f"{key}_grid.png")
+            plt.close()
+
+    # Graphs / 图结构
+    def _add_graphs(self, index: int, result: dict, keys: List[str]) -> None:
+        for key in keys:
+            if key not in result:
+                continue
+            value = result[key]
+            if loaded_instance(value, "networkx", "Graph"):
+                import networkx as nx
+                self._rows.setdefault(("graphs", key), []).append({
+                    'run': index,
+                    'n_nodes': value.number_of_nodes(),
+                    'n_edges': value.number_of_edges(),
+                    'density': nx.density(value),
+                    'avg_clustering': nx.average_clustering(value)
+                })
+
+    def _write_graphs(self, keys: List[str]) -> None:
+        for key in keys:
+            stats = self._rows.get(("graphs", key))
+            if stats:
+                import pandas as pd
+                pd.DataFrame(stats).to_csv(self.save_dir / f"{key}_graph_stats.csv")
 
-    def _merge_text(self, results: List[dict], keys: List[str]) -> None:
-        """Merge text data
-        合并文本数据"""
+    # Distributions / 分布
+    def _add_distributions(self, index: int, result: dict, keys: List[str]) -> None:
         for key in keys:
-            if key in results[0]:
-                # Save all texts
-                # 保存所有文本
-                with open(self.save_dir / f"{key}_all.txt", 'w') as f:
-                    for i, result in enumerate(results):
-                        f.write(f"=== Run {i} ===\n")
-                        f.write(result[key])
-                        f.write("\n\n")
-
-    def _merge_models(self, results: List[dict], keys: List[str]) -> None:
-        """Merge model data
-        合并模型数据"""
+            if key not in result:
+                continue
+            value = result[key]
+            # Each run is drawn as it arrives; only the figure is kept. It is
+            # not managed by pyplot, so other plots never draw into it
+            # 每次运行到达时即绘制；只保留图形。该图形不由 pyplot 管理，
+            # 因此其他绘图不会画到它上面
+            if key not in self._figures:
+                from matplotlib.figure import Figure
+                fig = Figure(figsize=(10, 6))
+                self._figures[key] = (fig, fig.add_subplot())
+            _, ax = self._figures[key]
+            ax.hist(value, alpha=0.3, label=f'Run {index}', density=True)
+
+    def _plot_distributions(self, keys: List[str]) -> None:
+        for key in keys:
+            if key not in self._figures:
+                continue
+            fig, ax = self._figures.pop(key)
+            ax.set_title(f'{key} Distribution')
+            ax.legend()
+            fig.savefig(self.save_dir / f"{key}_distribution.png")
+
+    # Text / 文本
+    def _add_text(self, index: int, result: dict, keys: List[str]) -> None:
+        for key in keys:
+            if key not in result:
+                continue
+            value = result[key]
+            path = self.save_dir / f"{key}_all.txt"
+            new = path not in self._started_files
+            self._started_files.add(path)
+            with open(path, "w" if new else "a") as f:
+                f.write(f"=== Run {index} ===\n")
+                f.write(value)
+                f.write("\n\n")
+
+    # Models / 模型
+    def _add_models(self, index: int, result: dict, keys: List[str]) -> None:
         for key in keys:
-            if key in results[0]:
-                model_dir = self.save_dir / f"{key}_models"
-                model_dir.mkdir(exist_ok=True)
-                
-                for i, result in enumerate(results):
-                    with open(model_dir / f"model_{i}.pkl", 'wb') as f:
-                        pickle.dump(result[key], f)
-
-def _serialize_result(result: Any) -> Any:
+            if key not in result:
+                continue
+            value = result[key]
+            model_dir = self.save_dir / f"{key}_models"
+            model_dir.mkdir(exist_ok=True)
+            with open(model_dir / f"model_{index}.pkl", 'wb') as f:
+                pickle.dump(value, f)
+
+
+BACKENDS = ("serial", "process", "thread", "asyncio")
+RUN_ORDERS = ("index", "longest_first")
+ARRAY_TRANSPORTS = ("pickle", "mmap")
+
+# Arrays smaller than this are pickled even with array_transport="mmap"
+# 小于此大小的数组即使在 array_transport="mmap" 时也通过 pickle 传输
+MMAP_MIN_BYTES = 1 << 20
+
+
+class _ArrayFile:
+    """Reference to an array a worker saved as ``.npy``
+    工作进程保存为 ``.npy`` 的数组引用"""
+    __slots__ = ("path",)
+
+    def __init__(self, path: str):
+        self.path = path
+
+
+class _ArrayWriter:
+    """Save large result arrays of one run under its run directory
+    将单次运行的大型结果数组保存到其运行目录下"""
+    def __init__(self, directory: pathlib.Path):
+        self.directory = directory
+        self.count = 0
+
+    def save(self, array: np.ndarray) -> Any:
+        if array.nbytes < MMAP_MIN_BYTES or array.dtype.hasobject:
+            return array
+        self.directory.mkdir(parents=True, exist_ok=True)
+        path = self.directory / f"array_{self.count}.npy"
+        self.count += 1
+        np.save(path, array)
+        return _ArrayFile(str(path))
+
+
+def _load_arrays(result: Any) -> Any:
+    """Replace array references by read-only memory-mapped arrays
+    将数组引用替换为只读内存映射数组"""
+    if isinstance(result, _ArrayFile):
+        return np.load(result.path, mmap_mode="r")
+    if isinstance(result, dict):
+        return {k: _load_arrays(v) for k, v in result.items()}
+    if isinstance(result, list):
+        return [_load_arrays(x) for x in result]
+    return result
+
+
+def _serialize_result(result: Any, writer: Optional[_ArrayWriter] = None) -> Any:
     """Serialize results for multiprocessing
-    序列化结果用于多进程"""
+    序列化结果用于多进程
+
+    NumPy arrays and scalars are kept as they are: they pickle efficiently
+    and the JSON layer encodes them natively. With a ``writer``, large
+    arrays are saved to disk and only their path is sent back.
+    """
     if isinstance(result, dict):
-        return {k: _serialize_result(v) for k, v in result.items()}
+        return {k: _serialize_result(v, writer) for k, v in result.items()}
     elif isinstance(result, list):
-        return [_serialize_result(x) for x in result]
+        return [_serialize_result(x, writer) for x in result]
     elif isinstance(result, np.ndarray):
-        return result.tolist()
-    elif isinstance(result, (np.integer, np.floating)):
-        return float(result)
-    elif isinstance(result, pd.DataFrame):
+        return writer.save(result) if writer is not None else result
+    elif isinstance(result, np.generic):
+        return result
+    elif loaded_instance(result, "pandas", "DataFrame"):
         return result.to_dict()
-    elif isinstance(result, pd.Series):
+    elif loaded_instance(result, "pandas", "Series"):
         return result.to_list()
     elif hasattr(result, 'to_dict'):
         return result.to_dict()
     return result
-def _run_single_experiment(serialized_func, experiment_name, run_index, times, args, kwargs):
+
+
+# Functions deserialized in this worker process, keyed by digest
+# 本工作进程中已反序列化的函数（按摘要索引）
+_worker_functions: Dict[str, Callable] = {}
+
+
+def _init_worker(func_digest: Optional[str], serialized_func: Optional[bytes],
+                 placement: Optional[WorkerPlacement] = None) -> None:
+    """Worker initializer: pin the worker and deserialize the experiment function once
+    工作进程初始化：绑定工作进程并只反序列化一次实验函数"""
+    if placement is not None:
+        placement.apply()
+    if func_digest is not None:
+        _worker_functions[func_digest] = cloudpickle.loads(serialized_func)
+
+
+def _load_function(func_digest: str, serialized_func: Optional[bytes]) -> Callable:
+    """Return the cached experiment function, deserializing it on first use
+    返回缓存的实验函数，首次使用时反序列化"""
+    func = _worker_functions.get(func_digest)
+    if func is None:
+        if len(_worker_functions) >= 16:
+            _worker_functions.clear()
+        func = _worker_functions[func_digest] = cloudpickle.loads(serialized_func)
+    return func
+
+
+def _array_writer(tracker: ExperimentTracker, array_transport: str) -> Optional[_ArrayWriter]:
+    """Array writer for a run, or None when arrays are pickled
+    运行的数组写入器，数组通过 pickle 传输时为 None"""
+    if array_transport == "mmap":
+        return _ArrayWriter(tracker.run_dir / "results")
+    return None
+
+
+def _call_with_timeout(func, tracker, args, kwargs, timeout):
+    """Call the experiment function, interrupting it after ``timeout`` seconds
+    调用实验函数，在 ``timeout`` 秒后中断
+
+    The limit is enforced with SIGALRM, which only works in the main thread
+    of a process and only interrupts Python code; workers stuck in native
+    code are killed by the scheduler instead.
+    """
+    if (timeout is None or not hasattr(signal, "setitimer")
+            or threading.current_thread() is not threading.main_thread()):
+        return func(tracker, *args, **kwargs)
+
+    def on_alarm(signum, frame):
+        raise RunTimeoutError(timeout, tracker.run_id)
+
+    previous = signal.signal(signal.SIGALRM, on_alarm)
+    signal.setitimer(signal.ITIMER_REAL, timeout)
+    try:
+        return func(tracker, *args, **kwargs)
+    finally:
+        signal.setitimer(signal.ITIMER_REAL, 0)
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _execute_run(func, experiment_name, run_index, times, args, kwargs, parallel,
+                 array_transport="pickle", timeout=None, started=None, attempt=0,
+                 seed=None, storage=None, concurrent=False):
+    """Run a single experiment and return ``(result, run_id, duration)``
+    运行单次实验并返回 ``(result, run_id, duration)``
+
+    The run's status is set to "timeout" or "failed" when it does not
+    complete. ``started`` is an optional queue receiving
+    ``(run_index, attempt, pid, start_time, run_id)`` when the run starts.
+    """
+    tracker = _start_tracker(experiment_name, run_index, times, parallel, attempt, seed, storage,
+                             concurrent)
+    try:
+        if started is not None:
+            started.put((run_index, attempt, os.getpid(), time.time(), tracker.run_id))
+        begin = time.perf_counter()
+        try:
+            result = _call_with_timeout(func, tracker, args, kwargs, timeout)
+        except RunTimeoutError:
+            tracker.set_status("timeout")
+            raise
+        except Exception:
+            tracker.set_status("failed")
+            raise
+        duration = time.perf_counter() - begin
+        result = _serialize_result(result, _array_writer(tracker, array_transport))
+        return result, tracker.run_id, duration
+    finally:
+        tracker.close()
+
+
+def _run_experiment_chunk(func_digest, serialized_func, experiment_name, run_indices,
+                          times, args, kwargs, array_transport="pickle", timeout=None,
+                          started=None, attempt=0, seed=None, storage=None):
+    """Run a batch of runs in a worker process
+    在工作进程中运行一批实验
+
+    The function is only sent along when the worker was not initialized
+    with it, and is deserialized once per worker. Results of the whole
+    batch are returned together as ``(run_index, result, run_id, duration)``
+    tuples, with a ``RunTimeoutError`` as result for timed-out runs; failed
+    runs are reported and skipped.
+    """
+    func = _load_function(func_digest, serialized_func)
+    batch = []
+    for run_index in run_indices:
+        try:
+            batch.append((run_index, *_execute_run(
+                func, experiment_name, run_index, times, args, kwargs, True,
+                array_transport, timeout, started, attempt, seed, storage
+            )))
+        except RunTimeoutError as e:
+            batch.append((run_index, e, e.run_id, None))
+        except Exception as e:
+            print(f"Run {run_index + 1}/{times} failed: {str(e)}")
+    return batch
+
+
+def _run_single_experiment(serialized_func, experiment_name, run_index, times, args, kwargs,
+                           array_transport="pickle", timeout=None, started=None, attempt=0,
+                           seed=None, storage=None):
     """Top-level function executed in a process
     在进程中执行的顶层函数"""
     print(f"Starting run {run_index + 1}/{times}")
@@ -305,24 +702,502 @@ def _run_single_experiment(serialized_func, experiment_name, run_index, times, a
         # Deserialize the function
         # 反序列化函数
         func = cloudpickle.loads(serialized_func)
-        # Create a tracker
-        # 创建追踪器
-        tracker = ExperimentTracker(experiment_name)
-        tracker.log_params({
-            "run_index": run_index,
-            "total_runs": times,
-            "parallel": True,
-            "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-        })
-        result = func(tracker, *args, **kwargs)
+        outcome = _execute_run(
+            func, experiment_name, run_index, times, args, kwargs, True,
+            array_transport, timeout, started, attempt, seed, storage
+        )
         print(f"Run {run_index + 1}/{times} completed")
-        # 返回结果和 run_id
-        serialized_result = _serialize_result(result)
-        return serialized_result, tracker.run_id
+        # 返回结果、run_id 和耗时
+        return outcome
     except Exception as e:
         print(f"Run {run_index + 1}/{times} failed: {str(e)}")
         raise
 
+
+def _start_tracker(experiment_name: str, run_index: int, times: int,
+                   parallel: bool, attempt: int = 0, seed: Optional[int] = None,
+                   storage: Optional[StorageTarget] = None,
+                   concurrent: bool = False) -> ExperimentTracker:
+    """Create the tracker of a run and log its run parameters
+    创建运行的追踪器并记录运行参数
+
+    With a master ``seed``, the seed derived for the run and ``attempt`` is
+    logged as ``run_seed`` and gives the tracker its own generators (``tracker.rng`` and
+    ``tracker.py_random``). The global random number generators are seeded
+    too, unless the run is ``concurrent`` with others in this process.
+    """
+    tracker = StorageTarget.resolve(storage).tracker(experiment_name)
+    params = {
+        "run_index": run_index,
+        "total_runs": times,
+        "parallel": parallel,
+        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
+    }
+    if attempt:
+        # Speculative re-execution of a straggler
+        # 慢任务的推测性重新执行
+        params["attempt"] = attempt
+    placement = current_placement()
+    if placement is not None:
+        # CPUs and BLAS threads of the worker running this run
+        # 执行本次运行的工作进程的CPU和BLAS线程
+        params["placement"] = placement
+    if seed is not None:
+        # A speculative attempt gets its own seed, so it is not a copy of the
+        # first attempt; replay uses the seed of the attempt that was kept
+        # 推测性尝试使用自己的种子，因此不是首次尝试的副本；重放使用被采用尝试的种子
+        params["seed"] = seed
+        params["run_seed"] = derive_seed(seed, run_index, attempt)
+        tracker.rng, tracker.py_random = run_generators(params["run_seed"])
+        if not concurrent:
+            seed_globals(params["run_seed"])
+    tracker.log_params(params)
+    return tracker
+
+
+def _run_in_thread(func, experiment_name, run_index, times, args, kwargs, seed=None,
+                   storage=None):
+    """Run a single experiment in a worker thread of this process
+    在本进程的工作线程中运行单次实验"""
+    return _execute_run(func, experiment_name, run_index, times, args, kwargs, True,
+                        seed=seed, storage=storage, concurrent=True)
+
+
+async def _run_in_loop(func, experiment_name, run_index, times, args, kwargs, timeout=None,
+                       seed=None, storage=None):
+    """Run a single experiment on the event loop
+    在事件循环中运行单次实验
+
+    Synchronous functions run in the loop's default thread pool so they do
+    not block the loop. With a ``timeout`` the run is cancelled when the limit is reached
+    (a synchronous function keeps running in its thread, and whatever it
+    logs afterwards is dropped).
+    """
+    tracker = _start_tracker(experiment_name, run_index, times, parallel=True, seed=seed,
+                             storage=storage, concurrent=True)
+    if inspect.iscoroutinefunction(func):
+        call = func(tracker, *args, **kwargs)
+    else:
+        # run_in_executor instead of asyncio.to_thread (Python 3.9+)
+        # 使用 run_in_executor 而不是 asyncio.to_thread（需要 Python 3.9+）
+        call = asyncio.get_running_loop().run_in_executor(
+            None, functools.partial(func, tracker, *args, **kwargs)
+        )
+    begin = time.perf_counter()
+    try:
+        result = await asyncio.wait_for(call, timeout)
+    except asyncio.TimeoutError:
+        tracker.set_status("timeout")
+        # Do not let the thread still running the function write into the run
+        # 不让仍在运行函数的线程写入该运行
+        tracker.abandon()
+        raise RunTimeoutError(timeout, tracker.run_id)
+    except Exception:
+        tracker.set_status("failed")
+        raise
+    finally:
+        tracker.close()
+    return _serialize_result(result), tracker.run_id, time.perf_counter() - begin
+
+
+def _run_coroutine(coro) -> Any:
+    """Run a coroutine to completion, also when an event loop is already running
+    运行协程直至完成，即使当前已有运行中的事件循环"""
+    try:
+        asyncio.get_running_loop()
+    except RuntimeError:
+        return asyncio.run(coro)
+    # e.g. inside Jupyter: use a fresh loop in another thread
+    # 例如在 Jupyter 中：在另一个线程中使用新的事件循环
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        return executor.submit(asyncio.run, coro).result()
+
+
+# Seconds between checks for timed-out runs and stragglers
+# 检查超时运行和慢任务的时间间隔（秒）
+SCHEDULER_POLL_INTERVAL = 0.2
+# Seconds a run may exceed its time limit before its worker is killed
+# 运行超过时间限制后，工作进程被终止前的宽限时间（秒）
+HARD_TIMEOUT_GRACE = 5.0
+# Expected total run time (seconds) below which parallel batches run in-process
+# 预计总运行时间（秒）低于此值时，并行批次在当前进程中运行
+IN_PROCESS_THRESHOLD = 2.0
+# Runs taking longer than this multiple of the median are stragglers
+# 耗时超过中位数此倍数的运行视为慢任务
+STRAGGLER_FACTOR = 2.0
+# Completed runs needed before stragglers are detected
+# 检测慢任务前需要完成的运行数
+STRAGGLER_MIN_RUNS = 3
+# Times a run is submitted again after a worker died while it may have been running
+# 工作进程在运行可能正在执行时退出后，该运行被重新提交的次数
+MAX_RUN_RESTARTS = 2
+
+
+def _prefer_in_process(pending: List[int], expected: Dict[int, float]) -> bool:
+    """Whether running in this process is expected to beat starting workers
+    预计在当前进程中运行是否比启动工作进程更快
+
+    True for a single run, or when earlier batches show the pending runs
+    take less than ``IN_PROCESS_THRESHOLD`` seconds in total. Parallel
+    batches that may run in-process record their run durations in their
+    ledger for this.
+    """
+    if len(pending) <= 1:
+        return True
+    if any(i not in expected for i in pending):
+        return False
+    return sum(expected[i] for i in pending) < IN_PROCESS_THRESHOLD
+
+
+class _ProcessScheduler:
+    """Run a batch on worker processes
+    在工作进程中运行一个批次
+
+    Runs are submitted one per task (or ``chunksize`` per task). With a
+    ``timeout``, runs are interrupted in the worker when the limit is
+    reached; a worker that does not return within ``HARD_TIMEOUT_GRACE``
+    seconds more is killed, which breaks the executor, so the runs that
+    were still in flight are submitted again to a fresh one. A pool first
+    retires its executor so later batches get fresh workers, and workers of
+    an executor that other batches are using are never killed. When a worker
+    dies on its own (a crash, ``os._exit``), the runs that were running are
+    run again, each on its own, and a run that kills its worker more than
+    ``MAX_RUN_RESTARTS`` times is recorded as failed; if workers die before
+    starting any run (e.g. a failing initializer), the batch fails after
+    ``MAX_RUN_RESTARTS`` retries. With
+    ``speculative``, runs taking more than ``STRAGGLER_FACTOR`` times the
+    median run time are started a second time on idle workers (with
+    ``attempt=1`` and a seed of their own in their parameters) and the first
+    attempt to finish wins.
+    """
+    def __init__(self, func, experiment_name, times, args, kwargs, max_workers, pool,
+                 chunksize, array_transport, timeout, speculative, ledger, collect,
+                 cpu_affinity=None, blas_threads=None, seed=None, storage=None):
+        self.serialized_func = cloudpickle.dumps(func)
+        self.func_digest = hashlib.sha1(self.serialized_func).hexdigest()
+        self.experiment_name = experiment_name
+        self.times = times
+        self.args = args
+        self.kwargs = kwargs
+        self.max_workers = max_workers
+        self.pool = get_default_pool(max_workers) if pool is True else pool
+        self.chunksize = chunksize
+        self.array_transport = array_transport
+        self.timeout = timeout
+        self.speculative = speculative
+        self.cpu_affinity = cpu_affinity
+        self.blas_threads = blas_threads
+        # One placement for all rounds, so slots of finished workers are reused
+        # 所有轮次共用一个放置，以便复用已结束工作进程的槽位
+        self.placement = None
+        if self.pool is None and (cpu_affinity is not None or blas_threads is not None):
+            self.placement = WorkerPlacement(cpu_affinity, blas_threads)
+        self.seed = seed
+        self.storage = StorageTarget.resolve(storage)
+        self.ledger = ledger
+        self.collect = collect
+        self.workers = (self.pool.max_workers if self.pool is not None
+                        else max_workers or mp.cpu_count())
+        # Indices with a final outcome (completed, failed or timed out)
+        # 已有最终结果（完成、失败或超时）的索引
+        self.settled = set()
+        # Times each index killed its worker, indices that may have killed
+        # one (run alone from then on) and executors that broke before
+        # starting any run
+        # 每个索引导致工作进程退出的次数、可能导致工作进程退出的索引（之后单独运行）
+        # 以及在开始任何运行之前就损坏的执行器数量
+        self.restarts = collections.Counter()
+        self.suspects = set()
+        self.startup_failures = 0
+        self.durations = []
+        self.speculated = set()
+        self.started = None
+
+    def run(self, indices: List[int], pbar: tqdm) -> None:
+        """Run the given indices in order of submission
+        按提交顺序运行给定索引"""
+        self._manager = None
+        self.started = None
+        if self.timeout is not None or self.speculative:
+            self._watch_starts()
+        try:
+            remaining = list(indices)
+            while remaining:
+                # Runs suspected of killing a worker run alone, so the next
+                # crash is blamed on the right run
+                # 可能导致工作进程退出的运行单独运行，以便将下次崩溃归咎于正确的运行
+                rerun = set()
+                for index in remaining:
+                    if index in self.suspects:
+                        rerun.update(self._run_round([index], pbar))
+                batch = [index for index in remaining if index not in self.suspects]
+                if batch:
+                    rerun.update(self._run_round(batch, pbar))
+                remaining = [index for index in remaining if index in rerun]
+        finally:
+            if self._manager is not None:
+                self._manager.shutdown()
+
+    def _watch_starts(self) -> None:
+        """Have workers report the runs they start through a queue
+        让工作进程通过队列报告开始的运行"""
+        self._manager = mp.get_context("spawn").Manager()
+        self.started = self._manager.Queue()
+
+    def _executor(self, n_tasks: int):
+        """Executor context for a round of ``n_tasks`` tasks and the function payload for chunks"""
+        if self.pool is not None:
+            # Reuse long-lived workers; the pool is not shut down here
+            # 复用长生命周期的工作进程；此处不关闭进程池
+            return self.pool.session(), self.serialized_func
+        # Create processes using the spawn method
+        # 使用 spawn 方法创建进程
+        init_kwargs = {}
+        chunk_func = self.serialized_func
+        placement = self.placement
+        if self.chunksize > 1:
+            # Send the function once per worker
+            # 每个工作进程只发送一次函数
+            init_kwargs = {
+                "initializer": _init_worker,
+                "initargs": (self.func_digest, self.serialized_func, placement)
+            }
+            chunk_func = None
+        elif placement is not None:
+            init_kwargs = {"initializer": _init_worker, "initargs": (None, None, placement)}
+        executor = ProcessPoolExecutor(
+            max_workers=self.max_workers,
+            mp_context=mp.get_context('spawn'),
+            **init_kwargs
+        )
+        if placement is not None:
+            placement.start_workers(executor, min(self.workers, n_tasks))
+        return executor, chunk_func
+
+    def _submit(self, executor, indices: List[int], attempt: int, chunk_func) -> None:
+        if self.chunksize > 1:
+            future = executor.submit(
+                _run_experiment_chunk, self.func_digest, chunk_func, self.experiment_name,
+                indices, self.times, self.args, self.kwargs, self.array_transport,
+                self.timeout, self.started, attempt, self.seed, self.storage
+            )
+        else:
+            future = executor.submit(
+                _run_single_experiment, self.serialized_func, self.experiment_name,
+                indices[0], self.times, self.args, self.kwargs, self.array_transport,
+                self.timeout, self.started, attempt, self.seed, self.storage
+            )
+        self._futures[future] = (indices, attempt)
+        for index in indices:
+            self._in_flight[index] += 1
+
+    def _run_round(self, indices: List[int], pbar: tqdm) -> List[int]:
+        """Run indices on one executor; return those to run again if it broke"""
+        n_tasks = -(-len(indices) // self.chunksize)
+        executor_context, chunk_func = self._executor(n_tasks)
+        # Finished futures are dropped so their results can be freed
+        # 丢弃已完成的 future 以便释放其结果
+        self._futures = {}
+        self._in_flight = collections.Counter()
+        # pid -> (index, attempt, start time, run_id) of the run each worker is executing
+        # pid -> 每个工作进程正在执行的运行 (index, attempt, start time, run_id)
+        self._running = {}
+        # Indices running on a worker when the executor broke, and whether
+        # the scheduler killed a worker itself
+        # 执行器损坏时正在工作进程上运行的索引，以及调度器是否主动终止了工作进程
+        self._crashed = set()
+        self._killed = False
+        broken = False
+        with executor_context as executor:
+            for start in range(0, len(indices), self.chunksize):
+                self._submit(executor, indices[start:start + self.chunksize], 0, chunk_func)
+            while self._futures:
+                done, _ = wait(
+                    self._futures, return_when=FIRST_COMPLETED,
+                    timeout=SCHEDULER_POLL_INTERVAL if self.started is not None else None
+                )
+                if self.started is not None:
+                    self._drain_started()
+                for future in done:
+                    broken |= self._handle(future, pbar)
+                if self.started is not None and not broken:
+                    if self._only_losers_left(executor):
+                        break
+                    self._check_running(executor, chunk_func, pbar)
+        if broken:
+            return self._after_break(indices)
+        return []
+
+    def _after_break(self, indices: List[int]) -> List[int]:
+        """Count the broken executor against the runs that may have caused it;
+        return the indices to run again
+        将执行器损坏计入可能导致它的运行；返回需要重新运行的索引"""
+        unsettled = [index for index in indices if index not in self.settled]
+        if self._killed:
+            # Broken on purpose by a hard timeout
+            # 因强制超时而主动损坏
+            return unsettled
+        if self.started is None:
+            # Unknown which runs were running: find out from now on
+            # 不知道哪些运行正在执行：从现在开始记录
+            self._watch_starts()
+            return unsettled
+        if not self._crashed:
+            # Workers die before starting runs, e.g. in their initializer
+            # 工作进程在开始运行前退出，例如在初始化函数中
+            self.startup_failures += 1
+            if self.startup_failures > MAX_RUN_RESTARTS:
+                for index in unsettled:
+                    self._fail(index, "worker process failed to start")
+                return []
+            return unsettled
+        self.suspects.update(self._crashed)
+        if len(self._crashed) == 1:
+            # Only one run was running: it killed the worker
+            # 只有一个运行正在执行：是它导致工作进程退出
+            index = next(iter(self._crashed))
+            self.restarts[index] += 1
+            if self.restarts[index] > MAX_RUN_RESTARTS:
+                self._fail(index, "worker process died")
+        return [index for index in unsettled if index not in self.settled]
+
+    def _handle(self, future, pbar: tqdm) -> bool:
+        """Process a finished future; return True if the executor broke"""
+        indices, attempt = self._futures.pop(future)
+        for index in indices:
+            self._in_flight[index] -= 1
+        running = set()
+        for pid, (index, run_attempt, _, _) in list(self._running.items()):
+            if index in indices and run_attempt == attempt:
+                running.add(index)
+                del self._running[pid]
+        try:
+            outcome = future.result()
+        except BrokenProcessPool:
+            self._crashed.update(running)
+            return True
+        except RunTimeoutError as e:
+            outcome = [(indices[0], e, e.run_id, None)]
+        except Exception as e:
+            for index in indices:
+                self._fail(index, e)
+            return False
+        if self.chunksize == 1 and not isinstance(outcome, list):
+            outcome = [(indices[0], *outcome)]
+        returned = set()
+        for index, result, run_id, duration in outcome:
+            returned.add(index)
+            if isinstance(result, RunTimeoutError):
+                self._time_out(index, run_id)
+            elif index not in self.settled:
+                # The first attempt to finish wins
+                # 最先完成的尝试胜出
+                self.settled.add(index)
+                self.durations.append(duration)
+                self.collect(index, result, run_id, duration, attempt=attempt)
+                pbar.update(1)
+        # Runs missing from the batch failed
+        # 批次中缺少的运行均已失败
+        for index in set(indices) - returned:
+            self._fail(index, "run failed")
+        return False
+
+    def _kill(self, executor, pid: int) -> bool:
+        """Kill a worker of ``executor``; return False if other batches share it
+        终止 ``executor`` 的工作进程；若其他批次共享该执行器则返回 False
+
+        The worker of a pool is only killed once the pool has retired the
+        executor, so other batches never see it break.
+        """
+        if self.pool is not None and not self.pool.retire(executor):
+            return False
+        try:
+            os.kill(pid, getattr(signal, "SIGKILL", signal.SIGTERM))
+        except OSError:
+            pass
+        return True
+
+    def _only_losers_left(self, executor) -> bool:
+        """Stop the remaining speculative attempts once every index is settled"""
+        if not self._futures or any(
+            index not in self.settled
+            for indices, _ in self._futures.values() for index in indices
+        ):
+            return False
+        for future in self._futures:
+            future.cancel()
+        for pid, (_, _, _, run_id) in self._running.items():
+            # On a pool executor other batches use, the attempt runs to its end
+            # 在其他批次正在使用的进程池执行器上，该尝试会运行至结束
+            self._kill(executor, pid)
+            try:
+                ExperimentTracker.set_run_status(
+                    self.experiment_name, run_id, "cancelled", str(self.storage.base_dir)
+                )
+            except FileNotFoundError:
+                pass
+        return True
+
+    def _fail(self, index: int, error: Any) -> None:
+        if index in self.settled or self._in_flight[index]:
+            return
+        self.settled.add(index)
+        print(f"Run {index + 1}/{self.times} failed with error: {error}")
+        if self.ledger is not None:
+            self.ledger.record_failure(index, str(error))
+
+    def _time_out(self, index: int, run_id: Optional[str], force: bool = False) -> None:
+        if index in self.settled or (self._in_flight[index] and not force):
+            return
+        self.settled.add(index)
+        print(f"Run {index + 1}/{self.times} timed out after {self.timeout}s")
+        if self.ledger is not None:
+            self.ledger.record_timeout(index, run_id)
+
+    def _drain_started(self) -> None:
+        while True:
+            try:
+                index, attempt, pid, start, run_id = self.started.get_nowait()
+            except queue.Empty:
+                return
+            if index not in self.settled:
+                self._running[pid] = (index, attempt, start, run_id)
+
+    def _check_running(self, executor, chunk_func, pbar: tqdm) -> None:
+        now = time.time()
+        if self.timeout is not None:
+            for pid, (index, attempt, start, run_id) in list(self._running.items()):
+                if now - start <= self.timeout + HARD_TIMEOUT_GRACE:
+                    continue
+                # The run ignored the alarm (e.g. stuck in native code): kill its
+                # worker, unless other batches share the pool executor; the batch
+                # then stops waiting for the run once the rest is settled
+                # 运行未响应超时信号（例如卡在本地代码中）：终止其工作进程，除非其他
+                # 批次共享该进程池执行器；此时其余运行结束后批次不再等待该运行
+                if self._kill(executor, pid):
+                    self._killed = True
+                del self._running[pid]
+                try:
+                    ExperimentTracker.set_run_status(
+                        self.experiment_name, run_id, "timeout", str(self.storage.base_dir)
+                    )
+                except FileNotFoundError:
+                    pass
+                self._time_out(index, run_id, force=True)
+
+        if (not self.speculative or len(self.durations) < STRAGGLER_MIN_RUNS
+                or len(self._futures) >= self.workers):
+            return
+        limit = STRAGGLER_FACTOR * statistics.median(self.durations)
+        for pid, (index, attempt, start, run_id) in list(self._running.items()):
+            if len(self._futures) >= self.workers:
+                break
+            if (attempt == 0 and index not in self.speculated
+                    and index not in self.settled and now - start > limit):
+                self.speculated.add(index)
+                self._submit(executor, [index], 1, chunk_func)
+
+
 def experiment_manager(
     times: int = 1,
     experiment_name: Optional[str] = None,
@@ -330,7 +1205,21 @@ def experiment_manager(
     max_workers: Optional[int] = None,
     merge_config: Optional[Dict] = None,
     system_info_level: str = 'basic',  # 改为 level 参数: 'none', 'basic', 'full'
-    print_style: str = 'auto'  # 添加打印样式参数: 'auto', 'rich', 'simple', 'markdown'
+    print_style: str = 'auto',  # 添加打印样式参数: 'auto', 'rich', 'simple', 'markdown'
+    pool: Union[WorkerPool, bool, None] = None,
+    chunksize: int = 1,
+    array_transport: str = "pickle",
+    merge_checkpoint_every: int = 0,
+    keep_results: bool = True,
+    resume: bool = False,
+    backend: Optional[str] = None,
+    timeout: Optional[float] = None,
+    speculative: bool = False,
+    order: str = "index",
+    cpu_affinity: Union[str, List[List[int]], None] = None,
+    blas_threads: Optional[int] = None,
+    seed: Optional[int] = None,
+    storage: Union[StorageTarget, str, pathlib.Path, None] = None
 ):
     """
     实验重复执行装饰器
@@ -350,18 +1239,158 @@ def experiment_manager(
             - 'rich': 使用rich库的完整样式
             - 'simple': 简单文本样式
             - 'markdown': Markdown表格样式
+        pool: 并行执行使用的工作进程池
+            - None: 每次调用创建新的进程池（默认）
+            - True: 复用进程级共享的 WorkerPool
+            - WorkerPool 实例: 复用给定的进程池
+        chunksize: 并行执行时每个任务包含的运行次数。大于1时函数每个工作进程
+            只反序列化一次，结果按批返回，适合大量短时运行
+        array_transport: 并行运行返回 NumPy 数组的方式
+            - 'pickle': 随结果一起通过 pickle 传输（默认）
+            - 'mmap': 大型数组保存到运行目录的 results/ 下，主进程得到只读内存映射数组
+        merge_checkpoint_every: 每合并N个结果写入一次中间合并结果（0表示只在结束时写入）
+        keep_results: 是否在内存中保留并返回所有运行结果。为False时结果只被
+            流式合并，返回空列表，内存占用不随运行次数增长
+        resume: 是否恢复之前中断的相同批次（相同实验名、运行次数和参数）。
+            只运行缺失或失败的运行索引，并与已完成运行的结果一起合并。
+            只有启用时才会把每次运行的结果 pickle 到批次目录（无法 pickle 的结果
+            会给出警告，该运行在恢复时重新执行）
+        backend: 执行后端（默认根据 parallel 选择 'process' 或 'serial'）
+            - 'serial': 在当前线程中依次运行
+            - 'process': 在 spawn 启动的进程中并行运行
+            - 'thread': 在线程池中并发运行，适合释放GIL或受I/O限制的函数
+            - 'asyncio': 在事件循环中并发运行，支持 async def 实验函数
+              （同步函数在线程中运行），max_workers 限制并发数
+        timeout: 单次运行的时间限制（秒）。超时的运行在追踪器中记录为 "timeout" 状态；
+            process 后端在运行无法中断时终止并替换工作进程（thread 后端不支持）
+        speculative: 是否在空闲工作进程上重新执行慢任务（仅 process 后端），
+            重复执行的运行参数中包含 attempt=1，并使用由 (seed, 运行索引, attempt)
+            派生的独立种子，先完成者胜出；设置 seed 时被采用的尝试记录在批次记录中
+        order: 提交顺序
+            - 'index': 按运行索引顺序（默认）
+            - 'longest_first': 根据该实验之前批次的运行耗时，预计耗时最长的先提交
+        cpu_affinity: 工作进程的CPU绑定（仅 process 后端；使用进程池时在 WorkerPool 上设置）
+            - None: 不绑定（默认）
+            - 'core': 每个工作进程绑定一个独立核心，相邻工作进程交替使用不同NUMA节点
+            - 'numa': 每个工作进程绑定一个NUMA节点的全部核心
+            - CPU集合列表，如 [[0, 1], [2, 3]]: 工作进程依次使用各集合
+            实际放置记录在每次运行参数的 placement 中
+        blas_threads: 每个工作进程的 BLAS / OpenMP 线程数上限（仅 process 后端）。
+            工作进程启动时环境变量即已设置；无法生效时发出警告且不记录在 placement 中
+        seed: 批次主种子。每次运行的种子由主种子和运行索引派生（与
+            SeedSequence(seed).spawn 相同），以 seed / run_seed 记录在运行参数中，
+            并用于创建该运行独有的 tracker.rng（NumPy Generator）和 tracker.py_random
+            （random.Random），其随机数在所有后端上都相同。串行和 process 后端还会在
+            运行前设置 random 和 NumPy 的全局随机状态；thread 和 asyncio 后端的并发
+            运行共享全局状态，因此不设置。被装饰函数的 replay(index, *args, **kwargs)
+            可重新执行单次运行，并使用批次所采用尝试的种子
+        storage: 存储目标，可以是目录（默认 ./orruns_experiments）或 StorageTarget
+            实例（可同时指定追踪器选项，StorageTarget.from_config() 使用配置的数据目录）。
+            在主进程中解析为绝对路径后传给所有工作进程和结果合并器
     """
+    if merge_checkpoint_every < 0:
+        raise ValueError("merge_checkpoint_every must not be negative")
+    if chunksize < 1:
+        raise ValueError("chunksize must be at least 1")
+    if array_transport not in ARRAY_TRANSPORTS:
+        raise ValueError(
+            f"array_transport must be one of {ARRAY_TRANSPORTS}, got {array_transport!r}"
+        )
+    if backend is not None and backend not in BACKENDS:
+        raise ValueError(f"backend must be one of {BACKENDS}, got {backend!r}")
+    if timeout is not None and timeout <= 0:
+        raise ValueError("timeout must be positive")
+    if order not in RUN_ORDERS:
+        raise ValueError(f"order must be one of {RUN_ORDERS}, got {order!r}")
+    if cpu_affinity is not None:
+        plan_placement(cpu_affinity)
+    if blas_threads is not None and blas_threads < 1:
+        raise ValueError("blas_threads must be at least 1")
+    if seed is not None:
+        if not isinstance(seed, (int, np.integer)) or seed < 0:
+            raise ValueError("seed must be a non-negative integer")
+        seed = int(seed)
+    if pool and (cpu_affinity is not None or blas_threads is not None):
+        raise ValueError("set cpu_affinity and blas_threads on the WorkerPool when using a pool")
+
     def decorator(func: Callable) -> Callable:
+        is_async = inspect.iscoroutinefunction(func)
+        if backend is not None:
+            mode = backend
+        elif is_async:
+            mode = "asyncio"
+        else:
+            mode = "process" if parallel else "serial"
+        if is_async and mode != "asyncio":
+            raise ValueError("async experiment functions require backend='asyncio'")
+        if timeout is not None and mode == "thread":
+            raise ValueError("timeout is not supported by the thread backend")
+        if speculative and mode != "process":
+            raise ValueError("speculative execution requires the process backend")
+        if (cpu_affinity is not None or blas_threads is not None) and mode != "process":
+            raise ValueError("cpu_affinity and blas_threads require the process backend")
+        # Without options that need worker processes, small or fast parallel
+        # batches may run in-process instead
+        # 未使用依赖工作进程的选项时，小型或快速的并行批次可改为在当前进程中运行
+        auto_in_process = (
+            backend is None and mode == "process" and pool is None and timeout is None
+            and not speculative and cpu_affinity is None and blas_threads is None
+        )
+
         @functools.wraps(func)
         def wrapper(*args, **kwargs):
             nonlocal experiment_name
             if experiment_name is None:
                 experiment_name = func.__name__
 
+            # Resolve the storage once, relative to the caller's working directory
+            # 相对于调用者的工作目录，只解析一次存储目标
+            target = StorageTarget.resolve(storage)
+
+            # With resume (or to time runs for longest_first and for running
+            # small parallel batches in-process, or to record which seeded
+            # attempt of a speculative run was kept) every run is recorded in
+            # the batch ledger; otherwise nothing is pickled
+            # 启用 resume（或为 longest_first 和在当前进程中运行小型并行批次记录耗时，
+            # 或记录推测执行中被采用的带种子尝试）时在批次记录中登记每次运行；
+            # 否则不进行任何序列化
+            batches_dir = target.batches_dir(experiment_name)
+            key = None
+            ledger = None
+            if (resume or order == "longest_first" or auto_in_process
+                    or (speculative and seed is not None)):
+                try:
+                    key = batch_key(experiment_name, times, args, kwargs, seed)
+                except Exception as e:
+                    print(f"Warning: Arguments of {experiment_name} cannot be pickled, "
+                          f"the batch is not recorded: {e}")
+            if key is not None:
+                ledger = RunLedger.find(batches_dir, key) if resume else None
+                if ledger is None:
+                    ledger = RunLedger.create(batches_dir, key, times)
+            batch_id = ledger.batch_id if ledger is not None else new_batch_id()
+            completed = ledger.completed() if ledger is not None else {}
+            pending = [i for i in range(times) if i not in completed]
+            expected = {}
+            if order == "longest_first" or auto_in_process:
+                expected = RunLedger.expected_durations(batches_dir, key)
+            if order == "longest_first":
+                # Expected durations from earlier batches; unknown indices first
+                # 根据早先批次估计耗时；未知耗时的索引优先
+                pending.sort(key=lambda i: -expected.get(i, math.inf))
+            run_mode = mode
+            if auto_in_process and _prefer_in_process(pending, expected):
+                # Starting workers would cost more than the runs themselves
+                # 启动工作进程的开销会超过运行本身
+                print(f"Running {len(pending)} run(s) of {experiment_name} in-process")
+                run_mode = "serial"
+
+            from .utils.utils import get_system_info, print_system_info
+
             # 收集系统信息
             system_info = get_system_info(
                 experiment_name=experiment_name,
-                parallel=parallel,
+                parallel=run_mode != "serial",
                 times=times,
                 max_workers=max_workers,
                 level=system_info_level  # 使用新的 level 参数
@@ -375,64 +1404,185 @@ def experiment_manager(
 
             results = []
             run_ids = []  # 收集实际的运行ID
+            merger = None
 
-            if parallel:
-                # Serialize the function
-                # 序列化函数
-                serialized_func = cloudpickle.dumps(func)
-                
-                # Create processes using the spawn method
-                # 使用 spawn 方法创建进程
-                ctx = mp.get_context('spawn')
-                with ProcessPoolExecutor(
-                    max_workers=max_workers,
-                    mp_context=ctx
-                ) as executor:
-                    futures = []
-                    with tqdm(total=times, desc=f"Running {experiment_name}") as pbar:
-                        for i in range(times):
-                            future = executor.submit(
-                                _run_single_experiment,
-                                serialized_func,
-                                experiment_name,
-                                i,
-                                times,
-                                args,
-                                kwargs
-                            )
-                            futures.append(future)
-                        
-                        for future in as_completed(futures):
+            def collect(index, result, run_id, duration=None, record=True, attempt=0):
+                """Merge a finished run as soon as its result arrives
+                运行结果到达后立即合并"""
+                nonlocal merger
+                if attempt and seed is not None:
+                    print(f"Run {index + 1}/{times}: speculative attempt {attempt} finished "
+                          f"first with run_seed {derive_seed(seed, index, attempt)}")
+                if record and ledger is not None:
+                    ledger.record_success(index, run_id, result, duration,
+                                          store_result=resume, attempt=attempt)
+                result = _load_arrays(result)
+                run_ids.append(run_id)
+                if merge_config:
+                    if merger is None:
+                        merger = ResultsMerger(
+                            experiment_name=experiment_name,
+                            base_dir=str(target.base_dir),
+                            merge_config=merge_config,
+                            checkpoint_every=merge_checkpoint_every,
+                            batch_id=batch_id
+                        )
+                    merger.add(result, run_id)
+                if keep_results:
+                    results.append(result)
+
+            if completed:
+                print(f"Resuming batch {batch_id}: "
+                      f"{len(completed)}/{times} runs already completed")
+            for index, entry in sorted(completed.items()):
+                collect(index, ledger.load_result(index), entry["run_id"], record=False)
+
+            if run_mode == "process":
+                scheduler = _ProcessScheduler(
+                    func, experiment_name, times, args, kwargs, max_workers, pool,
+                    chunksize, array_transport, timeout, speculative, ledger, collect,
+                    cpu_affinity, blas_threads, seed, target
+                )
+                with tqdm(total=times, initial=len(completed),
+                          desc=f"Running {experiment_name}") as pbar:
+                    scheduler.run(pending, pbar)
+            elif run_mode == "thread":
+                # Threads share the process: no function or result serialization
+                # 线程共享进程：无需序列化函数和结果
+                with ThreadPoolExecutor(max_workers=max_workers) as executor, \
+                        tqdm(total=times, initial=len(completed),
+                             desc=f"Running {experiment_name}") as pbar:
+                    futures = {
+                        executor.submit(
+                            _run_in_thread, func, experiment_name, i, times, args, kwargs,
+                            seed, target
+                        ): i
+                        for i in pending
+                    }
+                    for future in as_completed(futures):
+                        i = futures.pop(future)
+                        try:
+                            result, run_id, duration = future.result()
+                        except Exception as e:
+                            print(f"Run {i + 1}/{times} failed: {e}")
+                            if ledger is not None:
+                                ledger.record_failure(i, str(e))
+                            continue
+                        collect(i, result, run_id, duration)
+                        pbar.update(1)
+            elif run_mode == "asyncio":
+                async def run_all():
+                    # max_workers bounds the number of concurrent runs
+                    # max_workers 限制并发运行数
+                    semaphore = asyncio.Semaphore(max_workers or max(len(pending), 1))
+
+                    async def run_one(i):
+                        async with semaphore:
                             try:
-                                result, run_id = future.result()  # 修改：解包结果和ID
-                                results.append(result)
-                                run_ids.append(run_id)  # 保存ID
+                                return i, await _run_in_loop(
+                                    func, experiment_name, i, times, args, kwargs, timeout,
+                                    seed, target
+                                ), None
                             except Exception as e:
-                                print(f"Run failed with error: {e}")
+                                return i, None, e
+
+                    with tqdm(total=times, initial=len(completed),
+                              desc=f"Running {experiment_name}") as pbar:
+                        for next_done in asyncio.as_completed([run_one(i) for i in pending]):
+                            i, outcome, error = await next_done
+                            if isinstance(error, RunTimeoutError):
+                                print(f"Run {i + 1}/{times} timed out after {timeout}s")
+                                if ledger is not None:
+                                    ledger.record_timeout(i, error.run_id)
+                                continue
+                            if error is not None:
+                                print(f"Run {i + 1}/{times} failed: {error}")
+                                if ledger is not None:
+                                    ledger.record_failure(i, str(error))
+                                continue
+                            collect(i, *outcome)
+                            pbar.update(1)
+
+                _run_coroutine(run_all())
             else:
-                # Serial execution remains unchanged
-                # 串行执行保持不变
-                for i in tqdm(range(times), desc=f"Running {experiment_name}"):
-                    tracker = ExperimentTracker(experiment_name)
-                    tracker.log_params({
-                        "run_index": i,
-                        "total_runs": times,
-                        "parallel": False,
-                        "timestamp": time.strftime("%Y-%m-%d %H:%M:%S")
-                    })
-                    try:
-                        result, run_id = future.result()  # 获取结果和ID
-                        results.append(result)
-                        run_ids.append(run_id)  # 保存ID
-                    except Exception as e:
-                        print(f"Run {i} failed with error: {e}")
-            if merge_config and results:
-                merger = ResultsMerger(
-                    experiment_name=experiment_name,
-                    base_dir="./orruns_experiments",
-                    run_ids=run_ids  # 传入实际的运行ID列表
-                )
-                merger.merge_results(results, merge_config)            
+                # Run in this process: no worker startup, no function or
+                # result pickling
+                # 在当前进程中运行：无需启动工作进程，也无需序列化函数和结果
+                with tqdm(total=times, initial=len(completed),
+                          desc=f"Running {experiment_name}") as pbar:
+                    for i in pending:
+                        try:
+                            result, run_id, duration = _execute_run(
+                                func, experiment_name, i, times, args, kwargs, False,
+                                timeout=timeout, seed=seed, storage=target
+                            )
+                        except RunTimeoutError as e:
+                            print(f"Run {i + 1}/{times} timed out after {timeout}s")
+                            if ledger is not None:
+                                ledger.record_timeout(i, e.run_id)
+                            continue
+                        except Exception as e:
+                            print(f"Run {i + 1}/{times} failed: {e}")
+                            if ledger is not None:
+                                ledger.record_failure(i, str(e))
+                            continue
+                        collect(i, result, run_id, duration)
+                        pbar.update(1)
+            if merger is not None:
+                merger.finalize()
             return results
+
+        def replay(run_index: int, *args, **kwargs):
+            """Run a single run index of the batch again in this process
+            在当前进程中重新执行批次中的单个运行索引
+
+            With ``seed``, the run gets the same derived seed as in the batch,
+            so outliers can be re-executed identically. When a speculative
+            attempt was kept, the latest ledger of the batch (found from the
+            arguments) gives that attempt, whose seed is used. The new run has
+            ``replay=True`` in its parameters; ledgers and merged results are
+            not changed.
+
+            Returns:
+                The result of the run
+            """
+            if not 0 <= run_index < times:
+                raise ValueError(f"run_index must be between 0 and {times - 1}")
+            name = experiment_name or func.__name__
+            attempt = 0
+            if seed is not None and speculative:
+                # Seed of the attempt whose result the batch kept
+                # 批次采用其结果的尝试的种子
+                target = StorageTarget.resolve(storage)
+                try:
+                    key = batch_key(name, times, args, kwargs, seed)
+                except Exception:
+                    key = None
+                ledger = (RunLedger.find(target.batches_dir(name), key)
+                          if key is not None else None)
+                if ledger is not None:
+                    attempt = ledger.entries().get(run_index, {}).get("attempt", 0)
+            tracker = _start_tracker(name, run_index, times, parallel=False, attempt=attempt,
+                                     seed=seed, storage=storage)
+            tracker.log_params({"replay": True})
+            try:
+                if is_async:
+                    return _run_coroutine(
+                        asyncio.wait_for(func(tracker, *args, **kwargs), timeout)
+                    )
+                return _call_with_timeout(func, tracker, args, kwargs, timeout)
+            except RunTimeoutError:
+                tracker.set_status("timeout")
+                raise
+            except asyncio.TimeoutError:
+                tracker.set_status("timeout")
+                raise RunTimeoutError(timeout, tracker.run_id)
+            except Exception:
+                tracker.set_status("failed")
+                raise
+            finally:
+                tracker.close()
+
+        wrapper.replay = replay
         return wrapper
     return decorator
\ No newline at end of file
@@ -24,4 +24,18 @@ class ArtifactError(ORRunsError):
     def __init__(self, message: str, artifact_path: Optional[str] = None):
         self.artifact_path = artifact_path
         super().__init__(f"Artifact error: {message}" +
-                        (f" (path: {artifact_path})" if artifact_path else ""))
\ No newline at end of file
+                        (f" (path: {artifact_path})" if artifact_path else ""))
+
+
+class RunTimeoutError(ORRunsError):
+    """运行超时"""
+    def __init__(self, timeout: float, run_id: Optional[str] = None):
+        self.timeout = timeout
+        self.run_id = run_id
+        # Keep the raw arguments so the error can be pickled across processes
+        # 保留原始参数，以便错误可以跨进程序列化
+        super().__init__(timeout, run_id)
+
+    def __str__(self) -> str:
+        return (f"Run exceeded the time limit of {self.timeout}s" +
+                (f" (run: {self.run_id})" if self.run_id else ""))
@@ -1,25 +1,47 @@
-import json
+import atexit
+import functools
+import heapq
+import itertools
+import operator
 import os
 import re
 import random
 import shutil
+import threading
+import weakref
 from datetime import datetime, timedelta
-from typing import Union, Dict, List, Any, Optional, Tuple
+from typing import TYPE_CHECKING, Union, Dict, List, Any, Optional, Tuple, Iterable, Iterator
 import pathlib
 from pathlib import Path
 
-import matplotlib.pyplot as plt
-import pandas as pd
 import numpy as np
-from pathlib import Path
-import os
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
 
+from .core import serialization
+from .core.columns import (
+    COLUMNS_DIR, ColumnStore, get_path, leaf_paths, load_columns, to_pointers
+)
 from .core.config import Config
+from .core.index import RunIndex
+from .core.lazy import loaded_instance
+from .core.query import (
+    get_sort_value, match_filters, nest_fields, normalize_fields, project_fields
+)
+from .core.resources import RESOURCE_PREFIX, ResourceSampler
+from .core.scan import iter_summaries, list_run_dirs
+from .core.series import check_step, materialize_metrics
+from .core.storage import (
+    METRIC_LOG_FILE, BackgroundWriter, MetricLog,
+    atomic_write_bytes, merge_metrics, resolve_summary
+)
 from .errors import *
 from .utils.error_handlers import handle_parameter_error, handle_metric_error
 
+if TYPE_CHECKING:
+    # pandas and matplotlib are imported only when a run needs them
+    # pandas 和 matplotlib 只在运行需要时导入
+    import pandas as pd
+    from matplotlib.figure import Figure
+
 class ExperimentTracker:
     """
     ORruns's core tracking class, used to manage the parameters and metrics of operations research experiments.
@@ -27,9 +49,43 @@ class ExperimentTracker:
     Args:
         experiment_name: Name of the experiment
         base_dir: Base directory for storing experiment data
+        metric_storage: How metrics are persisted
+            - 'json': rewrite metrics.json and summary.json on every call (default)
+            - 'log': append each call to metrics/metrics.jsonl and only write
+              metrics.json/summary.json on flush() or close()
+            - 'columnar': append stepped metrics to binary NumPy columns in
+              metrics/columns; metrics.json/summary.json only hold scalar
+              values and a pointer (with length and last value) per column
+        async_writes: Persist from a background thread instead of the caller's thread
+        flush_interval: Maximum seconds between background flushes
+        flush_every: Number of updates that triggers an early background flush
+        index: Keep the SQLite run index in ``base_dir`` up to date. None (default)
+            updates it only if it already exists, True creates it if necessary
+        pretty_json: Indent JSON files for human readers (default: compact)
+        sample_resources: Seconds between samples of the process's CPU, memory,
+            I/O and context switches, logged as stepped ``resources.*`` metrics
+            until ``close()`` (default: None, no sampling)
+
+    All files are written atomically (temporary file + rename). With
+    ``async_writes`` call ``close()`` or use the tracker as a context manager
+    to make sure everything is on disk when the run ends.
     """
-    def __init__(self, experiment_name: str, base_dir: str = "./orruns_experiments"):
+    METRIC_STORAGE_MODES = ("json", "log", "columnar")
+    RUN_STATUSES = ("completed", "failed", "timeout", "cancelled")
+
+    def __init__(self, experiment_name: str, base_dir: str = "./orruns_experiments",
+                 metric_storage: str = "json", async_writes: bool = False,
+                 flush_interval: float = 1.0, flush_every: int = 100,
+                 index: Optional[bool] = None, pretty_json: bool = False,
+                 sample_resources: Optional[float] = None):
+        if metric_storage not in self.METRIC_STORAGE_MODES:
+            raise ValueError(
+                f"Invalid metric_storage: {metric_storage}. "
+                f"Valid modes are: {', '.join(self.METRIC_STORAGE_MODES)}"
+            )
         self.experiment_name = experiment_name
+        self.metric_storage = metric_storage
+        self.pretty_json = pretty_json
         self.config = Config.get_instance()
         self.base_dir = pathlib.Path(base_dir).resolve()
         
@@ -59,7 +115,59 @@ class ExperimentTracker:
             
         self._params = {}
         self._metrics = {}
+        self._status = "completed"
+        # Random number generators of this run, set by experiment_manager
+        # from the run's seed (None without a seed)
+        # 本次运行的随机数生成器，由 experiment_manager 根据运行种子设置（无种子时为None）
+        self.rng: Optional[np.random.Generator] = None
+        self.py_random: Optional[random.Random] = None
+        self._summary_saved = False
+        self._metric_log = None
+        if metric_storage == "log":
+            self._metric_log = MetricLog(self.metrics_dir / METRIC_LOG_FILE)
+        self._columns = None
+        if metric_storage == "columnar":
+            self._columns = ColumnStore(self.metrics_dir / COLUMNS_DIR)
+
+        # Register the run in the index
+        # 在索引中登记运行
+        self._index = None
+        if index or (index is None and RunIndex.exists(self.base_dir)):
+            self._index = RunIndex(self.base_dir)
+            self._index.ensure_built()
+            self._index.register_run(experiment_name, self.run_id)
+
+        # Pending files to write ("params", "metrics", "summary")
+        # 待写入的文件
+        self._dirty = set()
+        # Stepped metrics with points not yet written to their columns
+        # 尚有数据点未写入列文件的带步骤指标
+        self._dirty_columns = set()
+        self._lock = threading.RLock()
+        self._io_lock = threading.Lock()
+        self._closed = False
+        self._abandoned = False
+        self._writer = None
+        self._atexit = None
+        self._sampler = None
+        if async_writes:
+            self._writer = BackgroundWriter(self._write_pending, flush_interval, flush_every)
+        if sample_resources is not None:
+            # The sampler only holds a weak reference, so a tracker that is
+            # never closed can still be garbage collected
+            # 采样器只持有弱引用，未关闭的追踪器仍可被垃圾回收
+            self._sampler = ResourceSampler(
+                functools.partial(_log_resources, weakref.ref(self)), sample_resources
+            )
+        if self._writer is not None or self._sampler is not None:
+            self._atexit = functools.partial(_close_tracker, weakref.ref(self))
+            atexit.register(self._atexit)
 
+    def __enter__(self) -> 'ExperimentTracker':
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.close()
 
     #####初始化和核心实例方法：
     #####Initialization and core instance methods:
@@ -73,14 +181,14 @@ class ExperimentTracker:
         if prefix is not None and not isinstance(prefix, str):
             raise ParameterError("Prefix must be a string", "prefix")
         params = self._process_nested_input(params, prefix)
-        self._params = self._deep_update(self._params, params)
-        
-        with open(self.params_dir / "params.json", "w", encoding='utf-8') as f:
-            json.dump(self._params, f, indent=4, ensure_ascii=False)
-        
-        # Save experiment information
-        # 保存实验信息
-        self._save_experiment_info()
+        with self._lock:
+            if self._abandoned:
+                return
+            self._params = self._deep_update(self._params, params)
+            # Save parameters and experiment information
+            # 保存参数和实验信息
+            self._dirty.update(("params", "summary"))
+        self._persist()
     
     @handle_metric_error
     def log_metrics(self, metrics: Dict[str, Union[float, int, dict]], 
@@ -92,6 +200,10 @@ class ExperimentTracker:
             raise MetricError("Metrics must be a dictionary", "metrics")
         if step is not None and not isinstance(step, int):
             raise MetricError("Step must be an integer", "step")
+        if step is not None:
+            # Raises ValueError before anything is recorded
+            # 在记录任何内容之前抛出 ValueError
+            check_step(step)
         
         processed_metrics = {}
         for key, value in metrics.items():
@@ -108,17 +220,94 @@ class ExperimentTracker:
                 processed_metrics = {part: processed_metrics}
             
         self._validate_metrics(processed_metrics)
-        metrics = self._process_nested_metrics(processed_metrics, step=step)
-        self._metrics = self._deep_update(self._metrics, metrics)
-        
-        with open(self.metrics_dir / "metrics.json", "w", encoding='utf-8') as f:
-            json.dump(self._metrics, f, indent=4)
-            
-        # Save experiment information
-        # 保存实验信息
-        self._save_experiment_info()
+        with self._lock:
+            if self._abandoned:
+                return
+            merge_metrics(self._metrics, processed_metrics, step=step)
+            if self._metric_log is not None:
+                # Append only; metrics.json/summary.json are written on flush()
+                # 仅追加；metrics.json/summary.json 在 flush() 时写入
+                self._metric_log.append(processed_metrics, step)
+                if not self._summary_saved:
+                    self._dirty.add("summary")
+            elif self._columns is not None and step is not None:
+                # Append to the columns; the summary only changes when a
+                # new column needs a pointer
+                # 追加到列文件；仅当新列需要指针时才更新摘要
+                paths = set(leaf_paths(processed_metrics))
+                if any(self._columns.is_new(path, get_path(self._metrics, path))
+                       for path in paths - self._dirty_columns):
+                    self._dirty.update(("metrics", "summary"))
+                self._dirty_columns.update(paths)
+            else:
+                # Save metrics and experiment information
+                # 保存指标和实验信息
+                self._dirty.update(("metrics", "summary"))
+        self._persist()
+
+    def _log_resource_sample(self, sample: Dict[str, float], step: int) -> None:
+        """Log a resource sample as stepped ``resources.*`` metrics
+        将资源样本记录为带步骤的 ``resources.*`` 指标
+
+        With synchronous ``"json"`` storage every write rewrites the whole
+        metrics.json, so samples are only kept in memory and written with
+        the run's next write (a logging call, ``flush()`` or ``close()``).
+        """
+        if self.metric_storage != "json" or self._writer is not None:
+            self.log_metrics({RESOURCE_PREFIX: sample}, step=step)
+            return
+        with self._lock:
+            if self._abandoned:
+                return
+            merge_metrics(self._metrics, {RESOURCE_PREFIX: sample}, step=step)
+            self._dirty.update(("metrics", "summary"))
+
+    def flush(self) -> None:
+        """Write params, metrics.json and summary.json from the current state
+        根据当前状态写入参数、metrics.json 和 summary.json"""
+        with self._lock:
+            self._dirty.update(("metrics", "summary"))
+        self._write_pending()
+        if self._writer is not None and self._writer.error is not None:
+            error, self._writer.error = self._writer.error, None
+            raise RuntimeError(f"Background write failed: {error}") from error
+
+    def close(self) -> None:
+        """Stop background writes, flush all pending data and release open files
+        停止后台写入，写入所有待保存数据并释放打开的文件"""
+        if self._closed:
+            return
+        # Stop sampling first so the final sample is saved below
+        # 先停止采样，以便下面保存最后一个样本
+        if self._sampler is not None:
+            self._sampler.stop()
+        self._closed = True
+        if self._writer is not None:
+            self._writer.stop()
+        if self._atexit is not None:
+            atexit.unregister(self._atexit)
+        try:
+            self.flush()
+        finally:
+            self._writer = None
+            if self._metric_log is not None:
+                self._metric_log.close()
+            if self._index is not None:
+                self._index.close()
+
+    def abandon(self) -> None:
+        """Close the run and ignore everything logged to it afterwards
+        关闭运行并忽略之后记录的所有内容
 
-    def log_artifact(self, filename: str, content: Union[str, bytes, Figure, pd.DataFrame, np.ndarray, List, Dict], 
+        For runs given up while their code may still be running, e.g. a
+        synchronous function past its timeout in another thread: its later
+        calls are dropped instead of writing into the closed run.
+        """
+        with self._lock:
+            self._abandoned = True
+        self.close()
+
+    def log_artifact(self, filename: str, content: Union[str, bytes, "Figure", "pd.DataFrame", np.ndarray, List, Dict], 
                     artifact_type: Optional[str] = None) -> None:
         """Log file artifact with enhanced type support
         
@@ -127,6 +316,8 @@ class ExperimentTracker:
             content: Content of the file (supports more types now)
             artifact_type: Type of the file
         """
+        if self._abandoned:
+            return
         if not isinstance(filename, str):
             raise ArtifactError("Filename must be a string", filename)
         if not filename:
@@ -146,15 +337,13 @@ class ExperimentTracker:
         
         try:
             # Enhanced content saving
-            if isinstance(content, pd.DataFrame):
+            if loaded_instance(content, "pandas", "DataFrame"):
                 content.to_csv(path, index=False)
-            elif isinstance(content, Figure):
+            elif loaded_instance(content, "matplotlib.figure", "Figure"):
                 content.savefig(path)
-            elif isinstance(content, np.ndarray):
-                # Convert numpy array to DataFrame
-                pd.DataFrame(content).to_csv(path, index=False)
-            elif isinstance(content, (list, dict)):
-                # Convert list/dict to DataFrame
+            elif isinstance(content, (np.ndarray, list, dict)):
+                # Convert numpy array / list / dict to DataFrame
+                import pandas as pd
                 pd.DataFrame(content).to_csv(path, index=False)
             elif isinstance(content, bytes):
                 path.write_bytes(content)
@@ -164,6 +353,25 @@ class ExperimentTracker:
         except Exception as e:
             raise ArtifactError(f"Failed to write artifact {filename}: {str(e)}")
   
+    def set_status(self, status: str) -> None:
+        """Set the status recorded in summary.json
+        设置summary.json中记录的状态
+
+        Args:
+            status: One of ``RUN_STATUSES`` ("completed", "failed", "timeout", "cancelled")
+        """
+        if status not in self.RUN_STATUSES:
+            raise ValueError(
+                f"Invalid status: {status}. "
+                f"Valid statuses are: {', '.join(self.RUN_STATUSES)}"
+            )
+        with self._lock:
+            if self._abandoned:
+                return
+            self._status = status
+            self._dirty.add("summary")
+        self._persist()
+
     def get_params(self) -> Dict:
         """获取当前所有参数
         Get all current parameters"""
@@ -171,35 +379,121 @@ class ExperimentTracker:
     
     def get_metrics(self) -> Dict:
         """获取当前所有指标
-        Get all current metrics"""
-        return self._metrics.copy()
+        Get all current metrics
+
+        In ``"columnar"`` storage mode pending points are written to the
+        columns first and stepped metrics are returned as read-only
+        memory-mapped arrays instead of lists, so nothing is copied.
+        """
+        if self._columns is not None:
+            return load_columns(self._write_columns(), self.metrics_dir)
+        with self._lock:
+            return materialize_metrics(self._metrics)
     
 
 
     #####内部辅助方法：
     #####Internal helper methods:
+    def _persist(self) -> None:
+        """Write pending files now or hand them to the background writer
+        立即写入待保存文件，或交给后台写入线程"""
+        if self._writer is not None and not self._closed:
+            self._writer.notify()
+        else:
+            self._write_pending()
+
+    def _write_columns(self) -> Dict:
+        """Write pending column points and return the metrics with column pointers
+        写入待保存的列数据点，并返回带列指针的指标"""
+        with self._io_lock:
+            with self._lock:
+                column_data = self._columns.snapshot(self._metrics, list(self._dirty_columns))
+                self._dirty_columns = set()
+                pointers = to_pointers(self._metrics)
+            self._columns.write(column_data)
+        return pointers
+
+    def _write_pending(self) -> None:
+        """Write all pending log records and files
+        写入所有待保存的日志记录和文件
+
+        State is snapshotted under the tracker lock and written outside of it,
+        log records and columns first so that a summary never points past
+        the end of the data it references.
+        """
+        with self._io_lock:
+            with self._lock:
+                dirty, self._dirty = self._dirty, set()
+                log_data = self._metric_log.drain() if self._metric_log is not None else b""
+                column_data = []
+                if self._columns is not None:
+                    column_data = self._columns.snapshot(self._metrics, list(self._dirty_columns))
+                    self._dirty_columns = set()
+                payloads = []
+                summary = None
+                if "params" in dirty:
+                    payloads.append((
+                        self.params_dir / "params.json",
+                        serialization.dumps(self._params, pretty=self.pretty_json)
+                    ))
+                if "metrics" in dirty:
+                    payloads.append((
+                        self.metrics_dir / "metrics.json",
+                        serialization.dumps(self._stored_metrics(), pretty=self.pretty_json)
+                    ))
+                if "summary" in dirty:
+                    summary = self._build_summary()
+                    payloads.append((
+                        self.run_dir / "summary.json",
+                        serialization.dumps(summary, pretty=self.pretty_json)
+                    ))
+                    self._summary_saved = True
+
+            if log_data:
+                self._metric_log.write(log_data)
+            if column_data:
+                self._columns.write(column_data)
+            if payloads:
+                # Ensure the directory exists
+                # 确保目录存在
+                self.run_dir.mkdir(parents=True, exist_ok=True)
+            for path, content in payloads:
+                atomic_write_bytes(path, content)
+            if summary is not None and self._index is not None and self._closed:
+                # Indexed once when the run ends; open runs are read from disk
+                # 运行结束时写入索引一次；打开的运行从磁盘读取
+                self._index.update_run(self.experiment_name, self.run_id, summary)
+
+    def _save_metrics(self) -> None:
+        """Save all metrics to metrics.json
+        将所有指标保存到metrics.json"""
+        with self._lock:
+            self._dirty.add("metrics")
+        self._persist()
+
     def _save_content(self, content: Any, path: Path) -> None:
         """Enhanced content saving with better type support
         增强的内容保存，支持更多类型"""
         try:
-            if isinstance(content, (pd.DataFrame, pd.Series)):
+            if (loaded_instance(content, "pandas", "DataFrame")
+                    or loaded_instance(content, "pandas", "Series")):
                 content.to_csv(path)
-            elif isinstance(content, Figure):
+            elif loaded_instance(content, "matplotlib.figure", "Figure"):
                 content.savefig(path)
             elif isinstance(content, np.ndarray):
                 if path.suffix == '.csv':
+                    import pandas as pd
                     pd.DataFrame(content).to_csv(path)
                 else:
                     np.save(path, content)
             elif isinstance(content, (list, dict)):
                 if path.suffix == '.json':
-                    with open(path, 'w', encoding='utf-8') as f:
-                        json.dump(content, f, indent=4)
+                    serialization.dump(content, path, pretty=self.pretty_json)
                 elif path.suffix == '.csv':
+                    import pandas as pd
                     pd.DataFrame(content).to_csv(path)
                 else:
-                    with open(path, 'w', encoding='utf-8') as f:
-                        json.dump(content, f)
+                    serialization.dump(content, path)
             elif isinstance(content, bytes):
                 path.write_bytes(content)
             else:
@@ -214,9 +508,9 @@ class ExperimentTracker:
             return value.tolist()
         elif isinstance(value, (np.integer, np.floating)):
             return float(value)
-        elif isinstance(value, pd.DataFrame):
+        elif loaded_instance(value, "pandas", "DataFrame"):
             return value.to_dict()
-        elif isinstance(value, pd.Series):
+        elif loaded_instance(value, "pandas", "Series"):
             return value.to_list()
         elif hasattr(value, 'to_dict'):
             return value.to_dict()
@@ -254,25 +548,37 @@ class ExperimentTracker:
         """Save experiment information to summary.json
         将实验信息保存到summary.json
         """
+        with self._lock:
+            self._dirty.add("summary")
+        self._persist()
+
+    def _build_summary(self) -> Dict:
+        """Build the content of summary.json
+        构建summary.json的内容
+        """
         summary = {
             "name": self.experiment_name,
             "run_id": self.run_id,
             "timestamp": datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
             "parameters": self._params,
-            "metrics": self._metrics,
-            "status": "completed"  # Add status field
+            "metrics": self._stored_metrics(),
+            "status": self._status  # Add status field
             # 添加状态字段
         }
-        
-        # Ensure the directory exists
-        # 确保目录存在
-        self.run_dir.mkdir(parents=True, exist_ok=True)
-        
-        # Save as dictionary format
-        # 以字典格式保存
-        summary_path = self.run_dir / "summary.json"
-        with open(summary_path, "w", encoding='utf-8') as f:
-            json.dump(summary, f, indent=4, ensure_ascii=False)
+        if self._metric_log is not None:
+            # Bytes of the metric log already contained in this summary
+            # 此摘要已包含的指标日志字节数
+            summary["metric_log_offset"] = self._metric_log.offset
+        if self._columns is not None:
+            summary["metric_storage"] = "columnar"
+        return summary
+
+    def _stored_metrics(self) -> Dict:
+        """Metrics as written to metrics.json and summary.json
+        写入metrics.json和summary.json的指标"""
+        if self._columns is not None:
+            return to_pointers(self._metrics)
+        return materialize_metrics(self._metrics)
 
     def _validate_metrics(self, metrics: Dict[str, Any], path: str = "") -> None:
         """Recursively validate metric values
@@ -286,47 +592,6 @@ class ExperimentTracker:
                     f"Invalid metric value for {current_path}: must be float or int"
                 )
 
-    def _get_current_metric(self, path: List[str]) -> Any:
-        """Get the metric value for the current path
-        获取当前路径的指标值"""
-        current = self._metrics
-        for p in path:
-            if p not in current:
-                return None
-            current = current[p]
-        return current
-
-    def _process_metric_value(self, path: List[str], value: Union[float, int], step: Optional[int] = None) -> Dict:
-        """Process a single metric value
-        处理单个指标值"""
-        if step is not None:
-            current_metric = self._get_current_metric(path)
-            if current_metric is None:
-                return {"steps": [step], "values": [value]}
-            elif isinstance(current_metric, dict) and "steps" in current_metric:
-                return {
-                    "steps": current_metric["steps"] + [step],
-                    "values": current_metric["values"] + [value]
-                }
-            else:
-                return {"steps": [step], "values": [value]}
-        return value
-
-    def _process_nested_metrics(self, metrics: Dict, current_path: List[str] = None, step: Optional[int] = None) -> Dict:
-        """Recursively process nested metrics
-        递归处理嵌套指标"""
-        if current_path is None:
-            current_path = []
-            
-        result = {}
-        for key, value in metrics.items():
-            path = current_path + [key]
-            if isinstance(value, dict):
-                result[key] = self._process_nested_metrics(value, path, step)
-            else:
-                result[key] = self._process_metric_value(path, value, step)
-        return result
-
     def _get_storage_dir(self) -> str:
         """Get the storage directory
         获取存储目录
@@ -339,6 +604,30 @@ class ExperimentTracker:
     
 
 
+    @classmethod
+    def set_run_status(cls, experiment_name: str, run_id: str, status: str,
+                       base_dir: str = "./orruns_experiments") -> None:
+        """Set the status of a run whose tracker is gone (e.g. a killed worker)
+        设置追踪器已不存在的运行（例如被终止的工作进程）的状态"""
+        if status not in cls.RUN_STATUSES:
+            raise ValueError(
+                f"Invalid status: {status}. "
+                f"Valid statuses are: {', '.join(cls.RUN_STATUSES)}"
+            )
+        base_dir = pathlib.Path(base_dir).resolve()
+        summary_file = base_dir / experiment_name / run_id / "summary.json"
+        if not summary_file.exists():
+            raise FileNotFoundError(f"Run {run_id} not found in {experiment_name}")
+        summary = serialization.load(summary_file)
+        summary["status"] = status
+        atomic_write_bytes(summary_file, serialization.dumps(summary))
+        if RunIndex.exists(base_dir):
+            index = RunIndex(base_dir)
+            try:
+                index.update_run(experiment_name, run_id, resolve_summary(summary, summary_file.parent))
+            finally:
+                index.close()
+
     @classmethod 
     def query_experiments(cls, 
                         base_dir: str = "./orruns_experiments",
@@ -347,7 +636,11 @@ class ExperimentTracker:
                         metric_filters: Optional[Dict[str, Any]] = None,
                         sort_by: Optional[str] = None,
                         sort_ascending: bool = True,
-                        limit: Optional[int] = None) -> List[Dict]:
+                        limit: Optional[int] = None,
+                        use_index: Optional[bool] = None,
+                        fields: Optional[List[str]] = None,
+                        workers: int = 1,
+                        parse_processes: bool = False) -> List[Dict]:
         """查询实验
         Query experiments
 
@@ -359,6 +652,13 @@ class ExperimentTracker:
             sort_by: Field to sort by (format: "field" or "parameters.field" or "metrics.field")
             sort_ascending: Sort direction
             limit: Maximum results to return
+            use_index: Answer the query from the SQLite run index. None (default)
+                uses the index if it exists, True builds it if necessary
+            fields: Only return these fields (format: "field" or
+                "parameters.field" or "metrics.field"). None returns everything
+            workers: Number of threads reading run directories and summaries.
+                Results are returned in the same order for any worker count
+            parse_processes: Parse summaries in a pool of ``workers`` processes
 
         Returns:
             List[Dict]: List of matching experiment information
@@ -374,159 +674,300 @@ class ExperimentTracker:
             ...     sort_by="metrics.accuracy",
             ...     sort_ascending=False
             ... )
+            >>> # Only load a single metric
+            >>> query_experiments(fields=["run_id", "metrics.accuracy"])
         """
-        def parse_filter_key(key: str) -> Tuple[str, str]:
-            """解析过滤器键
-            Parse filter key"""
-            if "__" in key:
-                field, op = key.split("__")
-                return field, op
-            return key, "eq"
-
-        def match_value(value: Any, filter_value: Any, op: str) -> bool:
-            """匹配值
-            Match value"""
-            try:
-                if op == "eq":
-                    return value == filter_value
-                elif op == "gt":
-                    return float(value) > float(filter_value)
-                elif op == "lt":
-                    return float(value) < float(filter_value)
-                elif op == "gte":
-                    return float(value) >= float(filter_value)
-                elif op == "lte":
-                    return float(value) <= float(filter_value)
-                return False
-            except (TypeError, ValueError):
-                # 如果无法进行数值比较，回退到字符串比较
-                # Fallback to string comparison if numeric comparison fails
-                str_value = str(value)
-                str_filter = str(filter_value)
-                if op == "eq":
-                    return str_value == str_filter
-                elif op == "gt":
-                    return str_value > str_filter
-                elif op == "lt":
-                    return str_value < str_filter
-                elif op == "gte":
-                    return str_value >= str_filter
-                elif op == "lte":
-                    return str_value <= str_filter
-                return False
+        return list(cls.iter_experiments(
+            base_dir=base_dir,
+            filters=filters,
+            parameter_filters=parameter_filters,
+            metric_filters=metric_filters,
+            sort_by=sort_by,
+            sort_ascending=sort_ascending,
+            limit=limit,
+            use_index=use_index,
+            fields=fields,
+            workers=workers,
+            parse_processes=parse_processes
+        ))
 
-        def match_filters(exp: Dict, filters: Dict[str, Any], data_key: Optional[str] = None) -> bool:
-            """匹配过滤器
-            Match filters"""
-            if not filters:
-                return True
-                
-            for key, filter_value in filters.items():
-                field, op = parse_filter_key(key)
-                
-                # 处理嵌套字段
-                # Handle nested fields
-                if data_key is None:
-                    exp_data = exp
-                else:
-                    exp_data = exp.get(data_key, {})
-                    
-                # 支持点号分隔的嵌套字段
-                # Support dot-separated nested fields
-                if "." in field:
-                    parts = field.split(".")
-                    current_data = exp_data
-                    for part in parts[:-1]:
-                        current_data = current_data.get(part, {})
-                    field = parts[-1]
-                    exp_data = current_data
-
-                if field not in exp_data:
-                    return False
-                if not match_value(exp_data[field], filter_value, op):
-                    return False
-            return True
+    @classmethod
+    def iter_experiments(cls,
+                         base_dir: str = "./orruns_experiments",
+                         filters: Optional[Dict[str, Any]] = None,
+                         parameter_filters: Optional[Dict[str, Any]] = None,
+                         metric_filters: Optional[Dict[str, Any]] = None,
+                         sort_by: Optional[str] = None,
+                         sort_ascending: bool = True,
+                         limit: Optional[int] = None,
+                         use_index: Optional[bool] = None,
+                         fields: Optional[List[str]] = None,
+                         workers: int = 1,
+                         parse_processes: bool = False) -> Iterator[Dict]:
+        """逐个产出匹配的实验
+        Lazily yield matching experiments
 
-        def get_sort_value(exp: Dict, sort_field: str) -> Any:
-            """获取排序值
-            Get value for sorting"""
-            try:
-                if sort_field.startswith('parameters.'):
-                    field = sort_field.split('.', 1)[1]
-                    current = exp.get('parameters', {})
-                elif sort_field.startswith('metrics.'):
-                    field = sort_field.split('.', 1)[1]
-                    current = exp.get('metrics', {})
-                else:
-                    return exp.get(sort_field)
-
-                # 处理嵌套字段
-                # Handle nested fields
-                if "." in field:
-                    parts = field.split(".")
-                    for part in parts[:-1]:
-                        current = current.get(part, {})
-                    return current.get(parts[-1])
-                return current.get(field)
-            except Exception:
-                return None
+        Takes the same arguments as ``query_experiments``. Without ``sort_by``
+        runs are read one at a time and reading stops as soon as ``limit``
+        matches have been produced. With ``sort_by`` and ``limit`` only the
+        best ``limit`` runs are kept in a bounded heap, so memory grows with
+        ``limit`` rather than with the number of runs.
+
+        Examples:
+            >>> for exp in ExperimentTracker.iter_experiments(filters={"name__eq": "tsp"}):
+            ...     print(exp["metrics"]["best_cost"])
+        """
+        if fields is not None:
+            fields = normalize_fields(fields)
 
-        # 获取所有实验
-        # Get all experiments
-        experiments = []
         base_path = pathlib.Path(base_dir)
         if not base_path.exists():
-            return []
+            return
 
-        # 遍历所有实验目录
-        # Traverse all experiment directories
-        for exp_dir in base_path.iterdir():
-            if not exp_dir.is_dir():
-                continue
-                
-            # 遍历实验下的所有运行
-            # Traverse all runs under the experiment
-            for run_dir in exp_dir.iterdir():
-                if not run_dir.is_dir():
-                    continue
-                    
-                # 读取实验信息
-                # Read experiment information
-                summary_file = run_dir / "summary.json"
-                if not summary_file.exists():
-                    continue
-                    
-                try:
-                    with open(summary_file, 'r', encoding='utf-8') as f:
-                        exp_info = json.load(f)
-                        
-                    # 应用过滤器
-                    # Apply filters
-                    if not match_filters(exp_info, filters):  # 顶层字段过滤
-                        continue
-                    if not match_filters(exp_info, parameter_filters, "parameters"):
-                        continue
-                    if not match_filters(exp_info, metric_filters, "metrics"):
-                        continue
-                        
-                    experiments.append(exp_info)
-                except Exception as e:
-                    print(f"Warning: Failed to load experiment file {summary_file}: {e}")
+        # 优先使用索引，无法精确回答时回退到目录扫描
+        # Prefer the index, fall back to scanning when it cannot answer exactly
+        if use_index is None:
+            use_index = RunIndex.exists(base_path)
+        if use_index:
+            candidates = cls._index_candidates(
+                base_path, filters, parameter_filters, metric_filters,
+                sort_by, sort_ascending
+            )
+            if candidates is not None:
+                # Candidates are already sorted by the index
+                # 候选运行已由索引排序
+                if fields is not None:
+                    matches = cls._project_from_index(
+                        base_path, candidates, fields,
+                        filters, parameter_filters, metric_filters
+                    )
+                else:
+                    matches = cls._load_matching(
+                        candidates, filters, parameter_filters, metric_filters,
+                        workers=workers, parse_processes=parse_processes
+                    )
+                yield from itertools.islice(matches, limit)
+                return
+
+        # 只有需要指标时才重放指标日志
+        # Only replay metric logs when metrics are needed
+        replay_log = (
+            fields is None
+            or bool(metric_filters)
+            or any(key.startswith("metrics") for key in (filters or {}))
+            or (sort_by or "").startswith("metrics")
+            or any(field.startswith("metrics") for field in fields)
+        )
+        matches = cls._load_matching(
+            list_run_dirs(base_path, workers), filters, parameter_filters, metric_filters,
+            replay_log=replay_log, workers=workers, parse_processes=parse_processes
+        )
 
         # 排序
         # Sort
         if sort_by:
-            experiments.sort(
-                key=lambda x: get_sort_value(x, sort_by),
-                reverse=not sort_ascending
-            )
+            sort_key = functools.partial(get_sort_value, sort_field=sort_by)
+            unwrap = None
+            if fields is not None:
+                # Keep the sort value next to the projection so full
+                # summaries are released before sorting
+                # 将排序值与投影结果一起保存，以便在排序前释放完整摘要
+                value_key = sort_key
+                matches = (
+                    (value_key(exp_info), project_fields(exp_info, fields))
+                    for exp_info in matches
+                )
+                sort_key, unwrap = operator.itemgetter(0), operator.itemgetter(1)
+            if limit is None:
+                ordered = sorted(matches, key=sort_key, reverse=not sort_ascending)
+            elif sort_ascending:
+                ordered = heapq.nsmallest(limit, matches, key=sort_key)
+            else:
+                ordered = heapq.nlargest(limit, matches, key=sort_key)
+            yield from ordered if unwrap is None else map(unwrap, ordered)
+            return
+
+        if fields is not None:
+            matches = (project_fields(exp_info, fields) for exp_info in matches)
 
         # 限制结果数量
         # Limit the number of results
-        if limit is not None:
-            experiments = experiments[:limit]
+        yield from itertools.islice(matches, limit)
+
+    @classmethod
+    def _load_matching(cls, run_dirs: Iterable[pathlib.Path],
+                       filters: Optional[Dict[str, Any]],
+                       parameter_filters: Optional[Dict[str, Any]],
+                       metric_filters: Optional[Dict[str, Any]],
+                       replay_log: bool = True,
+                       workers: int = 1,
+                       parse_processes: bool = False) -> Iterator[Dict]:
+        """Read run summaries and yield those matching the filters
+        读取运行摘要并产出匹配过滤器的运行"""
+        for run_dir, exp_info, error in iter_summaries(run_dirs, workers, parse_processes):
+            # 读取实验信息
+            # Read experiment information
+            summary_file = run_dir / "summary.json"
+            if exp_info is None and error is None:
+                continue
+                
+            try:
+                if error is not None:
+                    raise error
+                if replay_log:
+                    exp_info = resolve_summary(exp_info, run_dir)
+                    
+                # 应用过滤器
+                # Apply filters
+                if not match_filters(exp_info, filters):  # 顶层字段过滤
+                    continue
+                if not match_filters(exp_info, parameter_filters, "parameters"):
+                    continue
+                if not match_filters(exp_info, metric_filters, "metrics"):
+                    continue
+            except Exception as e:
+                print(f"Warning: Failed to load experiment file {summary_file}: {e}")
+                continue
+            yield exp_info
 
-        return experiments
+    @classmethod
+    def _index_candidates(cls, base_path: pathlib.Path,
+                          filters: Optional[Dict[str, Any]],
+                          parameter_filters: Optional[Dict[str, Any]],
+                          metric_filters: Optional[Dict[str, Any]],
+                          sort_by: Optional[str],
+                          sort_ascending: bool) -> Optional[List[pathlib.Path]]:
+        """Find candidate runs for a query using the SQLite index
+        使用SQLite索引查找查询的候选运行
+
+        Returns the sorted run directories, or None if the index cannot
+        answer the query exactly. Candidates are re-checked against the
+        filters when their summaries are read.
+        """
+        if sort_by and "." in sort_by and not sort_by.startswith(('parameters.', 'metrics.')):
+            return None
+
+        uses_metrics = (
+            bool(metric_filters)
+            or any(key.startswith("metrics") for key in (filters or {}))
+            or (sort_by or "").startswith("metrics")
+        )
+        index = RunIndex(base_path)
+        try:
+            index.ensure_built()
+            rows = index.query(
+                [("", filters), ("parameters.", parameter_filters), ("metrics.", metric_filters)],
+                sort_key=sort_by or None
+            )
+            stale = set()
+            if rows is not None:
+                stale = set(index.open_runs())
+                if uses_metrics:
+                    stale |= cls._stale_log_runs(base_path, index.metric_log_offsets())
+        finally:
+            index.close()
+        if rows is None:
+            return None
+
+        if stale:
+            # Open runs are not in the index yet, and runs whose metric log
+            # has grown (e.g. crashed before closing) have outdated indexed
+            # metrics: re-check them from disk, where the log is replayed
+            # 打开的运行尚未写入索引，指标日志有增长的运行（例如关闭前崩溃）
+            # 在索引中的指标已过期：从磁盘重新检查它们，届时会重放日志
+            if sort_by:
+                return None
+            run_keys = {(exp_name, run_id) for exp_name, run_id, _ in rows} | stale
+            return [base_path / exp_name / run_id for exp_name, run_id in sorted(run_keys)]
+
+        if sort_by:
+            rows.sort(key=lambda row: row[2], reverse=not sort_ascending)
+        return [base_path / exp_name / run_id for exp_name, run_id, _ in rows]
+
+    @staticmethod
+    def _stale_log_runs(base_path: pathlib.Path, offsets: Dict[str, int]) -> set:
+        """``(exp_dir, run_dir)`` of runs whose metric log has grown since the index was updated
+        自索引更新以来指标日志有增长的运行的 ``(exp_dir, run_dir)``"""
+        stale = set()
+        for run_key, offset in offsets.items():
+            log_path = base_path / run_key / "metrics" / METRIC_LOG_FILE
+            try:
+                if log_path.stat().st_size > offset:
+                    stale.add(tuple(run_key.split("/", 1)))
+            except OSError:
+                continue
+        return stale
+
+    @classmethod
+    def _project_from_index(cls, base_path: pathlib.Path,
+                            run_dirs: List[pathlib.Path],
+                            fields: List[str],
+                            filters: Optional[Dict[str, Any]],
+                            parameter_filters: Optional[Dict[str, Any]],
+                            metric_filters: Optional[Dict[str, Any]]) -> Iterator[Dict]:
+        """Build projected results from the index without reading summaries
+        不读取摘要，直接从索引构建投影结果
+
+        Open runs, runs whose requested fields are stepped series or
+        sub-dictionaries, and runs whose metric log has grown since the index
+        was updated are read from disk instead.
+        """
+        keys = {"metric_log_offset"}
+        for field in fields:
+            parts = field.split(".")
+            keys.update(".".join(parts[:i]) for i in range(1, len(parts) + 1))
+
+        run_keys = [f"{run_dir.parent.name}/{run_dir.name}" for run_dir in run_dirs]
+        index = RunIndex(base_path)
+        try:
+            values = index.fetch(run_keys, sorted(keys))
+            open_runs = {f"{exp_dir}/{run_dir}" for exp_dir, run_dir in index.open_runs()}
+        finally:
+            index.close()
+
+        for run_key, run_dir in zip(run_keys, run_dirs):
+            row = values.get(run_key, {})
+            if run_key not in open_runs and cls._index_row_complete(row, run_dir, fields):
+                yield nest_fields((field, row[field][1]) for field in fields if field in row)
+                continue
+            for exp_info in cls._load_matching(
+                [run_dir], filters, parameter_filters, metric_filters
+            ):
+                yield project_fields(exp_info, fields)
+
+    @staticmethod
+    def _index_row_complete(row: Dict[str, Tuple[str, Any]], run_dir: pathlib.Path,
+                            fields: List[str]) -> bool:
+        """Whether the indexed values of a run answer a projection exactly"""
+        offset = row.get("metric_log_offset")
+        if offset is not None:
+            log_path = run_dir / "metrics" / METRIC_LOG_FILE
+            if log_path.exists() and log_path.stat().st_size > offset[1]:
+                return False
+        for field in fields:
+            parts = field.split(".")
+            for i in range(1, len(parts) + 1):
+                kind = row.get(".".join(parts[:i]), (None,))[0]
+                if kind == "series" or (kind == "dict" and i == len(parts)):
+                    return False
+        return True
+
+    @classmethod
+    def rebuild_index(cls, base_dir: str = "./orruns_experiments") -> int:
+        """重建运行索引
+        Rebuild the SQLite run index from the on-disk tree
+
+        Args:
+            base_dir: Base directory for experiments
+
+        Returns:
+            int: Number of indexed runs
+        """
+        index = RunIndex(base_dir)
+        try:
+            return index.rebuild()
+        finally:
+            index.close()
 
 
     ###工件管理类方法：列出实验运行的所有文件工件
@@ -583,10 +1024,10 @@ class ExperimentTracker:
         elif suffix in ['.npz']:
             return np.load(full_path, allow_pickle=True)
         elif suffix in ['.csv']:
+            import pandas as pd
             return pd.read_csv(full_path)
         elif suffix in ['.json']:
-            with open(full_path, 'r', encoding='utf-8') as f:
-                return json.load(f)
+            return serialization.load(full_path)
         elif suffix in ['.txt', '.log']:
             with open(full_path, 'r', encoding='utf-8') as f:
                 return f.read()
@@ -637,6 +1078,13 @@ class ExperimentTracker:
             # Delete the entire experiment
             shutil.rmtree(exp_path)
 
+        if RunIndex.exists(base_path):
+            index = RunIndex(base_path)
+            try:
+                index.remove_runs(experiment_name, run_id)
+            finally:
+                index.close()
+
     @classmethod
     def delete_all_experiments(cls, base_dir: str = "./orruns_experiments") -> None:
         """
@@ -647,4 +1095,22 @@ class ExperimentTracker:
         """
         base_path = pathlib.Path(base_dir)
         if base_path.exists():
-            shutil.rmtree(base_path)
\ No newline at end of file
+            shutil.rmtree(base_path)
+
+
+def _close_tracker(tracker_ref: "weakref.ref[ExperimentTracker]") -> None:
+    """Close a tracker with background writes at interpreter exit
+    在解释器退出时关闭启用后台写入的追踪器"""
+    tracker = tracker_ref()
+    if tracker is not None:
+        tracker.close()
+
+
+def _log_resources(tracker_ref: "weakref.ref[ExperimentTracker]",
+                   sample: Dict[str, float], step: int) -> None:
+    """Pass a resource sample to the tracker, if it still exists
+    将资源样本交给仍然存在的追踪器"""
+    tracker = tracker_ref()
+    if tracker is None:
+        raise RuntimeError("Tracker was garbage collected")
+    tracker._log_resource_sample(sample, step)
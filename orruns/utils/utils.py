@@ -1,14 +1,214 @@
+import copy
 import platform
 import psutil
 import multiprocessing as mp
 import time
+from pathlib import Path
 from typing import Dict, Optional
-from functools import lru_cache
 import os
 import sys
-import cpuinfo
 
-@lru_cache(maxsize=1)
+# Static system facts are cached per host in this directory
+# 静态系统信息按主机缓存在此目录中
+SYSTEM_INFO_CACHE_DIR = Path.home() / ".orruns" / "cache"
+# Bump when the collected fields change
+# 收集的字段变化时递增
+SYSTEM_INFO_CACHE_VERSION = 1
+# Packages whose versions are reported or invalidate the cache
+# 其版本会被报告或使缓存失效的包
+FINGERPRINT_PACKAGES = ("numpy", "scipy", "pandas", "matplotlib", "torch", "py-cpuinfo", "psutil")
+
+# Static facts collected in this process, by level
+# 本进程中已收集的静态信息（按层级）
+_static_info: Dict[str, Dict] = {}
+
+
+def _package_version(name: str) -> Optional[str]:
+    """Installed version of a package, without importing it
+    不导入包而获取其安装版本"""
+    try:
+        from importlib.metadata import PackageNotFoundError, version
+    except ImportError:  # Python < 3.8
+        return None
+    try:
+        return version(name)
+    except PackageNotFoundError:
+        return None
+
+
+def _boot_id() -> str:
+    """Identifier of the current boot of this machine
+    本机当前启动的标识"""
+    try:
+        with open("/proc/sys/kernel/random/boot_id") as f:
+            return f.read().strip()
+    except OSError:
+        return str(psutil.boot_time())
+
+
+def _fingerprint() -> Dict:
+    """What the static facts depend on: host, boot, interpreter and packages
+    静态信息所依赖的内容：主机、启动、解释器和包"""
+    return {
+        "cache_version": SYSTEM_INFO_CACHE_VERSION,
+        "host": platform.node(),
+        "boot_id": _boot_id(),
+        "python": sys.version,
+        "executable": sys.executable,
+        "packages": {name: _package_version(name) for name in FINGERPRINT_PACKAGES},
+    }
+
+
+def _cache_path() -> Path:
+    return SYSTEM_INFO_CACHE_DIR / f"system_info-{platform.node() or 'localhost'}.json"
+
+
+def _gpu_info(detailed: bool) -> Optional[Dict]:
+    """GPU facts from torch, if it is installed and sees a CUDA device
+    若已安装 torch 且检测到 CUDA 设备，返回GPU信息"""
+    import importlib.util
+    if importlib.util.find_spec("torch") is None:
+        return None
+    import torch
+    if not torch.cuda.is_available():
+        return None
+    gpu = {
+        "model": torch.cuda.get_device_name(0),
+        "count": torch.cuda.device_count(),
+        "memory_gb": round(torch.cuda.get_device_properties(0).total_memory / (1024**3), 2)
+    }
+    if detailed:
+        gpu.update({
+            "devices": [
+                {
+                    "name": torch.cuda.get_device_name(i),
+                    "total_memory_gb": round(torch.cuda.get_device_properties(i).total_memory / (1024**3), 2),
+                    "compute_capability": f"{torch.cuda.get_device_capability(i)[0]}.{torch.cuda.get_device_capability(i)[1]}"
+                }
+                for i in range(torch.cuda.device_count())
+            ],
+            "cuda_version": torch.version.cuda,
+            "cudnn_version": torch.backends.cudnn.version() if torch.backends.cudnn.is_available() else None
+        })
+    return gpu
+
+
+def _collect_static(level: str) -> Dict:
+    """Collect the facts of a level that only change with a reboot or an upgrade
+    收集某层级中只会随重启或升级而变化的信息
+
+    Fields that change during a session (available memory, free disk
+    space) are left as None and filled in by ``get_system_info``.
+    """
+    # Imported here: cpuinfo is slow to import and runs a subprocess
+    # 在此导入：cpuinfo 导入较慢，且会启动子进程
+    import cpuinfo
+    cpu_info = cpuinfo.get_cpu_info()
+    key_packages = {
+        "numpy": _package_version("numpy"),
+        "scipy": _package_version("scipy")
+    }
+
+    # 运筹学论文常用的关键信息（level='basic'）
+    info = {
+        "hardware": {
+            "cpu": {
+                "model": cpu_info.get('brand_raw', 'Unknown'),
+                "physical_cores": psutil.cpu_count(logical=False),
+                "logical_cores": psutil.cpu_count(logical=True),
+                "base_frequency_ghz": round(cpu_info.get('hz_advertised_raw', [0])[0] / 1000000000, 2)
+            },
+            "memory": {
+                "total_gb": round(psutil.virtual_memory().total / (1024 ** 3), 2)
+            }
+        },
+        "software": {
+            "os": f"{platform.system()} {platform.release()}",
+            "python": platform.python_version(),
+            "key_packages": key_packages
+        }
+    }
+    gpu = _gpu_info(detailed=level == 'full')
+    if gpu is not None:
+        info["hardware"]["gpu"] = gpu
+    if level == 'basic':
+        return info
+
+    # 完整系统信息（level='full'）
+    cpu_freq = psutil.cpu_freq()
+    info["hardware"]["cpu"].update({
+        "architecture": cpu_info.get('arch', platform.machine()),
+        "max_frequency_mhz": cpu_freq.max if hasattr(cpu_freq, 'max') else None,
+        "cache_size": cpu_info.get('l2_cache_size', 'Unknown'),
+        "instruction_set": cpu_info.get('flags', [])
+    })
+    info["hardware"]["memory"].update({
+        "available_gb": None,
+        "type": "Unknown",
+        "speed": "Unknown"
+    })
+    info["hardware"]["disk"] = {"total_gb": None, "free_gb": None}
+    info["software"] = {
+        "os": {
+            "system": platform.system(),
+            "release": platform.release(),
+            "version": platform.version(),
+            "machine": platform.machine()
+        },
+        "python": {
+            "version": platform.python_version(),
+            "implementation": platform.python_implementation(),
+            "compiler": platform.python_compiler(),
+            "location": sys.executable
+        },
+        "packages": {
+            **key_packages,
+            "pandas": _package_version("pandas"),
+            "matplotlib": _package_version("matplotlib"),
+            "torch": _package_version("torch")
+        }
+    }
+    return info
+
+
+def _load_static(level: str) -> Dict:
+    """Static facts of a level, from memory, the on-disk cache or collected anew
+    某层级的静态信息，依次取自内存、磁盘缓存或重新收集"""
+    if level in _static_info:
+        return _static_info[level]
+    fingerprint = _fingerprint()
+    path = _cache_path()
+    from ..core import serialization
+    try:
+        cache = serialization.load(path)
+    except (OSError, ValueError):
+        cache = {}
+    if not isinstance(cache, dict) or cache.get("fingerprint") != fingerprint:
+        # Another boot, interpreter or package set: start over
+        # 启动、解释器或包已变化：重新开始
+        cache = {"fingerprint": fingerprint, "levels": {}}
+    if level not in cache["levels"]:
+        cache["levels"][level] = _collect_static(level)
+        try:
+            from ..core.storage import atomic_write_bytes
+            path.parent.mkdir(parents=True, exist_ok=True)
+            atomic_write_bytes(path, serialization.dumps(cache, pretty=True))
+        except OSError:
+            pass  # e.g. read-only home directory: keep the in-memory copy
+    _static_info[level] = cache["levels"][level]
+    return _static_info[level]
+
+
+def clear_system_info_cache() -> None:
+    """Forget cached system facts, in memory and on disk
+    清除内存和磁盘中缓存的系统信息"""
+    _static_info.clear()
+    try:
+        _cache_path().unlink()
+    except OSError:
+        pass
+
+
 def get_system_info(
     experiment_name: Optional[str] = None, 
     parallel: Optional[bool] = None, 
@@ -18,6 +218,9 @@ def get_system_info(
 ) -> Dict:
     """
     收集系统信息，提供三个层级的信息详细程度
+
+    硬件和软件等静态信息按层级按需收集，并按主机缓存在磁盘上（重启或包版本变化后失效），
+    每次调用只刷新内存占用、CPU绑定和开始时间等动态字段
     
     Args:
         experiment_name: 实验名称
@@ -46,125 +249,30 @@ def get_system_info(
             "max_workers": max_workers if parallel else None,
             "start_time": time.strftime("%Y-%m-%d %H:%M:%S")
         }
-    
 
-        
-    # 运筹学论文常用的关键信息（level='basic'）
-    if level in ['basic', 'full']:
-        cpu_info = cpuinfo.get_cpu_info()
-        
-        system_info.update({
-            "hardware": {
-                "cpu": {
-                    "model": cpu_info.get('brand_raw', 'Unknown'),
-                    "physical_cores": psutil.cpu_count(logical=False),
-                    "logical_cores": psutil.cpu_count(logical=True),
-                    "base_frequency_ghz": round(cpu_info.get('hz_advertised_raw', [0])[0] / 1000000000, 2)
-                },
-                "memory": {
-                    "total_gb": round(psutil.virtual_memory().total / (1024 ** 3), 2)
-                }
-            },
-            "software": {
-                "os": f"{platform.system()} {platform.release()}",
-                "python": platform.python_version(),
-                "key_packages": {
-                    "numpy": __import__('numpy').__version__,
-                    "scipy": __import__('scipy').__version__
-                }
-            }
-        })
-        
-        # 基础GPU信息
-        try:
-            import torch
-            if torch.cuda.is_available():
-                system_info["hardware"]["gpu"] = {
-                    "model": torch.cuda.get_device_name(0),
-                    "count": torch.cuda.device_count(),
-                    "memory_gb": round(torch.cuda.get_device_properties(0).total_memory / (1024**3), 2)
-                }
-        except ImportError:
-            pass
-    
+    if level not in ('basic', 'full'):
+        return system_info
+    system_info.update(copy.deepcopy(_load_static(level)))
     if level == 'basic':
         return system_info
-        
-    # 完整系统信息（level='full'）
-    if level == 'full':
-        system_info.update({
-            "hardware": {
-                "cpu": {
-                    **system_info["hardware"]["cpu"],
-                    "architecture": cpu_info.get('arch', platform.machine()),
-                    "max_frequency_mhz": psutil.cpu_freq().max if hasattr(psutil.cpu_freq(), 'max') else None,
-                    "cache_size": cpu_info.get('l2_cache_size', 'Unknown'),
-                    "instruction_set": cpu_info.get('flags', [])
-                },
-                "memory": {
-                    **system_info["hardware"]["memory"],
-                    "available_gb": round(psutil.virtual_memory().available / (1024 ** 3), 2),
-                    "type": "Unknown",
-                    "speed": "Unknown"
-                },
-                "disk": {
-                    "total_gb": round(psutil.disk_usage('/').total / (1024 ** 3), 2),
-                    "free_gb": round(psutil.disk_usage('/').free / (1024 ** 3), 2)
-                }
-            },
-            "software": {
-                "os": {
-                    "system": platform.system(),
-                    "release": platform.release(),
-                    "version": platform.version(),
-                    "machine": platform.machine()
-                },
-                "python": {
-                    "version": platform.python_version(),
-                    "implementation": platform.python_implementation(),
-                    "compiler": platform.python_compiler(),
-                    "location": sys.executable
-                },
-                "packages": {
-                    **system_info["software"]["key_packages"],
-                    "pandas": __import__('pandas').__version__,
-                    "matplotlib": __import__('matplotlib').__version__,
-                    "torch": __import__('torch').__version__ if 'torch' in sys.modules else None
-                }
-            }
+
+    # Dynamic fields of the full level
+    # 完整层级的动态字段
+    system_info["hardware"]["memory"]["available_gb"] = round(psutil.virtual_memory().available / (1024 ** 3), 2)
+    disk = psutil.disk_usage('/')
+    system_info["hardware"]["disk"] = {
+        "total_gb": round(disk.total / (1024 ** 3), 2),
+        "free_gb": round(disk.free / (1024 ** 3), 2)
+    }
+    # 详细实验信息
+    if "experiment" in system_info:
+        system_info["experiment"].update({
+            "process_affinity": list(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else None,
+            "current_memory_usage_gb": round(psutil.Process().memory_info().rss / (1024 ** 3), 2)
         })
-        
-        # 详细GPU信息
-        if "gpu" in system_info["hardware"]:
-            system_info["hardware"]["gpu"].update({
-                "devices": [
-                    {
-                        "name": torch.cuda.get_device_name(i),
-                        "total_memory_gb": round(torch.cuda.get_device_properties(i).total_memory / (1024**3), 2),
-                        "compute_capability": f"{torch.cuda.get_device_capability(i)[0]}.{torch.cuda.get_device_capability(i)[1]}"
-                    }
-                    for i in range(torch.cuda.device_count())
-                ],
-                "cuda_version": torch.version.cuda,
-                "cudnn_version": torch.backends.cudnn.version() if torch.backends.cudnn.is_available() else None
-            })
-            
-        # 详细实验信息
-        if "experiment" in system_info:
-            system_info["experiment"].update({
-                "process_affinity": list(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else None,
-                "current_memory_usage_gb": round(psutil.Process().memory_info().rss / (1024 ** 3), 2)
-            })
-    
-    return system_info
 
+    return system_info
 
-from rich.console import Console
-from rich.panel import Panel
-from rich.layout import Layout
-from rich.json import JSON
-from rich.table import Table
-from rich.text import Text
 
 def print_system_info(
     system_info: Dict,
@@ -300,6 +408,12 @@ def _print_rich_style(system_info: Dict) -> None:
     Args:
         system_info: 系统信息字典
     """
+    from rich.console import Console
+    from rich.layout import Layout
+    from rich.panel import Panel
+    from rich.table import Table
+    from rich.text import Text
+
     console = Console()
     
     # 创建硬件信息表格
@@ -2,10 +2,11 @@ import dash
 from dash import html, dcc, Input, Output, State, callback_context, ALL
 import dash_bootstrap_components as dbc
 from pathlib import Path
-import json
 import pandas as pd
 from typing import Dict, List, Any
 from .plots import PlotManager
+from ..core import serialization
+from ..core.storage import flatten_metrics, load_run_metrics
 import plotly.graph_objs as go  # Add this line / 添加这行
 import flask
 class ExperimentDashboard:
@@ -175,11 +176,7 @@ class ExperimentDashboard:
             exp_dir = self.base_dir / experiment
             for run_dir in exp_dir.iterdir():
                 if run_dir.is_dir():
-                    metrics_file = run_dir / 'metrics' / 'metrics.json'
-                    if metrics_file.exists():
-                        with open(metrics_file, 'r') as f:
-                            run_metrics = json.load(f)
-                            metrics.update(run_metrics.keys())
+                    metrics.update(flatten_metrics(load_run_metrics(run_dir)).keys())
             
             options = [{'label': metric, 'value': metric} for metric in metrics]
             return options, options[0]['value'] if options else None
@@ -199,8 +196,8 @@ class ExperimentDashboard:
                 if run_dir.is_dir():
                     params_file = run_dir / 'params' / 'params.json'
                     if params_file.exists():
-                        with open(params_file, 'r') as f:
-                            params = json.load(f)
+                        with open(params_file, 'rb') as f:
+                            params = serialization.loads(f.read())
                             for k, v in params.items():
                                 if k not in param_values:
                                     param_values[k] = set()
@@ -241,8 +238,8 @@ class ExperimentDashboard:
                 if run_dir.is_dir():
                     params_file = run_dir / 'params' / 'params.json'
                     if params_file.exists():
-                        with open(params_file, 'r') as f:
-                            params = json.load(f)
+                        with open(params_file, 'rb') as f:
+                            params = serialization.loads(f.read())
                             for k, v in params.items():
                                 if k in selected_params:
                                     if k not in param_values:
@@ -304,8 +301,8 @@ class ExperimentDashboard:
                 params = {}
                 params_file = run_dir / 'params' / 'params.json'
                 if params_file.exists():
-                    with open(params_file, 'r') as f:
-                        params = json.load(f)
+                    with open(params_file, 'rb') as f:
+                        params = serialization.loads(f.read())
                         
                     # Check if it meets the filter conditions / 检查是否满足过滤条件
                     if param_filter_dict:
@@ -325,31 +322,28 @@ class ExperimentDashboard:
                     param_info = "no_params"
                     
                 # Read metric data / 读取指标数据
-                metrics_file = run_dir / 'metrics' / 'metrics.json'
-                if metrics_file.exists():
-                    with open(metrics_file, 'r') as f:
-                        run_metrics = json.load(f)
-                        if metric in run_metrics:
-                            metric_data = run_metrics[metric]
-                            
-                            if isinstance(metric_data, dict) and 'steps' in metric_data:
-                                convergence_data.append({
-                                    'run': run_dir.name,
-                                    'params': param_info,
-                                    'steps': metric_data['steps'],
-                                    'values': metric_data['values']
-                                })
-                                box_data.append({
-                                    'run': run_dir.name,
-                                    'params': param_info,
-                                    'value': metric_data['values'][-1]
-                                })
-                            else:
-                                box_data.append({
-                                    'run': run_dir.name,
-                                    'params': param_info,
-                                    'value': metric_data
-                                })
+                run_metrics = flatten_metrics(load_run_metrics(run_dir))
+                if metric in run_metrics:
+                    metric_data = run_metrics[metric]
+                    
+                    if isinstance(metric_data, dict) and 'steps' in metric_data:
+                        convergence_data.append({
+                            'run': run_dir.name,
+                            'params': param_info,
+                            'steps': metric_data['steps'],
+                            'values': metric_data['values']
+                        })
+                        box_data.append({
+                            'run': run_dir.name,
+                            'params': param_info,
+                            'value': metric_data['values'][-1]
+                        })
+                    else:
+                        box_data.append({
+                            'run': run_dir.name,
+                            'params': param_info,
+                            'value': metric_data
+                        })
 
             # Create charts / 创建图表
             box_df = pd.DataFrame(box_data)
@@ -424,8 +418,8 @@ class ExperimentDashboard:
                 if run_dir.is_dir():
                     params_file = run_dir / 'params' / 'params.json'
                     if params_file.exists():
-                        with open(params_file, 'r') as f:
-                            params = json.load(f)
+                        with open(params_file, 'rb') as f:
+                            params = serialization.loads(f.read())
                             params['run_id'] = run_dir.name[-8:]  # Add run ID / 添加运行ID
                             params_data.append(params)
             
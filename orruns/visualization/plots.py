@@ -195,7 +195,7 @@ class PlotManager:
             ))
             
             fig.add_trace(go.Scatter(
-                x=steps + steps[::-1],
+                x=np.concatenate([steps, steps[::-1]]),
                 y=np.concatenate([mean_values + std_values, (mean_values - std_values)[::-1]]),
                 fill='toself',
                 fillcolor=fill_color,
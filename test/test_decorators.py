@@ -0,0 +1,501 @@
+import asyncio
+import os
+import signal
+import time
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from orruns import decorators
+from orruns.core import serialization
+from orruns.core.pool import WorkerPool
+from orruns.core.seeding import derive_seed
+from orruns.core.storage import StorageTarget
+from orruns.decorators import ResultsMerger, experiment_manager
+from orruns.utils import utils
+
+
+@pytest.fixture(autouse=True)
+def system_info_cache(tmp_path, monkeypatch):
+    """将系统信息缓存写入临时目录，而不是 ~/.orruns/cache"""
+    monkeypatch.setattr(utils, "SYSTEM_INFO_CACHE_DIR", tmp_path / "system_info_cache")
+
+
+def test_chunked_parallel_runs(tmp_path, monkeypatch):
+    """测试分批提交的并行运行"""
+    monkeypatch.chdir(tmp_path)
+
+    @experiment_manager(times=5, parallel=True, max_workers=2, chunksize=2)
+    def chunked(tracker, offset):
+        return {"value": offset + tracker.get_params()["run_index"]}
+
+    results = chunked(10)
+    assert sorted(result["value"] for result in results) == [10, 11, 12, 13, 14]
+    runs = list((tmp_path / "orruns_experiments" / "chunked").glob("*/summary.json"))
+    assert len(runs) == 5
+
+
+def test_chunksize_validation():
+    """测试分批大小验证"""
+    with pytest.raises(ValueError):
+        experiment_manager(times=2, parallel=True, chunksize=0)
+
+
+def test_mmap_array_transport(tmp_path, monkeypatch):
+    """测试大型数组通过内存映射文件返回"""
+    monkeypatch.chdir(tmp_path)
+
+    @experiment_manager(times=2, parallel=True, max_workers=2, array_transport="mmap")
+    def arrays(tracker):
+        return {"large": np.arange(300_000, dtype=np.float64), "small": np.ones(3)}
+
+    results = arrays()
+    assert len(results) == 2
+    for result in results:
+        assert isinstance(result["large"], np.memmap)
+        assert result["large"][-1] == 299_999
+        assert not isinstance(result["small"], np.memmap)
+    assert len(list((tmp_path / "orruns_experiments" / "arrays").glob("*/results/*.npy"))) == 2
+
+    with pytest.raises(ValueError):
+        experiment_manager(array_transport="shm")
+
+
+def test_streaming_results_merger(tmp_path):
+    """测试流式合并结果与检查点"""
+    merger = ResultsMerger(
+        "merge_test", base_dir=str(tmp_path), checkpoint_every=5,
+        merge_config={"scalars": ["cost"], "arrays": ["best"], "time_series": ["curve"],
+                      "text": ["log"]}
+    )
+    rng = np.random.default_rng(0)
+    costs = rng.normal(size=20)
+    for i, cost in enumerate(costs):
+        merger.add({"cost": cost, "best": np.full(3, i), "curve": np.arange(4) * i,
+                    "log": f"run {i}"}, run_id=f"run_{i}")
+        if i == 4:
+            # Checkpoint written before the last run
+            # 最后一次运行之前已写入检查点
+            stats = pd.read_csv(merger.save_dir / "scalars" / "statistics.csv", index_col=0)
+            assert stats.loc["count", "cost"] == 5
+            # Checkpoints write only the time series statistics
+            # 检查点只写入时间序列统计信息
+            curve = pd.read_csv(merger.save_dir / "curve_timeseries_statistics.csv", index_col=0)
+            assert list(curve.columns) == ["mean", "std", "min", "25%", "50%", "75%", "max"]
+            assert list(curve["mean"]) == pytest.approx([0, 2, 4, 6])
+            assert not (merger.save_dir / "curve_timeseries.csv").exists()
+    merger.finalize()
+
+    stats = merger.scalar_statistics()["cost"]
+    assert stats["count"] == 20
+    assert stats["mean"] == pytest.approx(costs.mean())
+    assert stats["std"] == pytest.approx(costs.std(ddof=1))
+    assert stats["max"] == pytest.approx(costs.max())
+
+    arrays = np.load(merger.save_dir / "arrays" / "best_statistics.npz")
+    assert arrays["mean"] == pytest.approx(np.full(3, 9.5))
+    curve = pd.read_csv(merger.save_dir / "curve_timeseries.csv", index_col=0)
+    assert list(curve["mean"]) == pytest.approx([0, 9.5, 19, 28.5])
+    assert list(curve.columns[:2]) == ["run_0", "run_1"]
+    assert list(curve["run_3"]) == [0, 3, 6, 9]
+    assert list(curve.columns[-7:]) == ["mean", "std", "min", "25%", "50%", "75%", "max"]
+    assert list(curve["50%"]) == pytest.approx([0, 9.5, 19, 28.5], rel=0.1)
+    # Small chunks give the same layout
+    # 小分块得到相同的布局
+    merger.TIME_SERIES_CHUNK = 6
+    merger.finalize()
+    chunked = pd.read_csv(merger.save_dir / "curve_timeseries.csv", index_col=0)
+    pd.testing.assert_frame_equal(chunked, curve)
+    assert len(pd.read_csv(merger.save_dir / "scalars" / "raw_values.csv")) == 20
+    assert (merger.save_dir / "scalars" / "cost_distribution.png").exists()
+    metadata = serialization.load(merger.save_dir / "batch_metadata.json")
+    assert metadata["n_merged_results"] == 20
+    assert len(metadata["source_experiments"]) == 20
+
+
+def test_merge_distributions(tmp_path):
+    """测试分布图每次合并都从新图形开始"""
+    import matplotlib.pyplot as plt
+
+    open_figures = plt.get_fignums()
+    merger = ResultsMerger("dist_test", base_dir=str(tmp_path))
+    results = [{"sample": np.random.default_rng(i).normal(size=50)} for i in range(3)]
+    for _ in range(2):
+        merger.merge_results(results, {"distributions": ["sample"]})
+        assert (merger.save_dir / "sample_distribution.png").exists()
+        assert not merger._figures
+    # 合并使用的图形不由 pyplot 管理
+    assert plt.get_fignums() == open_figures
+
+    merger.add(results[0])
+    merger.merge_results(results[:1], {"distributions": ["sample"]})
+    assert not merger._figures
+
+
+def test_resume_batch(tmp_path, monkeypatch):
+    """测试中断的批次只重新运行缺失的索引"""
+    monkeypatch.chdir(tmp_path)
+    flag = tmp_path / "fixed"
+
+    @experiment_manager(times=5, parallel=True, max_workers=2, resume=True,
+                        merge_config={"scalars": ["value"]})
+    def flaky(tracker, flag):
+        index = tracker.get_params()["run_index"]
+        if index in (1, 3) and not flag.exists():
+            raise RuntimeError("preempted")
+        return {"value": index}
+
+    exp_dir = tmp_path / "orruns_experiments" / "flaky"
+    assert sorted(r["value"] for r in flaky(flag)) == [0, 2, 4]
+    n_runs = len(list(exp_dir.iterdir()))
+    flag.touch()
+    assert sorted(r["value"] for r in flaky(flag)) == [0, 1, 2, 3, 4]
+    # Only the two failed indices ran again
+    # 只有两个失败的索引重新运行
+    assert len(list(exp_dir.iterdir())) == n_runs + 2
+    batches = list((exp_dir / "merged_results").iterdir())
+    assert len(batches) == 1
+    raw = pd.read_csv(batches[0] / "scalars" / "raw_values.csv")
+    assert sorted(raw["value"]) == [0, 1, 2, 3, 4]
+
+
+def test_thread_and_asyncio_backends(tmp_path, monkeypatch):
+    """测试线程与asyncio执行后端"""
+    monkeypatch.chdir(tmp_path)
+
+    @experiment_manager(times=4, backend="thread", max_workers=2)
+    def threaded(tracker):
+        return {"value": tracker.get_params()["run_index"]}
+
+    @experiment_manager(times=4, max_workers=2, merge_config={"scalars": ["value"]})
+    async def coroutine(tracker):
+        await asyncio.sleep(0.01)
+        return {"value": tracker.get_params()["run_index"]}
+
+    assert sorted(r["value"] for r in threaded()) == [0, 1, 2, 3]
+    assert sorted(r["value"] for r in coroutine()) == [0, 1, 2, 3]
+    assert len(list((tmp_path / "orruns_experiments" / "coroutine").glob("*/summary.json"))) == 4
+
+    with pytest.raises(ValueError):
+        experiment_manager(backend="gpu")
+    with pytest.raises(ValueError):
+        experiment_manager(backend="process")(coroutine.__wrapped__)
+
+
+def test_run_timeouts(tmp_path, monkeypatch):
+    """测试超时运行被中断或终止并记录状态"""
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(decorators, "HARD_TIMEOUT_GRACE", 0.5)
+
+    @experiment_manager(times=3, parallel=True, max_workers=3, timeout=1, resume=True)
+    def slow(tracker):
+        index = tracker.get_params()["run_index"]
+        if index == 2:
+            # Ignore the alarm so the worker has to be killed
+            # 忽略超时信号，迫使工作进程被终止
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        if index > 0:
+            time.sleep(30)
+        return {"value": index}
+
+    start = time.time()
+    assert [r["value"] for r in slow()] == [0]
+    assert time.time() - start < 25
+
+    statuses = sorted(
+        serialization.load(path)["status"]
+        for path in (tmp_path / "orruns_experiments" / "slow").glob("*/summary.json")
+    )
+    assert statuses == ["completed", "timeout", "timeout"]
+    ledger = next((tmp_path / "orruns_experiments" / "slow" / "merged_results").glob("*/ledger.jsonl"))
+    entries = [serialization.loads(line) for line in ledger.read_bytes().splitlines()[1:]]
+    assert sorted(entry["status"] for entry in entries) == ["completed", "timeout", "timeout"]
+
+
+def test_run_timeouts_on_shared_pool(tmp_path, monkeypatch):
+    """测试强制超时不会破坏其他批次正在使用或之后使用的共享进程池"""
+    import threading
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setattr(decorators, "HARD_TIMEOUT_GRACE", 0.5)
+    pool = WorkerPool(max_workers=2, idle_timeout=None)
+    starts = tmp_path / "starts.txt"
+
+    @experiment_manager(times=1, parallel=True, pool=pool, timeout=1)
+    def stuck(tracker):
+        signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+        with open(starts, "a") as f:
+            f.write("stuck\n")
+        time.sleep(10)
+        return {}
+
+    @experiment_manager(times=4, parallel=True, pool=pool)
+    def slow(tracker):
+        with open(starts, "a") as f:
+            f.write("started\n")
+        time.sleep(1)
+        return {"value": tracker.get_params()["run_index"]}
+
+    @experiment_manager(times=4, parallel=True, pool=pool, timeout=1)
+    def quick(tracker):
+        index = tracker.get_params()["run_index"]
+        if index == 3:
+            signal.pthread_sigmask(signal.SIG_BLOCK, {signal.SIGALRM})
+            time.sleep(30)
+        return {"value": index}
+
+    try:
+        # A batch sharing the pool is not broken by the stuck run
+        # 共享进程池的批次不会因卡住的运行而损坏
+        stuck_results = []
+        thread = threading.Thread(target=lambda: stuck_results.append(stuck()))
+        thread.start()
+        deadline = time.time() + 30
+        while not starts.exists() and time.time() < deadline:
+            time.sleep(0.05)
+        start = time.time()
+        assert sorted(r["value"] for r in slow()) == [0, 1, 2, 3]
+        thread.join()
+        assert stuck_results == [[]]
+        assert time.time() - start < 9
+        # Every run started once: none was lost with a broken executor
+        # 每次运行只启动一次：没有运行因执行器损坏而丢失
+        assert starts.read_text().splitlines().count("started") == 4
+
+        # A worker killed while the batch uses the pool alone is replaced
+        # 批次单独使用进程池时被终止的工作进程会被替换
+        assert sorted(r["value"] for r in quick()) == [0, 1, 2]
+        with pool.session() as executor:
+            assert executor.submit(os.getpid).result() != os.getpid()
+    finally:
+        pool.shutdown(wait=False)
+
+
+def test_asyncio_timeout_abandons_run(tmp_path, monkeypatch):
+    """测试超时后仍在线程中运行的同步函数不再写入运行"""
+    monkeypatch.chdir(tmp_path)
+    logged = []
+
+    @experiment_manager(times=1, backend="asyncio", timeout=0.2)
+    def late(tracker):
+        time.sleep(0.6)
+        tracker.log_metrics({"late": 1.0})
+        tracker.set_status("completed")
+        logged.append(True)
+        return {}
+
+    assert late() == []
+    deadline = time.time() + 5
+    while not logged and time.time() < deadline:
+        time.sleep(0.05)
+    assert logged
+    summary = serialization.load(
+        next((tmp_path / "orruns_experiments" / "late").glob("*/summary.json"))
+    )
+    assert summary["status"] == "timeout"
+    assert "late" not in summary["metrics"]
+
+
+def test_crashing_worker(tmp_path, monkeypatch):
+    """测试总是导致工作进程退出的运行最终被记录为失败"""
+    monkeypatch.chdir(tmp_path)
+
+    @experiment_manager(times=4, parallel=True, max_workers=2, backend="process")
+    def crashing(tracker):
+        index = tracker.get_params()["run_index"]
+        if index == 1:
+            os._exit(1)
+        time.sleep(0.1)
+        return {"value": index}
+
+    start = time.time()
+    assert sorted(r["value"] for r in crashing()) == [0, 2, 3]
+    assert time.time() - start < 60
+
+    if hasattr(os, "sched_setaffinity"):
+        # Workers fail in their initializer before starting any run
+        # 工作进程在开始任何运行之前就在初始化函数中失败
+        @experiment_manager(times=2, parallel=True, max_workers=2, cpu_affinity=[[4096]])
+        def unplaceable(tracker):
+            return {}
+
+        assert unplaceable() == []
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="requires sched_setaffinity")
+def test_cpu_affinity(tmp_path, monkeypatch):
+    """测试工作进程绑定CPU并记录放置信息"""
+    monkeypatch.chdir(tmp_path)
+    cpu = sorted(os.sched_getaffinity(0))[0]
+
+    @experiment_manager(times=1, parallel=True, max_workers=1, cpu_affinity="core",
+                        blas_threads=1)
+    def pinned(tracker):
+        return {"cpus": sorted(os.sched_getaffinity(0)),
+                "placement": tracker.get_params()["placement"]}
+
+    result = pinned()[0]
+    assert result["cpus"] == [cpu]
+    assert result["placement"]["cpus"] == [cpu]
+    assert result["placement"]["blas_threads"] == 1
+
+    with pytest.raises(ValueError):
+        experiment_manager(cpu_affinity="socket")
+    with pytest.raises(ValueError):
+        experiment_manager(parallel=True, pool=True, blas_threads=2)
+    with pytest.raises(ValueError):
+        experiment_manager(backend="thread", cpu_affinity="core")(lambda tracker: None)
+
+
+def test_seeded_runs_and_replay(tmp_path, monkeypatch):
+    """测试按运行派生种子并重放单次运行"""
+    monkeypatch.chdir(tmp_path)
+    spawned = np.random.SeedSequence(7).spawn(3)[2].generate_state(1, np.uint32)[0]
+    assert derive_seed(7, 2) == spawned
+
+    def draw(tracker):
+        params = tracker.get_params()
+        values = []
+        for _ in range(3):
+            # Let the concurrent runs interleave their draws
+            time.sleep(0.01)
+            values.append((tracker.rng.random(), tracker.py_random.random()))
+        return {"index": params["run_index"], "run_seed": params["run_seed"],
+                "values": values, "global": np.random.random()}
+
+    draws = experiment_manager(times=3, backend="thread", max_workers=3, seed=7)(draw)
+    serial = experiment_manager(times=3, seed=7, experiment_name="serial")(draw)
+
+    results = sorted(draws(), key=lambda result: result["index"])
+    serial_results = sorted(serial(), key=lambda result: result["index"])
+    assert len({result["values"][0] for result in results}) == 3
+    for result, serial_result in zip(results, serial_results):
+        assert result["run_seed"] == derive_seed(7, result["index"])
+        assert result["values"] == serial_result["values"]
+
+    replayed = serial.replay(1)
+    assert replayed["values"] == results[1]["values"]
+    # Serial runs and replays also seed the global generators
+    assert replayed["global"] == serial_results[1]["global"]
+    with pytest.raises(ValueError):
+        draws.replay(3)
+    with pytest.raises(ValueError):
+        experiment_manager(seed=-1)
+
+
+def test_speculative_attempt_seeds(tmp_path, monkeypatch):
+    """测试推测性尝试使用自己的种子，且重放使用被采用尝试的种子"""
+    monkeypatch.chdir(tmp_path)
+    sequence = np.random.SeedSequence(7, spawn_key=(3,))
+    assert derive_seed(7, 3, 1) == sequence.spawn(2)[1].generate_state(1, np.uint32)[0]
+    assert derive_seed(7, 3, 1) != derive_seed(7, 3)
+
+    @experiment_manager(times=4, parallel=True, max_workers=2, speculative=True, seed=7)
+    def straggler(tracker):
+        params = tracker.get_params()
+        if params["run_index"] == 3 and not params.get("attempt") and not params.get("replay"):
+            time.sleep(60)
+        return {"index": params["run_index"], "attempt": params.get("attempt", 0),
+                "run_seed": params["run_seed"], "value": tracker.rng.random()}
+
+    start = time.time()
+    results = {result["index"]: result for result in straggler()}
+    assert time.time() - start < 50
+    assert results[3]["attempt"] == 1
+    assert results[3]["run_seed"] == derive_seed(7, 3, 1)
+    ledger = next((tmp_path / "orruns_experiments" / "straggler" / "merged_results")
+                  .glob("*/ledger.jsonl"))
+    entries = [serialization.loads(line) for line in ledger.read_bytes().splitlines()[1:]]
+    assert {entry["index"]: entry.get("attempt", 0) for entry in entries}[3] == 1
+
+    replayed = straggler.replay(3)
+    assert replayed["run_seed"] == derive_seed(7, 3, 1)
+    assert replayed["value"] == results[3]["value"]
+    assert straggler.replay(2)["value"] == results[2]["value"]
+
+
+def test_serial_and_in_process_runs(tmp_path, monkeypatch):
+    """测试串行运行及小型并行批次在当前进程中运行"""
+    monkeypatch.chdir(tmp_path)
+
+    @experiment_manager(times=3, merge_config={"scalars": ["value"]})
+    def serial(tracker):
+        return {"value": tracker.get_params()["run_index"], "pid": os.getpid()}
+
+    results = serial()
+    assert sorted(result["value"] for result in results) == [0, 1, 2]
+    assert {result["pid"] for result in results} == {os.getpid()}
+    batch = next((tmp_path / "orruns_experiments" / "serial" / "merged_results").iterdir())
+    assert sorted(pd.read_csv(batch / "scalars" / "raw_values.csv")["value"]) == [0, 1, 2]
+
+    @experiment_manager(times=1, parallel=True)
+    def single(tracker):
+        return {"pid": os.getpid(), "parallel": tracker.get_params()["parallel"]}
+
+    assert single() == [{"pid": os.getpid(), "parallel": False}]
+
+    @experiment_manager(times=3, parallel=True)
+    def fast(tracker):
+        return {"pid": os.getpid()}
+
+    # Unknown durations start workers; the recorded ones keep the next call in-process
+    # 耗时未知时启动工作进程；记录的耗时使下一次调用在当前进程中运行
+    assert os.getpid() not in {result["pid"] for result in fast()}
+    assert {result["pid"] for result in fast()} == {os.getpid()}
+
+    assert decorators._prefer_in_process([0, 1], {0: 0.1, 1: 0.1})
+    assert not decorators._prefer_in_process([0, 1], {0: 0.1})
+    assert not decorators._prefer_in_process([0, 1], {0: 5.0, 1: 5.0})
+
+
+def test_ledger_requires_resume(tmp_path, monkeypatch, capsys):
+    """测试只有启用 resume 时才写入批次记录，且无法序列化的结果不会中断批次"""
+    import threading
+
+    monkeypatch.chdir(tmp_path)
+    batches = tmp_path / "orruns_experiments" / "unpicklable" / "merged_results"
+
+    def unpicklable(tracker, lock):
+        with lock:
+            return {"value": tracker.get_params()["run_index"], "fn": lambda x: x}
+
+    results = experiment_manager(times=2, backend="thread", max_workers=2)(unpicklable)(
+        threading.Lock()
+    )
+    assert sorted(result["value"] for result in results) == [0, 1]
+    assert not batches.exists()
+
+    results = experiment_manager(times=2, resume=True)(unpicklable)(threading.Lock())
+    assert len(results) == 2
+    assert "cannot be pickled" in capsys.readouterr().out
+    assert not batches.exists()
+
+    resumable = experiment_manager(times=2, resume=True, experiment_name="unpicklable")(
+        lambda tracker: {"fn": lambda x: x}
+    )
+    assert len(resumable()) == 2
+    assert "cannot be stored for resuming" in capsys.readouterr().out
+    ledger = next(batches.glob("*/ledger.jsonl"))
+    assert len(ledger.read_bytes().splitlines()) == 1
+    assert not list(batches.glob("*/run_results/*.pkl"))
+
+
+def test_storage_target(tmp_path, monkeypatch):
+    """测试将运行和合并结果写入指定的存储目标"""
+    monkeypatch.chdir(tmp_path)
+    target = StorageTarget(tmp_path / "scratch", metric_storage="log")
+
+    @experiment_manager(times=2, storage=target, merge_config={"scalars": ["value"]})
+    def stored(tracker):
+        tracker.log_metrics({"loss": 0.5}, step=0)
+        return {"value": tracker.get_params()["run_index"]}
+
+    stored()
+    exp_dir = tmp_path / "scratch" / "stored"
+    assert len(list(exp_dir.glob("*/metrics/metrics.jsonl"))) == 2
+    assert (next((exp_dir / "merged_results").iterdir()) / "scalars" / "raw_values.csv").exists()
+    assert not (tmp_path / "orruns_experiments").exists()
+
+    with pytest.raises(ValueError):
+        StorageTarget(tmp_path, unknown_option=True)
@@ -0,0 +1,58 @@
+import json
+import pathlib
+import subprocess
+import sys
+
+import pytest
+
+import orruns
+
+ROOT = pathlib.Path(__file__).resolve().parents[1]
+# Libraries only needed for plotting, dashboards and system information
+# 只在绘图、仪表板和系统信息中需要的库
+HEAVY_MODULES = ("pandas", "matplotlib", "networkx", "dash", "plotly", "rich", "cpuinfo")
+
+
+def _fresh_import(module):
+    """在新的解释器中导入模块，返回耗时和已加载的模块"""
+    code = (
+        "import json, sys, time\n"
+        "start = time.perf_counter()\n"
+        f"import {module}\n"
+        "print(json.dumps([time.perf_counter() - start, sorted(sys.modules)]))"
+    )
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+@pytest.mark.parametrize("module, budget", [
+    ("orruns", 0.5),
+    ("orruns.decorators", 1.5),
+])
+def test_import_time_budget(module, budget):
+    """测试导入耗时预算且不加载重量级依赖"""
+    elapsed, modules = _fresh_import(module)
+    assert not [name for name in HEAVY_MODULES if name in modules]
+    assert elapsed < budget
+
+
+def test_lazy_attributes():
+    """测试顶层名称按需导入"""
+    from orruns.tracker import ExperimentTracker
+
+    assert orruns.ExperimentTracker is ExperimentTracker
+    assert "experiment_manager" in dir(orruns)
+    with pytest.raises(AttributeError):
+        orruns.missing_attribute
+
+
+def test_former_utils_exports():
+    """测试以前从 utils 重新导出的名称仍可访问"""
+    from orruns.utils import utils
+
+    for name in ("get_system_info", "print_system_info", "clear_system_info_cache",
+                 "SYSTEM_INFO_CACHE_DIR"):
+        assert getattr(orruns, name) is getattr(utils, name)
+    assert orruns.tracker.ExperimentTracker is orruns.ExperimentTracker
@@ -0,0 +1,139 @@
+import os
+import subprocess
+import sys
+import time
+
+import pytest
+
+from orruns.core import affinity
+from orruns.core.affinity import (
+    BLAS_ENV_VARS, WorkerPlacement, available_cpus, current_placement,
+    limit_blas_threads, plan_placement
+)
+from orruns.core.pool import WorkerPool
+
+
+@pytest.fixture
+def pool():
+    """创建不预加载模块的小型进程池"""
+    pool = WorkerPool(max_workers=1, idle_timeout=None, warm_imports=())
+    yield pool
+    pool.shutdown()
+
+
+def test_worker_pool_reuse(pool):
+    """测试多次使用复用同一工作进程"""
+    with pool.session() as executor:
+        first = executor.submit(os.getpid).result()
+    assert pool.running
+    with pool.session() as executor:
+        second = executor.submit(os.getpid).result()
+    assert first == second != os.getpid()
+
+    pool.shutdown()
+    assert not pool.running
+    with pool.session() as executor:
+        assert executor.submit(os.getpid).result() != first
+
+
+def test_worker_pool_retire(pool):
+    """测试只有单独使用执行器的会话才能使其退役"""
+    with pool.session() as executor:
+        with pool.session():
+            assert not pool.retire(executor)
+        assert pool.retire(executor)
+        assert not pool.running
+        # The retired executor keeps serving the session that holds it
+        # 已退役的执行器继续为持有它的会话服务
+        first = executor.submit(os.getpid).result()
+    with pool.session() as fresh:
+        assert fresh is not executor
+        assert fresh.submit(os.getpid).result() != first
+
+
+def test_worker_pool_idle_timeout():
+    """测试空闲超时后关闭工作进程"""
+    pool = WorkerPool(max_workers=1, idle_timeout=0.2, warm_imports=())
+    try:
+        pool.warm_up()
+        assert pool.running
+        deadline = time.time() + 10
+        while pool.running and time.time() < deadline:
+            time.sleep(0.05)
+        assert not pool.running
+    finally:
+        pool.shutdown()
+
+
+def test_worker_pool_validation():
+    """测试参数验证"""
+    with pytest.raises(ValueError):
+        WorkerPool(max_workers=0)
+    with pytest.raises(ValueError):
+        WorkerPool(idle_timeout=0)
+
+
+def test_plan_placement():
+    """测试CPU放置方案"""
+    nodes = [[0, 1, 2], [4, 5]]
+    assert plan_placement("core", nodes) == [[0], [4], [1], [5], [2]]
+    assert plan_placement("numa", nodes) == [[0, 1, 2], [4, 5]]
+    assert plan_placement([[0, 1], [2, 3]]) == [[0, 1], [2, 3]]
+    with pytest.raises(ValueError):
+        plan_placement("socket")
+    with pytest.raises(ValueError):
+        plan_placement([[0], []])
+
+
+def _placement():
+    return sorted(os.sched_getaffinity(0)), current_placement(), os.environ.get("OMP_NUM_THREADS")
+
+
+@pytest.mark.skipif(not hasattr(os, "sched_setaffinity"), reason="requires sched_setaffinity")
+def test_worker_pool_affinity():
+    """测试工作进程绑定CPU并限制BLAS线程"""
+    cpu = available_cpus()[-1]
+    omp_before = os.environ.get("OMP_NUM_THREADS")
+    pool = WorkerPool(max_workers=1, idle_timeout=None, warm_imports=(),
+                      cpu_affinity=[[cpu]], blas_threads=1)
+    try:
+        with pool.session() as executor:
+            cpus, placement, omp = executor.submit(_placement).result()
+    finally:
+        pool.shutdown()
+    assert cpus == [cpu]
+    assert placement["cpus"] == [cpu] and placement["blas_threads"] == 1
+    assert omp == "1"
+    assert os.environ.get("OMP_NUM_THREADS") == omp_before
+
+
+def test_worker_placement_reuses_slots(monkeypatch):
+    """测试已退出工作进程的槽位被重新分配"""
+    monkeypatch.setattr(affinity, "_current_placement", None)
+    monkeypatch.setattr(affinity, "_worker_placement", None)
+    cpus = available_cpus()
+    placement = WorkerPlacement([cpus, cpus])
+    exited = subprocess.Popen([sys.executable, "-c", "pass"])
+    exited.wait()
+    placement._owners[0] = exited.pid
+    placement._owners[1] = exited.pid
+    assert placement.apply()["worker_slot"] == 0
+    assert placement.apply()["worker_slot"] == 1
+    # Both slots held by a live process: shared in turn
+    assert placement.apply()["worker_slot"] == 0
+    assert placement.started == 3
+
+
+def test_limit_blas_threads(monkeypatch):
+    """测试只有实际生效的BLAS线程限制才被报告"""
+    monkeypatch.setattr(os, "environ", {})
+    monkeypatch.setitem(sys.modules, "threadpoolctl", None)
+    monkeypatch.setitem(sys.modules, "numpy", sys.modules.get("numpy", object()))
+    assert not limit_blas_threads(2)
+    assert all(os.environ[name] == "2" for name in BLAS_ENV_VARS)
+    # Inherited from the parent: in effect before NumPy was loaded
+    assert limit_blas_threads(2)
+
+    monkeypatch.setattr(os, "environ", {})
+    monkeypatch.delitem(sys.modules, "numpy")
+    assert limit_blas_threads(2)
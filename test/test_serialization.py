@@ -0,0 +1,58 @@
+import math
+
+import numpy as np
+import pytest
+
+from orruns.core import serialization
+
+
+@pytest.fixture(params=serialization.available_backends())
+def backend(request):
+    """依次使用每个已安装的JSON后端"""
+    previous = serialization.get_json_backend()
+    serialization.set_json_backend(request.param)
+    yield request.param
+    serialization.set_json_backend(previous)
+
+
+def test_roundtrip(backend):
+    """测试各后端的编码结果一致且可解码"""
+    data = {"name": "实验", "parameters": {"lr": 0.01, "layers": [1, 2]},
+            "metrics": {"curve": {"steps": [0, 1], "values": [0.5, 0.25]}}}
+    encoded = serialization.dumps(data)
+    assert b"\n" not in encoded
+    assert serialization.loads(encoded) == data
+    assert serialization.loads(serialization.dumps(data, pretty=True)) == data
+
+
+def test_numpy_values(backend):
+    """测试NumPy标量和数组无需手动转换"""
+    data = {
+        "array": np.arange(4, dtype=np.float32),
+        "matrix": np.ones((2, 2))[:, 0],  # non-contiguous
+        "int": np.int64(3),
+        "float": np.float32(0.5),
+        "flag": np.bool_(True),
+    }
+    assert serialization.loads(serialization.dumps(data)) == {
+        "array": [0.0, 1.0, 2.0, 3.0],
+        "matrix": [1.0, 1.0],
+        "int": 3,
+        "float": 0.5,
+        "flag": True,
+    }
+
+
+def test_nonfinite_values(backend):
+    """测试NaN和无穷大不会丢失"""
+    data = {"loss": float("nan"), "curve": [1.0, float("inf")], "arr": np.array([np.nan])}
+    decoded = serialization.loads(serialization.dumps(data))
+    assert math.isnan(decoded["loss"])
+    assert decoded["curve"] == [1.0, float("inf")]
+    assert math.isnan(decoded["arr"][0])
+
+
+def test_unknown_backend():
+    """测试未知后端被拒绝"""
+    with pytest.raises(ValueError):
+        serialization.set_json_backend("yaml")
@@ -129,4 +129,395 @@ def test_artifact_management(tracker):
 
     # 验证文件存在
     assert (tracker.artifacts_dir / "data" / "data.csv").exists()
-    assert (tracker.artifacts_dir / "figures" / "plot.png").exists()
\ No newline at end of file
+    assert (tracker.artifacts_dir / "figures" / "plot.png").exists()
+
+def test_log_metric_storage(temp_dir):
+    """测试追加式指标日志存储"""
+    tracker = ExperimentTracker("log_exp", base_dir=temp_dir, metric_storage="log")
+    tracker.log_params({"lr": 0.1})
+    tracker.log_metrics({"best": 10.0})
+    for i in range(5):
+        tracker.log_metrics({"loss": 1.0 - i * 0.1}, step=i)
+
+    # 未 flush 时 metrics.json 不存在，但查询结果完整
+    assert not (tracker.metrics_dir / "metrics.json").exists()
+    results = ExperimentTracker.query_experiments(base_dir=temp_dir)
+    assert results[0]["metrics"]["best"] == 10.0
+    assert results[0]["metrics"]["loss"]["steps"] == [0, 1, 2, 3, 4]
+    assert results[0]["metrics"]["loss"]["values"] == tracker.get_metrics()["loss"]["values"]
+
+    tracker.close()
+    with open(tracker.metrics_dir / "metrics.json", encoding="utf-8") as f:
+        assert json.load(f) == tracker.get_metrics()
+    results = ExperimentTracker.query_experiments(base_dir=temp_dir)
+    assert results[0]["metrics"] == tracker.get_metrics()
+
+
+def test_step_series(tracker):
+    """测试步骤指标的数组存储"""
+    from orruns.core.series import StepSeries
+
+    for i in range(1000):
+        tracker.log_metrics({"cost": 100 - i, "gap": 1.0 / (i + 1)}, step=i)
+    assert isinstance(tracker._metrics["cost"], StepSeries)
+
+    metrics = tracker.get_metrics()
+    assert metrics["cost"]["steps"] == list(range(1000))
+    assert metrics["cost"]["values"][:3] == [100, 99, 98]
+    assert all(isinstance(v, int) for v in metrics["cost"]["values"])
+
+    # 整数序列遇到浮点数时升级为浮点数组
+    tracker.log_metrics({"cost": 0.5}, step=1000)
+    assert tracker.get_metrics()["cost"]["values"][-2:] == [-899, 0.5]
+
+    with open(tracker.run_dir / "summary.json", encoding="utf-8") as f:
+        assert json.load(f)["metrics"]["cost"]["steps"][-1] == 1000
+
+    # 超出64位范围的步骤给出明确错误且不记录任何内容
+    from orruns.errors import MetricError
+    with pytest.raises(MetricError, match="64-bit"):
+        tracker.log_metrics({"gap": 1.0}, step=2 ** 63)
+    assert len(tracker._metrics["gap"]) == 1000
+    # 超出64位的整数值升级为浮点数组
+    series = StepSeries([0], [1])
+    series.append(1, 2 ** 70)
+    assert series.values.typecode == "d" and series.to_dict()["values"] == [1.0, 2.0 ** 70]
+
+
+def test_async_writes(temp_dir):
+    """测试后台批量写入"""
+    with ExperimentTracker("async_exp", base_dir=temp_dir, async_writes=True,
+                           flush_interval=60, flush_every=10_000) as tracker:
+        tracker.log_params({"lr": 0.1})
+        for i in range(200):
+            tracker.log_metrics({"loss": 1.0 / (i + 1)}, step=i)
+        # 间隔未到且未达到阈值时不写入
+        assert not (tracker.run_dir / "summary.json").exists()
+
+    with open(tracker.run_dir / "summary.json", encoding="utf-8") as f:
+        summary = json.load(f)
+    assert summary["parameters"]["lr"] == 0.1
+    assert summary["metrics"]["loss"]["steps"] == list(range(200))
+    assert not list(tracker.run_dir.rglob("*.tmp"))
+
+    # 关闭后的写入直接同步完成
+    tracker.log_metrics({"final": 1.0})
+    with open(tracker.metrics_dir / "metrics.json", encoding="utf-8") as f:
+        assert json.load(f)["final"] == 1.0
+
+
+def test_async_writes_flush_threshold(temp_dir):
+    """测试达到数量阈值时的提前写入"""
+    tracker = ExperimentTracker("async_exp", base_dir=temp_dir, metric_storage="log",
+                                async_writes=True, flush_interval=60, flush_every=5)
+    for i in range(5):
+        tracker.log_metrics({"loss": float(i)}, step=i)
+    deadline = time.time() + 5
+    while not (tracker.run_dir / "summary.json").exists() and time.time() < deadline:
+        time.sleep(0.01)
+    results = ExperimentTracker.query_experiments(base_dir=temp_dir)
+    assert results[0]["metrics"]["loss"]["steps"] == [0, 1, 2, 3, 4]
+    tracker.close()
+
+
+def test_run_index(temp_dir):
+    """测试SQLite运行索引与目录扫描结果一致"""
+    for i in range(6):
+        t = ExperimentTracker("exp_a" if i % 2 else "exp_b", base_dir=temp_dir)
+        t.log_params({"lr": 0.1 * i, "solver": f"s{i % 3}", "nested": {"depth": i}})
+        t.log_metrics({"cost": 100.0 - i})
+        t.log_metrics({"loss": 1.0}, step=0)
+
+    assert ExperimentTracker.rebuild_index(base_dir=temp_dir) == 6
+
+    queries = [
+        {"parameter_filters": {"lr__gt": 0.25}},
+        {"parameter_filters": {"solver__eq": "s1", "nested.depth__lte": 4}},
+        {"filters": {"name__eq": "exp_a"}, "metric_filters": {"cost__lt": 99}},
+        {"sort_by": "metrics.cost", "sort_ascending": False, "limit": 2},
+        {"metric_filters": {"loss__gt": 0.5}},  # 步骤指标回退到扫描
+    ]
+    for query in queries:
+        scanned = ExperimentTracker.query_experiments(base_dir=temp_dir, use_index=False, **query)
+        indexed = ExperimentTracker.query_experiments(base_dir=temp_dir, use_index=True, **query)
+        if "sort_by" in query:
+            assert [e["run_id"] for e in indexed] == [e["run_id"] for e in scanned]
+        else:
+            assert sorted(e["run_id"] for e in indexed) == sorted(e["run_id"] for e in scanned)
+
+    # 新运行和删除会自动更新索引
+    t = ExperimentTracker("exp_c", base_dir=temp_dir)
+    t.log_params({"lr": 5.0})
+    results = ExperimentTracker.query_experiments(
+        base_dir=temp_dir, parameter_filters={"lr__gte": 5.0}
+    )
+    assert [e["run_id"] for e in results] == [t.run_id]
+
+    ExperimentTracker.delete_experiment("exp_c", base_dir=temp_dir)
+    assert ExperimentTracker.query_experiments(
+        base_dir=temp_dir, parameter_filters={"lr__gte": 5.0}
+    ) == []
+
+
+def test_run_index_metric_log(temp_dir):
+    """测试指标日志未写入摘要时索引查询与扫描一致"""
+    running = ExperimentTracker("log_exp", base_dir=temp_dir, metric_storage="log", index=True)
+    running.log_metrics({"cost": 5.0})
+    other = ExperimentTracker("log_exp", base_dir=temp_dir, metric_storage="log", index=True)
+    other.log_metrics({"cost": 3.0})
+    other.close()
+    # 只追加到日志，索引中仍是 5.0
+    running.log_metrics({"cost": 1.0})
+
+    queries = [
+        {"metric_filters": {"cost__lt": 2}},
+        {"metric_filters": {"cost__gt": 4}},
+        {"sort_by": "metrics.cost"},
+    ]
+    for query in queries:
+        scanned = ExperimentTracker.query_experiments(base_dir=temp_dir, use_index=False, **query)
+        indexed = ExperimentTracker.query_experiments(base_dir=temp_dir, use_index=True, **query)
+        assert [e["run_id"] for e in indexed] == [e["run_id"] for e in scanned]
+    assert [e["run_id"] for e in indexed] == [running.run_id, other.run_id]
+    running.close()
+
+
+def test_run_index_open_runs(temp_dir):
+    """测试打开的运行从磁盘读取，且索引结果与扫描顺序一致"""
+    from orruns.core.index import RunIndex
+
+    for name in ("exp", "exp-2", "exp"):
+        with ExperimentTracker(name, base_dir=temp_dir, index=True) as t:
+            t.log_metrics({"cost": 2.0})
+    running = ExperimentTracker("exp-2", base_dir=temp_dir, index=True)
+    running.log_metrics({"cost": 1.0})
+
+    # 打开的运行在关闭前不写入索引字段
+    index = RunIndex(temp_dir)
+    run_key = f"exp-2/{running.run_id}"
+    assert index.fetch([run_key], ["metrics.cost"]) == {}
+    assert index.open_runs() == [("exp-2", running.run_id)]
+    index.close()
+
+    for query in ({}, {"metric_filters": {"cost__lt": 1.5}}, {"fields": ["run_id", "metrics.cost"]}):
+        scanned = ExperimentTracker.query_experiments(base_dir=temp_dir, use_index=False, **query)
+        indexed = ExperimentTracker.query_experiments(base_dir=temp_dir, use_index=True, **query)
+        assert indexed == scanned
+    assert [e["name"] for e in ExperimentTracker.query_experiments(base_dir=temp_dir)] == [
+        "exp", "exp", "exp-2", "exp-2"
+    ]
+
+    running.close()
+    index = RunIndex(temp_dir)
+    assert index.fetch([run_key], ["metrics.cost"])[run_key]["metrics.cost"] == ("num", 1.0)
+    assert index.open_runs() == []
+    index.close()
+    assert ExperimentTracker.query_experiments(base_dir=temp_dir, use_index=True) == \
+        ExperimentTracker.query_experiments(base_dir=temp_dir, use_index=False)
+
+
+def test_summary_cache(temp_dir):
+    """测试摘要缓存只重新读取发生变化的运行"""
+    from orruns.core.cache import get_summary_cache
+
+    trackers = []
+    for i in range(3):
+        t = ExperimentTracker("cache_exp", base_dir=temp_dir)
+        t.log_metrics({"cost": float(i)})
+        trackers.append(t)
+
+    cache = get_summary_cache()
+    ExperimentTracker.query_experiments(base_dir=temp_dir)
+    before = cache.stats()
+    ExperimentTracker.query_experiments(base_dir=temp_dir)
+    after = cache.stats()
+    assert after["hits"] - before["hits"] == 3
+    assert after["misses"] == before["misses"]
+
+    trackers[0].log_metrics({"cost": 10.0})
+    results = ExperimentTracker.query_experiments(base_dir=temp_dir)
+    assert cache.stats()["misses"] - after["misses"] == 1
+    assert sorted(e["metrics"]["cost"] for e in results) == [1.0, 2.0, 10.0]
+
+    # 修改返回结果不会影响缓存
+    from orruns.core.storage import load_run_metrics
+    load_run_metrics(trackers[1].run_dir)["cost"] = -1.0
+    results[0]["metrics"].clear()
+    assert load_run_metrics(trackers[1].run_dir)["cost"] == 1.0
+    results = ExperimentTracker.query_experiments(base_dir=temp_dir)
+    assert sorted(e["metrics"]["cost"] for e in results) == [1.0, 2.0, 10.0]
+
+def test_iter_experiments(temp_dir):
+    """测试流式查询的提前终止和top-k排序"""
+    from orruns.core.cache import get_summary_cache
+
+    for i in range(10):
+        t = ExperimentTracker("iter_exp", base_dir=temp_dir)
+        t.log_metrics({"cost": float((i * 7) % 10)})
+
+    cache = get_summary_cache()
+    cache.clear()
+    it = ExperimentTracker.iter_experiments(base_dir=temp_dir, limit=3)
+    assert len(list(it)) == 3
+    assert cache.stats()["misses"] == 3
+
+    for ascending in (True, False):
+        expected = ExperimentTracker.query_experiments(
+            base_dir=temp_dir, use_index=False
+        )
+        expected.sort(key=lambda e: e["metrics"]["cost"], reverse=not ascending)
+        top = list(ExperimentTracker.iter_experiments(
+            base_dir=temp_dir, sort_by="metrics.cost",
+            sort_ascending=ascending, limit=4
+        ))
+        assert [e["run_id"] for e in top] == [e["run_id"] for e in expected[:4]]
+
+def test_query_projection(temp_dir):
+    """测试查询只返回请求的字段"""
+    for i in range(4):
+        t = ExperimentTracker("proj_exp", base_dir=temp_dir, metric_storage="log")
+        t.log_params({"lr": 0.1 * (i + 1), "model": {"depth": i}})
+        t.log_metrics({"best": float(i)})
+        for step in range(3):
+            t.log_metrics({"curve": float(step)}, step=step)
+        t.close()
+
+    fields = ["run_id", "parameters.model.depth", "metrics.best", "metrics.curve"]
+    scanned = ExperimentTracker.query_experiments(
+        base_dir=temp_dir, fields=fields, sort_by="parameters.lr", use_index=False
+    )
+    assert [e["parameters"]["model"]["depth"] for e in scanned] == [0, 1, 2, 3]
+    assert set(scanned[0]) == {"run_id", "parameters", "metrics"}
+    assert scanned[0]["metrics"] == {
+        "best": 0.0, "curve": {"steps": [0, 1, 2], "values": [0.0, 1.0, 2.0]}
+    }
+
+    ExperimentTracker.rebuild_index(base_dir=temp_dir)
+    indexed = ExperimentTracker.query_experiments(
+        base_dir=temp_dir, fields=fields, sort_by="parameters.lr"
+    )
+    assert indexed == scanned
+
+    from orruns.core.cache import get_summary_cache
+    get_summary_cache().clear()
+    scalars = ExperimentTracker.query_experiments(
+        base_dir=temp_dir, fields=["metrics.best", "metrics.missing"],
+        metric_filters={"best__gte": 2}
+    )
+    assert sorted(e["metrics"]["best"] for e in scalars) == [2.0, 3.0]
+    assert get_summary_cache().stats()["misses"] == 0
+
+    with pytest.raises(ValueError):
+        ExperimentTracker.query_experiments(base_dir=temp_dir, fields=["metrics."])
+
+def test_parallel_query(temp_dir):
+    """测试并行扫描的结果与顺序扫描一致"""
+    from orruns.core.cache import get_summary_cache
+
+    for name in ("par_a", "par_b"):
+        for i in range(5):
+            t = ExperimentTracker(name, base_dir=temp_dir)
+            t.log_metrics({"cost": float(i)})
+    (Path(temp_dir) / "par_a" / "broken").mkdir()
+    (Path(temp_dir) / "par_a" / "broken" / "summary.json").write_text("{")
+
+    get_summary_cache().clear()
+    sequential = ExperimentTracker.query_experiments(base_dir=temp_dir)
+    assert len(sequential) == 10
+    for kwargs in ({"workers": 4}, {"workers": 2, "parse_processes": True}):
+        get_summary_cache().clear()
+        parallel = ExperimentTracker.query_experiments(base_dir=temp_dir, **kwargs)
+        assert [e["run_id"] for e in parallel] == [e["run_id"] for e in sequential]
+
+    first = ExperimentTracker.query_experiments(base_dir=temp_dir, workers=4, limit=2)
+    assert [e["run_id"] for e in first] == [e["run_id"] for e in sequential[:2]]
+
+def test_columnar_metric_storage(temp_dir):
+    """测试列式指标存储"""
+    import numpy as np
+    from orruns.core.storage import load_run_metrics
+
+    tracker = ExperimentTracker("col_exp", base_dir=temp_dir, metric_storage="columnar")
+    for step in range(100):
+        tracker.log_metrics({"cost": step, "opt": {"gap": 1.0 / (step + 1)}}, step=step)
+    tracker.log_metrics({"cost": 0.5}, step=100)  # int column upgraded to float
+    tracker.log_metrics({"best": 0.5})
+
+    metrics = tracker.get_metrics()
+    assert isinstance(metrics["cost"]["values"], np.memmap)
+    assert metrics["cost"]["values"][-1] == 0.5
+
+    # Pointers in summary.json lag behind later appends; readers use the columns
+    tracker.log_metrics({"best": 0.25})
+    tracker.log_metrics({"cost": 0.25}, step=101)
+    assert json.loads((tracker.run_dir / "summary.json").read_text())["metrics"]["cost"]["length"] == 101
+    stored = load_run_metrics(tracker.run_dir)
+    assert stored["cost"]["length"] == 102 and stored["cost"]["last"] == 0.25
+    tracker.close()
+
+    summary = json.loads((tracker.run_dir / "summary.json").read_text())
+    assert summary["metrics"]["best"] == 0.25
+    assert summary["metrics"]["cost"]["length"] == 102
+    assert "values" not in summary["metrics"]["cost"]
+    assert (tracker.metrics_dir / "columns" / "cost.values.npy").exists()
+
+    stored = load_run_metrics(tracker.run_dir)
+    assert isinstance(stored["cost"]["values"], np.memmap)
+    assert stored["cost"]["steps"].tolist() == list(range(102))
+    assert stored["cost"]["values"].tolist() == list(range(100)) + [0.5, 0.25]
+    assert np.allclose(stored["opt"]["gap"]["values"], metrics["opt"]["gap"]["values"])
+    assert stored["opt"]["gap"]["length"] == 100
+
+    results = ExperimentTracker.query_experiments(
+        base_dir=temp_dir, fields=["metrics.cost"], metric_filters={"best__lt": 1}
+    )
+    assert results[0]["metrics"]["cost"]["values"][-1] == 0.25
+
+def test_run_status(temp_dir):
+    """测试运行状态记录"""
+    tracker = ExperimentTracker("status_exp", base_dir=temp_dir)
+    tracker.log_params({"lr": 0.1})
+    summary_file = Path(tracker.run_dir) / "summary.json"
+    assert json.loads(summary_file.read_text())["status"] == "completed"
+
+    tracker.set_status("timeout")
+    assert json.loads(summary_file.read_text())["status"] == "timeout"
+    with pytest.raises(ValueError):
+        tracker.set_status("lost")
+
+    ExperimentTracker.set_run_status("status_exp", tracker.run_id, "cancelled", base_dir=temp_dir)
+    assert json.loads(summary_file.read_text())["status"] == "cancelled"
+
+
+def test_resource_sampling(temp_dir):
+    """测试资源使用采样"""
+    from orruns.core.storage import flatten_metrics, load_run_metrics
+
+    with pytest.raises(ValueError):
+        ExperimentTracker("resource_exp", base_dir=temp_dir, sample_resources=0)
+
+    with ExperimentTracker("resource_exp", base_dir=temp_dir, sample_resources=0.05) as tracker:
+        tracker.log_metrics({"cost": 1.0})
+        end = time.time() + 0.3
+        while time.time() < end:
+            pass
+        # Samples are buffered instead of rewriting metrics.json each time
+        assert "resources" not in load_run_metrics(tracker.run_dir)
+    assert tracker._sampler.error is None
+
+    metrics = flatten_metrics(load_run_metrics(tracker.run_dir))
+    assert metrics["cost"] == 1.0
+    rss = metrics["resources.rss_mb"]
+    # Periodic samples plus the final one taken on close
+    assert len(rss["steps"]) >= 2
+    assert rss["steps"] == list(range(len(rss["steps"])))
+    assert all(value > 0 for value in rss["values"])
+    peak = metrics["resources.peak_rss_mb"]["values"]
+    assert peak == sorted(peak)
+    for name in ("cpu_percent", "elapsed_s", "num_threads", "ctx_switches_voluntary"):
+        assert len(metrics[f"resources.{name}"]["values"]) == len(rss["steps"])
+
+    # No samples are logged after the run has ended
+    steps = len(rss["steps"])
+    time.sleep(0.15)
+    assert len(flatten_metrics(load_run_metrics(tracker.run_dir))["resources.rss_mb"]["steps"]) == steps
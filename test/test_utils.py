@@ -0,0 +1,42 @@
+import pytest
+
+from orruns.utils import utils
+
+
+@pytest.fixture
+def cache_dir(tmp_path, monkeypatch):
+    """使用临时目录缓存系统信息"""
+    monkeypatch.setattr(utils, "SYSTEM_INFO_CACHE_DIR", tmp_path)
+    utils.clear_system_info_cache()
+    yield tmp_path
+    utils.clear_system_info_cache()
+
+
+def test_system_info_cache(cache_dir, monkeypatch):
+    """测试静态系统信息缓存在磁盘上，动态字段每次刷新"""
+    calls = []
+    collect = utils._collect_static
+    monkeypatch.setattr(utils, "_collect_static",
+                        lambda level: calls.append(level) or collect(level))
+
+    first = utils.get_system_info("exp_a", True, 3, 2, level="full")
+    assert calls == ["full"]
+    assert list(cache_dir.glob("system_info-*.json"))
+
+    # A new process reads the static facts from disk
+    # 新进程从磁盘读取静态信息
+    utils._static_info.clear()
+    second = utils.get_system_info("exp_b", False, 5, None, level="full")
+    assert calls == ["full"]
+    assert second["hardware"]["cpu"] == first["hardware"]["cpu"]
+    assert second["experiment"]["name"] == "exp_b"
+    assert second["hardware"]["memory"]["available_gb"] is not None
+
+    # Another boot or package set invalidates the cache
+    # 重启或包变化使缓存失效
+    utils._static_info.clear()
+    monkeypatch.setattr(utils, "_boot_id", lambda: "another-boot")
+    utils.get_system_info(level="full")
+    assert calls == ["full", "full"]
+
+    assert utils.get_system_info(level="none") == {}